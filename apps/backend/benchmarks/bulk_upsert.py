@@ -0,0 +1,61 @@
+"""Benchmark: saving a city place by place vs DataBase.bulk_upsert_places.
+
+Run from apps/backend: ``uv run python -m benchmarks.bulk_upsert``.
+The per-place path is skipped above 1,000 places because it is quadratic.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.database import DataBase
+
+SIZES = [500, 1000, 2000, 5000]
+PER_PLACE_LIMIT = 1000
+
+
+def _places(n: int) -> list[Place]:
+	return [
+		Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(50.0 + i * 1e-4, 19.9 + i * 1e-4),
+		)
+		for i in range(n)
+	]
+
+
+def _per_place(db: DataBase, city: City, places: list[Place]) -> float:
+	start = time.perf_counter()
+	db.add_categories_to_database(city, 'places_categories', ['museum'])
+	for place in places:
+		db.add_place_to_database(place, city, 'places_categories', 'places', ['museum'])
+	return time.perf_counter() - start
+
+
+def _bulk(db: DataBase, city: City, places: list[Place]) -> float:
+	start = time.perf_counter()
+	db.bulk_upsert_places(city, places, 'places_categories', ['museum'])
+	return time.perf_counter() - start
+
+
+def main():
+	city = City.get_const_krakow()
+	print(f'{"places":>8} {"per-place [s]":>14} {"bulk [s]":>10} {"speedup":>8}')
+	for size in SIZES:
+		places = _places(size)
+		with tempfile.TemporaryDirectory() as tmp:
+			bulk = _bulk(DataBase(Path(tmp) / 'bulk'), city, places)
+			if size <= PER_PLACE_LIMIT:
+				per_place = _per_place(DataBase(Path(tmp) / 'per_place'), city, places)
+				print(
+					f'{size:>8} {per_place:>14.3f} {bulk:>10.3f} {per_place / bulk:>7.1f}x'
+				)
+			else:
+				print(f'{size:>8} {"skipped":>14} {bulk:>10.3f} {"-":>8}')
+
+
+if __name__ == '__main__':
+	main()
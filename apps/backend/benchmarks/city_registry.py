@@ -0,0 +1,81 @@
+"""Microbenchmark: City lookup via pandas CSV scan vs the in-memory registry.
+
+Run from apps/backend: ``uv run python -m benchmarks.city_registry``.
+Uses the real worldcities.csv when present, otherwise a synthetic file of the
+same shape (~48k rows).
+"""
+
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_model.city.city_registry import CityRegistry, get_cities_csv
+
+ROWS = 48000
+LOOKUPS = 20
+
+
+def _synthetic_csv(directory: Path) -> Path:
+	path = directory / 'worldcities.csv'
+	rng = random.Random(0)
+	with open(path, 'w', encoding='utf-8') as handle:
+		handle.write(
+			'city,city_ascii,lat,lng,country,iso2,iso3,admin_name,capital,population,id\n'
+		)
+		for i in range(ROWS):
+			handle.write(
+				f'City{i},City{i},{rng.uniform(-90, 90):.4f},{rng.uniform(-180, 180):.4f},'
+				f'Country{i % 200},XX,XXX,Admin,,{rng.randint(1000, 10**7)},{1000000000 + i}\n'
+			)
+	return path
+
+
+def _legacy_lookup(path: Path, city_id: int):
+	data = pd.read_csv(path)
+	data = data[data['id'] == city_id]
+	attributes = ['id', 'city', 'country', 'population', 'lat', 'lng']
+	return data[attributes].to_dict('records')[0]
+
+
+def main():
+	with tempfile.TemporaryDirectory() as tmp:
+		csv_path = get_cities_csv()
+		if not csv_path.exists():
+			csv_path = _synthetic_csv(Path(tmp))
+		binary_path = Path(tmp) / 'worldcities.pkl'
+		ids = (
+			pd.read_csv(csv_path)['id']
+			.sample(LOOKUPS, replace=True, random_state=0)
+			.tolist()
+		)
+
+		legacy = timeit.timeit(
+			lambda: [_legacy_lookup(csv_path, city_id) for city_id in ids], number=1
+		)
+
+		cold_compile = timeit.timeit(
+			lambda: CityRegistry(csv_path, binary_path).load(), number=1
+		)
+		cold_binary = timeit.timeit(
+			lambda: CityRegistry(csv_path, binary_path).load(), number=1
+		)
+		registry = CityRegistry(csv_path, binary_path)
+		registry.load()
+		warm = timeit.timeit(
+			lambda: [registry.get(city_id) for city_id in ids], number=1000
+		)
+
+		print(f'dataset: {csv_path} ({len(registry)} rows)')
+		print(f'legacy read_csv per lookup:     {legacy / LOOKUPS * 1000:10.3f} ms')
+		print(f'registry first load (compile):  {cold_compile * 1000:10.3f} ms')
+		print(f'registry load from binary:      {cold_binary * 1000:10.3f} ms')
+		print(
+			f'registry lookup (warm):         {warm / (1000 * LOOKUPS) * 1e6:10.3f} us'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,71 @@
+"""Benchmark: city travel matrix ingest, incremental update and day lookup.
+
+Run from apps/backend: ``uv run python -m benchmarks.city_travel_matrix``.
+Builds the matrix for CITY_PLACES synthetic places, adds NEW_PLACES more,
+then compares the time matrix of a DAY_PLACES day estimated online with a
+slice of the stored matrix.
+"""
+
+import random
+import tempfile
+import time
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.travel_time import travel_estimator
+from src.travel_time.travel_matrix import CityTravelMatrix
+
+CITY_PLACES = 1000
+NEW_PLACES = 50
+DAY_PLACES = 12
+LOOKUPS = 200
+
+
+def _places(count: int, offset: int = 0) -> list[Place]:
+	rng = random.Random(offset)
+	return [
+		Place(
+			placeInfo=PlaceInfo(id=f'place-{offset + i}'),
+			location=Location(
+				50.06 + rng.uniform(-0.1, 0.1), 19.94 + rng.uniform(-0.1, 0.1)
+			),
+		)
+		for i in range(count)
+	]
+
+
+def main():
+	city = City.get_const_krakow()
+	city.country = 'Sweden'  # model estimates only, no OSRM
+	places = _places(CITY_PLACES)
+	with tempfile.TemporaryDirectory() as tmp:
+		matrix = CityTravelMatrix(tmp)
+		start = time.perf_counter()
+		matrix.add_places(city, places)
+		print(f'ingest {CITY_PLACES} places: {time.perf_counter() - start:.2f} s')
+
+		start = time.perf_counter()
+		matrix.add_places(city, places + _places(NEW_PLACES, CITY_PLACES))
+		print(f'add {NEW_PLACES} places: {time.perf_counter() - start:.2f} s')
+
+		rng = random.Random(1)
+		days = [rng.sample(places, DAY_PLACES) for _ in range(LOOKUPS)]
+		start = time.perf_counter()
+		for day in days:
+			travel_estimator.get_estimated_time_matrix(
+				[place.location for place in day], city
+			)
+		online = (time.perf_counter() - start) / LOOKUPS
+		start = time.perf_counter()
+		for day in days:
+			matrix.lookup(city, [place.placeInfo.id for place in day])
+		stored = (time.perf_counter() - start) / LOOKUPS
+		print(
+			f'{DAY_PLACES}-place day: online {online * 1000:.2f} ms, '
+			f'stored {stored * 1000:.3f} ms ({online / stored:.0f}x)'
+		)
+
+
+if __name__ == '__main__':
+	main()
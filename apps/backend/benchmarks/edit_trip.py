@@ -0,0 +1,123 @@
+"""Benchmark: editing one day of a stored trip against planning it again.
+
+Run from apps/backend: ``uv run python -m benchmarks.edit_trip``.
+A city of PLACES synthetic places within walking distance of the centre of
+Kraków (so no OSRM calls) is stored with its travel matrix, and a three-day
+trip of DAY_SIZE places per day is saved. The median of REPEATS runs is
+reported, the trip is restored before each edit. "plan again" is the
+routing part of a full recommendation (clustering all places into days
+and solving every day); the LLM summary and weather calls of a real
+request come on top of it. Every edit re-solves only the days it changes,
+warm-started from the stored order.
+"""
+
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from src.backend import edit_trip
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.place.place_visitor import PlaceVisitor
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.database import DataBase, DataBaseTrips
+from src.database.places_cache import PlacesCache
+from src.route_optimalization import parallel_routing, routing
+from src.route_optimalization.route_cache import RouteCache
+from src.route_optimalization.split_for_days import SplitForDays
+from src.travel_time.travel_matrix import CityTravelMatrix
+
+PLACES = 300
+DAY_SIZE = 8
+REPEATS = 5
+DATES = (date(2024, 6, 3), date(2024, 6, 5))
+
+
+def _places(city: City) -> list[Place]:
+	rng = random.Random(PLACES)
+	places = []
+	for i in range(PLACES):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				city.lat + rng.uniform(-0.015, 0.015),
+				city.lng + rng.uniform(-0.015, 0.015),
+			),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	return places
+
+
+def _timed(function, before=None) -> float:
+	times = []
+	for _ in range(REPEATS):
+		if before is not None:
+			before()
+		start = time.perf_counter()
+		function()
+		times.append((time.perf_counter() - start) * 1000)
+	return statistics.median(times)
+
+
+def main():
+	city = City.get_const_krakow()
+	places = _places(city)
+	# solve the full plan every time instead of reading routes solved before
+	parallel_routing.route_cache = RouteCache(size=0)
+	with (
+		tempfile.TemporaryDirectory() as directory,
+		tempfile.TemporaryDirectory() as matrix_directory,
+	):
+		db = DataBase(directory)
+		db.bulk_upsert_places(city, places, 'places_categories', [])
+		routing.city_travel_matrix = CityTravelMatrix(matrix_directory)
+		routing.city_travel_matrix.add_places(city, places)
+		edit_trip.places_cache = PlacesCache()
+		db_trips = DataBaseTrips(directory)
+		days = [
+			{
+				'places': [
+					PlaceVisitor.place_to_itinerary(place)
+					for place in places[day * DAY_SIZE : (day + 1) * DAY_SIZE]
+				],
+				'weather': None,
+			}
+			for day in range(3)
+		]
+		db_trips.save_trip_history(
+			city, {'id': 'trip', 'days': days, 'dates': [d.isoformat() for d in DATES]}
+		)
+		# the first read hydrates the city's places into the cache, like any earlier request
+		edit_trip.places_cache.get(db, city)
+
+		def plan_again():
+			split = SplitForDays(*DATES, Places(places, city))
+			depot = TripInfo(city=city).hotel
+			for day, period_index in zip(split.split(), split.weekday_indices):
+				parallel_routing.solve_day(day, depot, period_index)
+
+		def restore():
+			db_trips.set_trip_days('trip', dict(enumerate(days)))
+
+		def edit(*args, **kwargs):
+			return lambda: edit_trip.edit_trip(db, db_trips, 'trip', *args, **kwargs)
+
+		rows = [
+			('plan again', _timed(plan_again)),
+			('remove', _timed(edit('remove', 0, 'place-3'), restore)),
+			('pin', _timed(edit('pin', 1, 'place-200'), restore)),
+			('swap', _timed(edit('swap', 0, other_day_index=2), restore)),
+		]
+		db_trips.close()
+	print(f'{"operation":>11} {"time [ms]":>10}')
+	for name, elapsed in rows:
+		print(f'{name:>11} {elapsed:>10.1f}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,123 @@
+"""Benchmark: constrained k-means used to split a trip's places into days.
+
+Run from apps/backend: ``uv run python -m benchmarks.kmeans_constrained``.
+"loop" is the previous implementation: per-point Python loops for the
+k-means++ distances and the assignment, one unseeded run. "vectorized"
+assigns every point with one masked argmin; it is timed for one run and
+for SplitForDays' seeded restarts. A tenth of the places is fixed to one
+day and a third may go to two of the K days, like places open on a few
+weekdays only. Inertia is the summed squared distance to the centroids.
+"""
+
+import time
+
+import numpy as np
+
+from src.ml_operations.kmeans_constrained import constrained_kmeans
+from src.route_optimalization.split_for_days import SplitForDays
+
+SIZES = [100, 1000, 5000]
+K = 5
+
+
+def _loop_plusplus(data, k):
+	n, features = data.shape
+	centroids = np.zeros((k, features))
+	centroids[0] = data[np.random.choice(n)]
+	for i in range(1, k):
+		distances = np.array(
+			[min([np.linalg.norm(x - c) for c in centroids[:i]]) for x in data]
+		)
+		probabilities = distances**2 / np.sum(distances**2)
+		centroids[i] = data[np.random.choice(n, p=probabilities)]
+	return centroids
+
+
+def loop_kmeans(data, k, fixed_clusters, flexible_clusters, max_iter=100):
+	n, features = data.shape
+	cluster_assignment = np.full(n, -1)
+	for idx, cluster in fixed_clusters.items():
+		cluster_assignment[idx] = cluster
+	centroids = _loop_plusplus(data, k)
+	for _ in range(max_iter):
+		spatial_distances = np.sqrt(
+			((data[:, np.newaxis, :-1] - centroids[:, :-1]) ** 2).sum(axis=2)
+		)
+		for i in range(n):
+			if i in flexible_clusters:
+				valid_clusters = flexible_clusters[i]
+				valid_distances = spatial_distances[i, valid_clusters]
+				cluster_assignment[i] = valid_clusters[np.argmin(valid_distances)]
+			elif i not in fixed_clusters:
+				cluster_assignment[i] = np.argmin(spatial_distances[i])
+		new_centroids = np.array(
+			[
+				data[cluster_assignment == i].mean(axis=0)
+				if np.any(cluster_assignment == i)
+				else centroids[i]
+				for i in range(k)
+			]
+		)
+		if np.allclose(centroids, new_centroids):
+			break
+		centroids = new_centroids
+	return centroids, cluster_assignment
+
+
+def _problem(count: int):
+	rng = np.random.default_rng(count)
+	data = np.column_stack(
+		[
+			50.06 + rng.uniform(-0.1, 0.1, count),
+			19.94 + rng.uniform(-0.1, 0.1, count),
+			rng.uniform(0, 10, count),
+		]
+	)
+	fixed = {i: int(rng.integers(K)) for i in range(0, count, 10)}
+	flexible = {
+		i: sorted(rng.choice(K, 2, replace=False).tolist())
+		for i in range(1, count, 3)
+		if i not in fixed
+	}
+	return data, fixed, flexible
+
+
+def _inertia(data, centroids, assignment) -> float:
+	return float(((data[:, :-1] - centroids[assignment, :-1]) ** 2).sum())
+
+
+def _timed(function):
+	start = time.perf_counter()
+	result = function()
+	return (time.perf_counter() - start) * 1000, result
+
+
+def main():
+	restarts, seed = SplitForDays.kmeans_restarts, SplitForDays.kmeans_seed
+	print(f'{"places":>7} {"implementation":>22} {"time [ms]":>10} {"inertia":>10}')
+	for size in SIZES:
+		data, fixed, flexible = _problem(size)
+		np.random.seed(size)
+		runs = [
+			('loop, 1 run', lambda: loop_kmeans(data, K, fixed, flexible)),
+			(
+				'vectorized, 1 run',
+				lambda: constrained_kmeans(data, K, fixed, flexible, random_state=seed),
+			),
+			(
+				f'vectorized, {restarts} runs',
+				lambda: constrained_kmeans(
+					data, K, fixed, flexible, n_init=restarts, random_state=seed
+				),
+			),
+		]
+		for name, function in runs:
+			elapsed, (centroids, assignment, *_) = _timed(function)
+			print(
+				f'{size:>7} {name:>22} {elapsed:>10.1f} '
+				f'{_inertia(data, centroids, assignment):>10.5f}'
+			)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,111 @@
+"""Benchmark: cluster-then-route against one VRP over the whole trip.
+
+Run from apps/backend: ``uv run python -m benchmarks.multi_day_routing``.
+A three-day trip over synthetic places around Kraków is planned both ways
+with every PROFILES entry. A third of the places is open on one weekday
+only and every MUST_SEE-th place is a two-hour must-see. Score is the
+summed cumulative rating of the visited places; dropped counts must-see
+places that no day visits.
+"""
+
+import random
+from datetime import date
+from time import perf_counter
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, Period, PlaceInfo, TimePoint
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.multi_day_routing import MultiDayRouting
+from src.route_optimalization.parallel_routing import solve_day
+from src.route_optimalization.routing import get_solver_profile
+from src.route_optimalization.split_for_days import SplitForDays
+
+SIZES = [30, 60, 120]
+PROFILES = ['fast', 'balanced']
+MUST_SEE = 5
+FROM_DATE, TO_DATE = date(2024, 6, 3), date(2024, 6, 5)
+
+
+def _trip(count: int) -> Places:
+	city = City.get_const_krakow()
+	rng = random.Random(count)
+	weekdays = SplitForDays.get_weekday_indices(FROM_DATE, TO_DATE)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				city.lat + rng.uniform(-0.03, 0.03), city.lng + rng.uniform(-0.03, 0.03)
+			),
+			estimatedTime=rng.choice([30, 60, 90]),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		if i % 3 == 0:
+			open_on = rng.choice(weekdays)
+			for day in range(7):
+				if day != open_on:
+					place.regularOpeningHours.periods[day] = Period(close=TimePoint(0))
+		if i % MUST_SEE == 0:
+			place.estimatedTime = 120
+			place.ratings.statisticalRating = 4.8
+			place.types = ['tourist_attraction']
+		places.append(place)
+	return Places(places, city)
+
+
+def _outcome(trip: Places, days: list[Places]) -> tuple[float, int, int]:
+	visited = {place.placeInfo.id for day in days for place in day.get_list()}
+	score = sum(
+		trip.get_place_by_id(place_id).ratings.cumulative_rating for place_id in visited
+	)
+	dropped = sum(
+		place.must_see and place.placeInfo.id not in visited
+		for place in trip.get_list()
+	)
+	return score, len(visited), dropped
+
+
+def two_stage(trip: Places, depot: Place, profile: str) -> list[Places]:
+	split = SplitForDays(FROM_DATE, TO_DATE, trip)
+	profile = get_solver_profile(profile)
+	return [
+		solve_day(day, depot, period_index, profile)[0]
+		for day, period_index in zip(split.split(), split.weekday_indices)
+	]
+
+
+def one_vrp(trip: Places, depot: Place, profile: str) -> list[Places]:
+	weekdays = SplitForDays.get_weekday_indices(FROM_DATE, TO_DATE)
+	routing = MultiDayRouting(trip, depot, weekdays, profile=profile)
+	return [route for route, _ in routing.get_day_routes()]
+
+
+def main():
+	depot = TripInfo(city=City.get_const_krakow()).hotel
+	rows = []
+	for size in SIZES:
+		trip = _trip(size)
+		must_see = sum(place.must_see for place in trip.get_list())
+		for profile in PROFILES:
+			for name, planner in (('two-stage', two_stage), ('one VRP', one_vrp)):
+				start = perf_counter()
+				days = planner(trip, depot, profile)
+				elapsed = (perf_counter() - start) * 1000
+				rows.append(
+					(size, must_see, profile, name, elapsed, *_outcome(trip, days))
+				)
+	print(
+		f'{"places":>7} {"must-see":>9} {"profile":>9} {"planner":>10} {"wall [ms]":>10} '
+		f'{"score":>7} {"visited":>8} {"dropped":>8}'
+	)
+	for size, must_see, profile, name, elapsed, score, visited, dropped in rows:
+		print(
+			f'{size:>7} {must_see:>9} {profile:>9} {name:>10} {elapsed:>10.0f} '
+			f'{score:>7.2f} {visited:>8} {dropped:>8}'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,58 @@
+"""Benchmark: OSRM travel times per pair (/route) vs one /table request.
+
+Run from apps/backend: ``uv run python -m benchmarks.osrm_table``.
+Uses the local OSRM stub with DELAY seconds per request, roughly a round
+trip to a server on another host. Places are spread over ~30 km around
+Kraków so most pairs are long car trips sent to OSRM.
+"""
+
+import random
+import threading
+import time
+
+from src.data_model.city.city import City
+from src.data_model.place.place_subclasses import Location
+from src.travel_time import travel_estimator
+from src.travel_time.osrm import OSRMClient
+from src.travel_time.osrm_stub import OSRMStub
+
+SIZES = [10, 20, 50]
+DELAY = 0.005
+
+
+def _time(
+	client: OSRMClient, locations: list[Location], city: City
+) -> tuple[float, int]:
+	travel_estimator.osrm = client
+	requests = client.requests
+	start = time.perf_counter()
+	travel_estimator.get_estimated_time_matrix(locations, city)
+	return time.perf_counter() - start, client.requests - requests
+
+
+def main():
+	server = OSRMStub(delay=DELAY)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	city = City.get_const_krakow()
+	rng = random.Random(0)
+	print(
+		f'{"places":>7} {"route [ms]":>11} {"requests":>9} {"table [ms]":>11} {"requests":>9} {"cached [ms]":>12}'
+	)
+	for size in SIZES:
+		locations = [
+			Location(50.06 + rng.uniform(-0.15, 0.15), 19.94 + rng.uniform(-0.2, 0.2))
+			for _ in range(size)
+		]
+		route, route_requests = _time(OSRMClient(server.url, 'route'), locations, city)
+		table_client = OSRMClient(server.url, 'table')
+		table, table_requests = _time(table_client, locations, city)
+		cached, _ = _time(table_client, locations, city)
+		print(
+			f'{size:>7} {route * 1000:>11.1f} {route_requests:>9} '
+			f'{table * 1000:>11.1f} {table_requests:>9} {cached * 1000:>12.1f}'
+		)
+	server.shutdown()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,69 @@
+"""Benchmark: per-day route solving, serial vs on the routing process pool.
+
+Run from apps/backend: ``uv run python -m benchmarks.parallel_routing``.
+Each day is a separate VRP over PER_DAY synthetic places around Kraków. The
+pool is started once before timing, as it is in the long-running server, so
+the numbers compare steady-state solves only.
+"""
+
+import os
+import random
+import time
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.parallel_routing import DaySolver
+
+DAYS = [3, 5, 10]
+PER_DAY = 10
+WORKERS = int(os.getenv('ROUTING_WORKERS') or min(4, os.cpu_count() or 1))
+
+
+def _days(count: int) -> list[Places]:
+	city = City.get_const_krakow()
+	rng = random.Random(count)
+	days = []
+	for day in range(count):
+		places = []
+		for i in range(PER_DAY):
+			place = Place(
+				placeInfo=PlaceInfo(id=f'{day}-{i}', displayName=f'Place {day}-{i}'),
+				location=Location(
+					city.lat + rng.uniform(-0.03, 0.03),
+					city.lng + rng.uniform(-0.03, 0.03),
+				),
+			)
+			place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+			places.append(place)
+		days.append(Places(places, city))
+	return days
+
+
+def _time(solver: DaySolver, days: list[Places], depot: Place) -> float:
+	start = time.perf_counter()
+	list(solver.solve(days, depot, [i % 7 for i in range(len(days))]))
+	return time.perf_counter() - start
+
+
+def main():
+	depot = TripInfo(city=City.get_const_krakow()).hotel
+	serial = DaySolver(workers=1)
+	pool = DaySolver(workers=max(WORKERS, 2))
+	_time(pool, _days(2), depot)
+	print(f'{os.cpu_count()} CPUs, {pool.workers} workers, {PER_DAY} places per day')
+	print(f'{"days":>5} {"serial [s]":>11} {"pool [s]":>9} {"speedup":>8}')
+	for count in DAYS:
+		days = _days(count)
+		serial_time = _time(serial, days, depot)
+		pool_time = _time(pool, days, depot)
+		print(
+			f'{count:>5} {serial_time:>11.2f} {pool_time:>9.2f} {serial_time / pool_time:>7.2f}x'
+		)
+	pool.shutdown()
+
+
+if __name__ == '__main__':
+	main()
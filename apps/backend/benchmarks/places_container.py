@@ -0,0 +1,86 @@
+"""Benchmark: positional access and feature extraction on Places.
+
+Run from apps/backend: ``uv run python -m benchmarks.places_container``.
+"dict" is the previous container: an OrderedDict whose get_by_index built
+``list(values())`` on every call. Indexing every place in a loop, as
+Routing and SplitForDays do, was quadratic; the clustering features were
+built place by place. Columns cost the same to build once, then repeated
+reads are free until the container changes.
+"""
+
+import random
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+
+SIZES = [100, 1000, 5000]
+
+
+def _places(count: int) -> list[Place]:
+	rng = random.Random(count)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}'),
+			location=Location(
+				50.06 + rng.uniform(-0.1, 0.1), 19.94 + rng.uniform(-0.1, 0.1)
+			),
+		)
+		place.ratings.cumulative_rating = rng.random()
+		places.append(place)
+	return places
+
+
+def _timed(function) -> float:
+	start = time.perf_counter()
+	function()
+	return (time.perf_counter() - start) * 1000
+
+
+def main():
+	print(
+		f'{"places":>7} {"index dict [ms]":>16} {"index list [ms]":>16} {"features loop [ms]":>19} {"columns [ms]":>13} {"cached [ms]":>12}'
+	)
+	for size in SIZES:
+		place_list = _places(size)
+		by_id = OrderedDict((place.placeInfo.id, place) for place in place_list)
+		places = Places(place_list)
+
+		index_dict = _timed(lambda: [list(by_id.values())[i] for i in range(size)])
+		index_list = _timed(lambda: [places.get_by_index(i) for i in range(size)])
+		features_loop = _timed(
+			lambda: np.array(
+				[
+					[
+						p.location.latitude,
+						p.location.longitude,
+						p.ratings.cumulative_rating * 10,
+					]
+					for p in by_id.values()
+				]
+			)
+		)
+		places.refresh_columns()
+		features_columns = _timed(
+			lambda: np.column_stack(
+				[places.latitudes, places.longitudes, places.ratings * 10]
+			)
+		)
+		cached = _timed(
+			lambda: np.column_stack(
+				[places.latitudes, places.longitudes, places.ratings * 10]
+			)
+		)
+		print(
+			f'{size:>7} {index_dict:>16.2f} {index_list:>16.2f} '
+			f'{features_loop:>19.2f} {features_columns:>13.2f} {cached:>12.2f}'
+		)
+
+
+if __name__ == '__main__':
+	main()
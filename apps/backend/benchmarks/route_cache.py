@@ -0,0 +1,65 @@
+"""Benchmark: solving a day against reusing it from the route cache.
+
+Run from apps/backend: ``uv run python -m benchmarks.route_cache``.
+A day of SIZES synthetic places around Kraków is solved once ('solve',
+which includes estimating the time matrix), then requested again from the
+same process ('memory') and from a fresh cache reading the persisted
+routes, like a routing worker process would ('disk').
+"""
+
+import random
+import tempfile
+import time
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization import parallel_routing
+from src.route_optimalization.route_cache import RouteCache
+
+SIZES = [10, 30, 60]
+
+
+def _day(count: int) -> Places:
+	city = City.get_const_krakow()
+	rng = random.Random(count)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				city.lat + rng.uniform(-0.03, 0.03), city.lng + rng.uniform(-0.03, 0.03)
+			),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	return Places(places, city)
+
+
+def _timed(function) -> float:
+	start = time.perf_counter()
+	function()
+	return (time.perf_counter() - start) * 1000
+
+
+def main():
+	depot = TripInfo(city=City.get_const_krakow()).hotel
+	rows = []
+	with tempfile.TemporaryDirectory() as directory:
+		for size in SIZES:
+			day = _day(size)
+			parallel_routing.route_cache = RouteCache(directory=directory)
+			solve = _timed(lambda: parallel_routing.solve_day(day, depot, 1, 'fast'))
+			memory = _timed(lambda: parallel_routing.solve_day(day, depot, 1, 'fast'))
+			parallel_routing.route_cache = RouteCache(directory=directory)
+			disk = _timed(lambda: parallel_routing.solve_day(day, depot, 1, 'fast'))
+			rows.append((size, solve, memory, disk))
+	print(f'{"places":>7} {"solve [ms]":>11} {"memory [ms]":>12} {"disk [ms]":>10}')
+	for size, solve, memory, disk in rows:
+		print(f'{size:>7} {solve:>11.1f} {memory:>12.2f} {disk:>10.2f}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,56 @@
+"""Benchmark: latency and route quality of the routing solver profiles.
+
+Run from apps/backend: ``uv run python -m benchmarks.solver_profiles``.
+One day with SIZES synthetic places around Kraków is solved with every
+profile. Lower objective is better: travel time plus the penalties of the
+places left out.
+"""
+
+import random
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.routing import SOLVER_PROFILES, Routing
+
+SIZES = [15, 30, 60]
+
+
+def _day(count: int) -> Places:
+	city = City.get_const_krakow()
+	rng = random.Random(count)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				city.lat + rng.uniform(-0.03, 0.03), city.lng + rng.uniform(-0.03, 0.03)
+			),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	return Places(places, city)
+
+
+def main():
+	depot = TripInfo(city=City.get_const_krakow()).hotel
+	rows = []
+	for size in SIZES:
+		for name in SOLVER_PROFILES:
+			routing = Routing(_day(size), depot=depot, profile=name)
+			route, _ = routing.get_routes()
+			rows.append((size, name, routing.stats, route.count))
+	print(
+		f'{"places":>7} {"profile":>9} {"wall [ms]":>10} {"best at [ms]":>13} {"objective":>10} {"visited":>8}'
+	)
+	for size, name, stats, visited in rows:
+		print(
+			f'{size:>7} {name:>9} {stats["wall_ms"]:>10.0f} {stats["best_found_ms"]:>13.0f} '
+			f'{stats["objective"]:>10} {visited:>8}'
+		)
+
+
+if __name__ == '__main__':
+	main()
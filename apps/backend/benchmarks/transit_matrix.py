@@ -0,0 +1,78 @@
+"""Benchmark: transit times as a native OR-Tools matrix vs a Python callback.
+
+Run from apps/backend: ``uv run python -m benchmarks.transit_matrix``.
+Solves one day of SIZES synthetic places with both registrations. With the
+'fast' profile both reach the same route and the wall time shows the cost
+of the callbacks; with the time-limited 'balanced' profile both get the
+same deadline and the objective shows what the saved time buys.
+"""
+
+import random
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.routing import Routing
+
+SIZES = [50, 80, 120]
+
+
+class CallbackRouting(Routing):
+	"""The previous registration: a Python closure called for every arc."""
+
+	def _register_transit(self, manager, routing):
+		def time_callback(from_index, to_index):
+			from_node = manager.IndexToNode(from_index)
+			to_node = manager.IndexToNode(to_index)
+			time_spend = (
+				0
+				if from_node == 0
+				else self.places.get_by_index(from_node - 1).estimatedTime
+			)
+			return self.matrix[from_node][to_node] + time_spend
+
+		return routing.RegisterTransitCallback(time_callback)
+
+
+def _day(count: int) -> Places:
+	city = City.get_const_krakow()
+	rng = random.Random(count)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				city.lat + rng.uniform(-0.03, 0.03), city.lng + rng.uniform(-0.03, 0.03)
+			),
+			estimatedTime=rng.choice([30, 60, 90]),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	return Places(places, city)
+
+
+def main():
+	depot = TripInfo(city=City.get_const_krakow()).hotel
+	rows = []
+	for size in SIZES:
+		for profile in ('fast', 'balanced'):
+			for name, routing_class in (
+				('callback', CallbackRouting),
+				('matrix', Routing),
+			):
+				routing = routing_class(_day(size), depot=depot, profile=profile)
+				routing.get_routes()
+				rows.append((size, profile, name, routing.stats))
+	print(
+		f'{"places":>7} {"profile":>9} {"transit":>9} {"wall [ms]":>10} {"objective":>10}'
+	)
+	for size, profile, name, stats in rows:
+		print(
+			f'{size:>7} {profile:>9} {name:>9} {stats["wall_ms"]:>10.0f} {stats["objective"]:>10}'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,51 @@
+"""Benchmark: Routing's travel-time matrix, per-pair loop vs batch API.
+
+Run from apps/backend: ``uv run python -m benchmarks.travel_matrix``.
+Places are spread over ~20 km so both the foot and the car model are used.
+No city is passed, so long car trips use the model instead of OSRM and the
+numbers measure the estimator only.
+"""
+
+import random
+import time
+
+from src.data_model.place.place_subclasses import Location
+from src.travel_time import travel_estimator
+
+SIZES = [20, 50, 100, 200]
+
+
+def _per_pair(locations: list[Location]) -> list[list[int]]:
+	size = len(locations)
+	times = [[0] * size for _ in range(size)]
+	for i, start in enumerate(locations):
+		for j, end in enumerate(locations):
+			if i != j:
+				times[i][j] = times[j][i] = travel_estimator.get_estimated_time(
+					start, end
+				)[0]
+	return times
+
+
+def main():
+	rng = random.Random(0)
+	print(f'{"places":>7} {"per pair [ms]":>14} {"batch [ms]":>11} {"speedup":>8}')
+	for size in SIZES:
+		locations = [
+			Location(50.06 + rng.uniform(-0.1, 0.1), 19.94 + rng.uniform(-0.1, 0.1))
+			for _ in range(size)
+		]
+		start = time.perf_counter()
+		expected = _per_pair(locations)
+		per_pair = time.perf_counter() - start
+		start = time.perf_counter()
+		times, _ = travel_estimator.get_estimated_time_matrix(locations)
+		batch = time.perf_counter() - start
+		assert times.tolist() == expected
+		print(
+			f'{size:>7} {per_pair * 1000:>14.1f} {batch * 1000:>11.2f} {per_pair / batch:>7.0f}x'
+		)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,88 @@
+"""Benchmark: trip writes with a full trips.json rewrite vs the append-only log.
+
+Run from apps/backend: ``uv run python -m benchmarks.trip_store``.
+For each history size the store is seeded, reopened (index rebuild) and
+timed on WRITES saves and ratings. The legacy column re-implements the old
+load-modify-rewrite of trips.json for comparison.
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from src.data_model.city.city import City
+from src.database import DataBaseTrips
+from src.database.trip_database import _encode
+
+SIZES = [1000, 10000, 100000]
+WRITES = 200
+LEGACY_WRITES = 5
+
+
+def _trip(i: int) -> dict:
+	places = [
+		{'id': f'place-{i}-{j}', 'name': f'Place {j}', 'time': 60} for j in range(8)
+	]
+	return {
+		'id': f'trip-{i}',
+		'days': [{'places': places}, {'places': places}],
+		'days_len': 2,
+		'city_id': 1616172264,
+		'city_name': 'Kraków',
+	}
+
+
+def _legacy_save(path: Path, trip: dict):
+	with open(path, 'r', encoding='utf-8') as handle:
+		data = json.load(handle)
+	trips = [t for t in data['trips'] if t.get('id') != trip['id']]
+	trips.append(trip)
+	data['trips'] = trips
+	with open(path, 'w', encoding='utf-8') as handle:
+		json.dump(data, handle)
+
+
+def main():
+	city = City.get_const_krakow()
+	print(
+		f'{"trips":>8} {"legacy save [ms]":>17} {"log save [ms]":>14}'
+		f' {"log rating [ms]":>16} {"reopen [ms]":>12}'
+	)
+	for size in SIZES:
+		with tempfile.TemporaryDirectory() as tmp:
+			legacy_path = Path(tmp) / 'trips.json'
+			with open(legacy_path, 'w', encoding='utf-8') as handle:
+				json.dump({'trips': [_trip(i) for i in range(size)]}, handle)
+			start = time.perf_counter()
+			for i in range(LEGACY_WRITES):
+				_legacy_save(legacy_path, _trip(size + i))
+			legacy = (time.perf_counter() - start) / LEGACY_WRITES
+
+			store_path = Path(tmp) / 'log'
+			store_path.mkdir()
+			with open(store_path / 'trips.log', 'wb') as handle:
+				for i in range(size):
+					handle.write(_encode({'op': 'put', 'trip': _trip(i)}))
+			start = time.perf_counter()
+			db = DataBaseTrips(store_path)
+			reopen = time.perf_counter() - start
+
+			start = time.perf_counter()
+			for i in range(WRITES):
+				db.save_trip_history(city, _trip(size + i))
+			save = (time.perf_counter() - start) / WRITES
+			start = time.perf_counter()
+			for i in range(WRITES):
+				db.set_trip_rating(f'trip-{i}', 1, 3, 4.0)
+			rating = (time.perf_counter() - start) / WRITES
+
+			print(
+				f'{size:>8} {legacy * 1000:>17.2f} {save * 1000:>14.3f}'
+				f' {rating * 1000:>16.3f} {reopen * 1000:>12.1f}'
+			)
+			db.close()
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,56 @@
+"""Benchmark: concurrent trip ratings under different group-commit windows.
+
+Run from apps/backend: ``uv run python -m benchmarks.trip_writes``.
+THREADS writers rate places of one stored trip, like a burst of rating
+requests on the waitress thread pool. A single writer gets one fsync per
+rating; concurrent writers share fsyncs when their ratings land in the
+same commit window.
+"""
+
+import tempfile
+import threading
+import time
+
+from src.data_model.city.city import City
+from src.database import DataBaseTrips
+
+RATINGS = 2000
+THREADS = [1, 16]
+WINDOWS_MS = [0, 1, 5]
+
+
+def _run(threads: int, window_ms: float) -> tuple[float, float]:
+	with tempfile.TemporaryDirectory() as tmp:
+		with DataBaseTrips(tmp, commit_window=window_ms / 1000) as db:
+			places = [{'id': f'place-{i}'} for i in range(100)]
+			trip_id = db.save_trip_history(
+				City.get_const_krakow(), {'days': [{'places': places}]}
+			)
+			commits = db.commits
+
+			def rate(worker: int):
+				for i in range(worker, RATINGS, threads):
+					db.set_trip_rating(trip_id, 0, i % 100, i % 5)
+
+			workers = [threading.Thread(target=rate, args=(i,)) for i in range(threads)]
+			start = time.perf_counter()
+			for worker in workers:
+				worker.start()
+			for worker in workers:
+				worker.join()
+			elapsed = time.perf_counter() - start
+			return RATINGS / elapsed, RATINGS / (db.commits - commits)
+
+
+def main():
+	print(f'{"threads":>8} {"window [ms]":>12} {"ratings/s":>10} {"ratings/fsync":>14}')
+	for threads in THREADS:
+		for window_ms in WINDOWS_MS:
+			throughput, per_commit = _run(threads, window_ms)
+			print(
+				f'{threads:>8} {window_ms:>12} {throughput:>10.0f} {per_commit:>14.1f}'
+			)
+
+
+if __name__ == '__main__':
+	main()
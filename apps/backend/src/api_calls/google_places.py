@@ -1,20 +1,48 @@
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-import requests
 from dotenv import load_dotenv
 from requests import Response
 
+from src.api_calls.http_client import http_client
+from src.api_calls.response_cache import ResponseCache
 from src.constants import all_categories, default_categories, excluded_categories
 from src.data_model import City, Places
 from src.data_model.place.place import PlaceCreator, PlaceCreatorAPI
 from src.data_model.place.place_visitor import RestaurantVisitor, Visitor
 from src.path import get_path
 from src.rating.statistical_rating import StatisticalRating
+from src.travel_time.travel_matrix import city_travel_matrix
 
 load_dotenv()
 
+# Base URL of the Places API; override via GOOGLE_PLACES_API_URL to point at a stub.
+PLACES_API_URL = (
+	os.getenv('GOOGLE_PLACES_API_URL') or 'https://places.googleapis.com/v1'
+)
+# Cap on the nearby searches get_places_for_city issues at once (1 = serial); the
+# pool has one thread per search up to it, so the default sends all
+# 1 + len(all_categories) searches of a city in a single wave.
+PLACES_SEARCH_WORKERS = int(os.getenv('PLACES_SEARCH_WORKERS') or 32)
+# Nearby search locations are rounded to this many decimals (3 ~ 100 m) for caching.
+PLACES_CACHE_GRID = int(os.getenv('PLACES_CACHE_GRID') or 3)
+
+
+def _default_cache_dir() -> Path:
+	data_dir = os.getenv('DATA_DIR') or Path(__file__).resolve().parents[2] / 'data'
+	return Path(data_dir) / 'cache' / 'nearby_search'
+
+
+nearby_search_cache = ResponseCache(
+	directory=os.getenv('PLACES_CACHE_DIR') or _default_cache_dir(),
+	ttl=float(os.getenv('PLACES_CACHE_TTL') or 7 * 24 * 3600),
+	max_bytes=int(os.getenv('PLACES_CACHE_MAX_BYTES') or 256 * 1024 * 1024),
+	mode=os.getenv('PLACES_CACHE_MODE') or 'on',
+)
+
 
 def get_one_attraction_by_id(place_id: str, fields: str = '*') -> dict:
 	"""Debug function that makes a request to Google Places API.
@@ -23,11 +51,43 @@ def get_one_attraction_by_id(place_id: str, fields: str = '*') -> dict:
 	:param fields: fields to be returned
 	:return: response from Google Places API
 	"""
-	url = f'https://places.googleapis.com/v1/places/{place_id}?fields={fields}&key={os.getenv("GOOGLE_PLACES_API_KEY")}'
-	response = requests.get(url)
+	url = f'{PLACES_API_URL}/places/{place_id}?fields={fields}&key={os.getenv("GOOGLE_PLACES_API_KEY")}'
+	response = http_client.get(url)
 	return response.json()
 
 
+def _types_key(types) -> list[str] | None:
+	if types is None:
+		return None
+	if isinstance(types, str):
+		return [types]
+	return sorted(types)
+
+
+def nearby_search_request_key(
+	location,
+	included_primary_types,
+	included_types,
+	excluded_types,
+	radius,
+	field_mask='*',
+	max_result_count=20,
+) -> dict:
+	"""Normalized form of a nearby search used as the cache key."""
+	return {
+		'location': [
+			round(float(location[0]), PLACES_CACHE_GRID),
+			round(float(location[1]), PLACES_CACHE_GRID),
+		],
+		'includedPrimaryTypes': _types_key(included_primary_types),
+		'includedTypes': _types_key(included_types),
+		'excludedTypes': _types_key(excluded_types),
+		'radius': radius,
+		'fieldMask': field_mask,
+		'maxResultCount': max_result_count,
+	}
+
+
 def nearby_search(
 	location,
 	included_primary_types=None,
@@ -37,6 +97,9 @@ def nearby_search(
 ) -> Response:
 	"""Function that makes a nearby search request to Google Places API.
 
+	Successful responses are kept in nearby_search_cache, keyed by the
+	normalized request, so the same query is sent to Google only once per TTL.
+
 	:param included_types: list of included types
 	:param included_primary_types: list of included primary types
 	:param location: location of the city
@@ -45,11 +108,12 @@ def nearby_search(
 	:return: response from Google Places API
 	"""
 	max_result_count = 20
-	url = 'https://places.googleapis.com/v1/places:searchNearby'
+	field_mask = '*'
+	url = f'{PLACES_API_URL}/places:searchNearby'
 	api_key = os.getenv('GOOGLE_PLACES_API_KEY')
 	headers = {
 		'X-Goog-Api-Key': api_key,
-		'X-Goog-FieldMask': '*',
+		'X-Goog-FieldMask': field_mask,
 		'Content-Type': 'application/json',
 	}
 
@@ -74,8 +138,22 @@ def nearby_search(
 	if included_types is None:
 		data.pop('includedTypes')
 
-	response = requests.post(url, headers=headers, data=json.dumps(data))
-	return response
+	cache_key = nearby_search_request_key(
+		location,
+		included_primary_types,
+		included_types,
+		excluded_types,
+		radius,
+		field_mask,
+		max_result_count,
+	)
+	return nearby_search_cache.fetch(
+		cache_key,
+		# a nearby search only reads, so it is safe to send again
+		lambda: http_client.post(
+			url, headers=headers, data=json.dumps(data), idempotent=True
+		),
+	)
 
 
 def get_restaurants_for_city(
@@ -111,6 +189,25 @@ def get_restaurants_for_city(
 	return places
 
 
+def _fetch_search_results(search_kwargs: list[dict], max_workers: int) -> list[dict]:
+	"""Run nearby searches with one thread per search, at most max_workers.
+
+	Results are returned in the order of search_kwargs regardless of which
+	request finishes first.
+	"""
+	if max_workers <= 1 or len(search_kwargs) <= 1:
+		return [nearby_search(**kwargs).json() for kwargs in search_kwargs]
+	with ThreadPoolExecutor(
+		max_workers=min(max_workers, len(search_kwargs)),
+		thread_name_prefix='nearby-search',
+	) as executor:
+		futures = [
+			executor.submit(lambda kw: nearby_search(**kw).json(), kwargs)
+			for kwargs in search_kwargs
+		]
+		return [future.result() for future in futures]
+
+
 def get_places_for_city(
 	db,
 	city: City,
@@ -118,16 +215,21 @@ def get_places_for_city(
 	placeVisitor: type[Visitor],
 	search_categories=all_categories,
 	save_raw=False,
+	max_workers: int | None = None,
 ) -> Places:
 	"""Function that gets places from Google Places API.
 
+	The tourist_attraction search and one search per category are sent
+	concurrently; the responses are processed in that same order, so the
+	result does not depend on network timing.
+
 	:param db: database_module
 	:param city: city
-	:param open_ai_client: OpenAIClient
 	:param placeCreator: PlaceCreator
 	:param placeVisitor: Visitor
 	:param search_categories: list of search categories
 	:param save_raw: bool
+	:param max_workers: cap on parallel requests, defaults to PLACES_SEARCH_WORKERS
 	:return: Places
 	"""
 	places_list = []
@@ -148,21 +250,26 @@ def get_places_for_city(
 		except KeyError:
 			logging.exception('KeyError: %s', search_results)
 
-	process_search_results(
-		nearby_search(
-			location=(city.lat, city.lng),
-			included_types=['tourist_attraction'],
-			excluded_types=excluded_categories,
-			radius=city.get_radius(),
-		).json()
-	)
+	searches = [
+		{
+			'location': (city.lat, city.lng),
+			'included_types': ['tourist_attraction'],
+			'excluded_types': excluded_categories,
+			'radius': city.get_radius(),
+		}
+	]
 	for category in search_categories:
-		search_results = nearby_search(
-			location=(city.lat, city.lng),
-			included_primary_types=category,
-			excluded_types=excluded_categories,
-			radius=city.get_radius(),
-		).json()
+		searches.append(
+			{
+				'location': (city.lat, city.lng),
+				'included_primary_types': category,
+				'excluded_types': excluded_categories,
+				'radius': city.get_radius(),
+			}
+		)
+	if max_workers is None:
+		max_workers = PLACES_SEARCH_WORKERS
+	for search_results in _fetch_search_results(searches, max_workers):
 		process_search_results(search_results)
 	if save_raw:
 		with open(get_path('raw.json', 'data'), 'w') as f:
@@ -172,4 +279,9 @@ def get_places_for_city(
 
 	if db is not None:
 		placeVisitor.save_places_to_database(db, places, city, default_categories)
+		try:
+			city_travel_matrix.add_places(city, places.get_list())
+		except Exception:
+			# Routing estimates the travel times online when the matrix is missing
+			logging.exception('Could not update the travel matrix of %s', city.name)
 	return places
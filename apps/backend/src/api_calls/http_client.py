@@ -0,0 +1,185 @@
+"""Shared HTTP client for all outbound API calls.
+
+One ``requests.Session`` keeps a keep-alive connection pool per host, so
+repeated calls to Google Places or llama reuse TCP/TLS connections.
+Every request gets a default timeout, retries transient failures with
+exponential backoff and is timed into per-host latency counters. Only
+idempotent requests are retried after they may have reached the server;
+other POSTs are retried only when the connection could not be opened.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+load_dotenv()
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+def _env_float(name: str, default: float) -> float:
+	return float(os.getenv(name) or default)
+
+
+def _not_sent(exc: requests.RequestException) -> bool:
+	"""Whether the request failed before a connection to the server was opened."""
+	if isinstance(exc, requests.ConnectTimeout):
+		return True
+	reason = getattr(exc.args[0], 'reason', None) if exc.args else None
+	return isinstance(exc, requests.ConnectionError) and isinstance(
+		reason, NewConnectionError
+	)
+
+
+@dataclass
+class HostStats:
+	"""Latency counters for one host.
+
+	Attributes:
+	:param requests: int - number of attempts sent to the host
+	:param errors: int - attempts that raised or returned a retryable status
+	:param retries: int - attempts that were retried
+	:param total_ms: float - summed latency of all attempts
+	:param max_ms: float - slowest attempt
+	"""
+
+	requests: int = 0
+	errors: int = 0
+	retries: int = 0
+	total_ms: float = 0.0
+	max_ms: float = 0.0
+
+	def to_dict(self):
+		return {
+			'requests': self.requests,
+			'errors': self.errors,
+			'retries': self.retries,
+			'avg_ms': self.total_ms / self.requests if self.requests else 0.0,
+			'max_ms': self.max_ms,
+		}
+
+
+class HttpClient:
+	"""Pooled HTTP client with default timeouts, retries and latency stats.
+
+	Methods:
+	request(method, url, ...) - send a request through the shared session
+	get(url, ...) / post(url, ...) - shortcuts for request()
+	stats() - per-host latency counters
+	"""
+
+	def __init__(
+		self,
+		timeout: float | tuple[float, float] | None = None,
+		retries: int | None = None,
+		backoff_factor: float | None = None,
+		pool_maxsize: int | None = None,
+	):
+		self.timeout = timeout or (
+			_env_float('HTTP_CONNECT_TIMEOUT', 5),
+			_env_float('HTTP_READ_TIMEOUT', 30),
+		)
+		self.retries = (
+			int(os.getenv('HTTP_RETRIES') or 2) if retries is None else retries
+		)
+		self.backoff_factor = (
+			_env_float('HTTP_BACKOFF', 0.2)
+			if backoff_factor is None
+			else backoff_factor
+		)
+		pool_maxsize = pool_maxsize or int(os.getenv('HTTP_POOL_SIZE') or 32)
+		self.session = requests.Session()
+		adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+		self.session.mount('http://', adapter)
+		self.session.mount('https://', adapter)
+		self._stats: dict[str, HostStats] = {}
+		self._lock = threading.Lock()
+
+	def _record(self, host: str, elapsed_ms: float, error: bool, retried: bool):
+		with self._lock:
+			stats = self._stats.setdefault(host, HostStats())
+			stats.requests += 1
+			stats.total_ms += elapsed_ms
+			stats.max_ms = max(stats.max_ms, elapsed_ms)
+			stats.errors += int(error)
+			stats.retries += int(retried)
+
+	def request(
+		self,
+		method: str,
+		url: str,
+		timeout: float | tuple[float, float] | None = None,
+		retries: int | None = None,
+		idempotent: bool | None = None,
+		**kwargs,
+	) -> requests.Response:
+		"""Send a request, retrying connection errors and retryable statuses.
+
+		A request that is not idempotent is retried only if the connection
+		could not be opened, since after a read timeout or a 5xx the server
+		may already have processed it.
+
+		:param method: HTTP method
+		:param url: full URL
+		:param timeout: overrides the default (connect, read) timeout
+		:param retries: overrides the default number of retries
+		:param idempotent: whether sending the request twice is safe, by default true for IDEMPOTENT_METHODS
+		:return: the last response; the last exception is re-raised
+		"""
+		host = urlsplit(url).netloc
+		timeout = self.timeout if timeout is None else timeout
+		retries = self.retries if retries is None else retries
+		if idempotent is None:
+			idempotent = method.upper() in IDEMPOTENT_METHODS
+		attempt = 0
+		while True:
+			start = time.perf_counter()
+			try:
+				response = self.session.request(method, url, timeout=timeout, **kwargs)
+			except (requests.ConnectionError, requests.Timeout) as exc:
+				can_retry = attempt < retries and (idempotent or _not_sent(exc))
+				self._record(
+					host, (time.perf_counter() - start) * 1000, True, can_retry
+				)
+				if not can_retry:
+					raise
+			else:
+				failed = response.status_code in RETRY_STATUSES
+				can_retry = failed and idempotent and attempt < retries
+				self._record(
+					host, (time.perf_counter() - start) * 1000, failed, can_retry
+				)
+				if not can_retry:
+					return response
+				response.close()
+			delay = self.backoff_factor * 2**attempt
+			logging.warning('Retrying %s %s in %.2fs', method, host, delay)
+			time.sleep(delay)
+			attempt += 1
+
+	def get(self, url: str, **kwargs) -> requests.Response:
+		return self.request('GET', url, **kwargs)
+
+	def post(self, url: str, **kwargs) -> requests.Response:
+		return self.request('POST', url, **kwargs)
+
+	def stats(self) -> dict[str, dict]:
+		"""Return a snapshot of the per-host counters."""
+		with self._lock:
+			return {host: stats.to_dict() for host, stats in self._stats.items()}
+
+	def reset_stats(self):
+		with self._lock:
+			self._stats.clear()
+
+
+http_client = HttpClient()
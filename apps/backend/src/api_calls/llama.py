@@ -5,8 +5,7 @@ import re
 from collections import Counter
 from typing import Any, Iterable
 
-import requests
-
+from src.api_calls.http_client import http_client
 from src.data_model.places.places import Places
 from src.constants import all_categories, default_categories, default_subcategories
 from src.constants import dining_subcategories
@@ -36,6 +35,8 @@ SUMMARY_PROMPT = """
 class Llama:
 	# In Docker the LLM container is reachable as `llama`; override via LLAMA_API_URL for host runs.
 	API_URL = os.getenv('LLAMA_API_URL', 'http://llama:3000/v1/chat/completions')
+	# (connect, read) seconds; generation on CPU is slow, so the read timeout is generous.
+	SUMMARY_TIMEOUT = (5, 60)
 
 	CATEGORY_RULES = [
 		(
@@ -208,13 +209,16 @@ class Llama:
 		]
 
 		try:
-			response = requests.post(
+			response = http_client.post(
 				cls.API_URL,
 				json={
 					'messages': modified_messages,
 					'max_tokens': 180,
 					'temperature': 0.2,
 				},
+				timeout=cls.SUMMARY_TIMEOUT,
+				# a replayed completion could block a worker for minutes
+				retries=0,
 			)
 
 			if response.encoding is None:
@@ -310,7 +314,7 @@ class Llama:
 			'Use only known categories and subcategories. If unsure, leave empty arrays.'
 		)
 		try:
-			response = requests.post(
+			response = http_client.post(
 				cls.API_URL,
 				json={
 					'messages': [
@@ -321,6 +325,7 @@ class Llama:
 					'temperature': 0.2,
 				},
 				timeout=10,
+				retries=0,
 			)
 			if response.encoding is None:
 				response.encoding = 'utf-8'
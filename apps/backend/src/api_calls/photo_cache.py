@@ -0,0 +1,116 @@
+"""Disk-backed LRU store for place photos with single-flight fetching."""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from src.api_calls.response_cache import ResponseCache
+
+
+class PhotoFetchError(Exception):
+	"""Upstream photo request failed; carries the status to return to the client."""
+
+	def __init__(self, status: int, message: str):
+		super().__init__(message)
+		self.status = status
+		self.message = message
+
+
+@dataclass
+class CachedPhoto:
+	"""Class representing a stored photo
+
+	Attributes:
+	:param content_type: str - MIME type returned by Google
+	:param body: bytes - image data
+	:param etag: str - strong validator derived from the image data
+
+	"""
+
+	content_type: str
+	body: bytes
+	etag: str
+
+	@classmethod
+	def from_body(cls, content_type: str, body: bytes):
+		return cls(content_type, body, hashlib.sha256(body).hexdigest()[:32])
+
+	def serialize(self) -> bytes:
+		return self.content_type.encode('ascii') + b'\n' + self.body
+
+	@classmethod
+	def deserialize(cls, data: bytes):
+		content_type, body = data.split(b'\n', 1)
+		return cls.from_body(content_type.decode('ascii'), body)
+
+
+class PhotoCache:
+	"""Photos keyed by photo name and requested dimensions.
+
+	Storage, TTL and the byte budget are handled by a ResponseCache.
+	Concurrent misses for the same key share one upstream fetch.
+
+	Methods:
+	get(name, max_height, max_width, fetch) - return a photo, fetching it once on a miss
+	"""
+
+	def __init__(
+		self,
+		directory: str | Path,
+		max_bytes: int = 512 * 1024 * 1024,
+		ttl: float = 30 * 24 * 3600,
+	):
+		self.store = ResponseCache(directory, ttl=ttl, max_bytes=max_bytes)
+		self.upstream_fetches = 0
+		self._in_flight: dict[tuple, Future] = {}
+		self._lock = threading.Lock()
+
+	def get(
+		self,
+		name: str,
+		max_height: int,
+		max_width: int,
+		fetch: Callable[[], tuple[str, bytes]],
+	) -> CachedPhoto:
+		"""Return the photo from disk or from fetch(), which returns (content_type, body).
+
+		:raises PhotoFetchError: re-raised to every waiter when fetch() fails
+		"""
+		key = (name, max_height, max_width)
+		request = {'name': name, 'maxHeightPx': max_height, 'maxWidthPx': max_width}
+		data = self.store.get(request)
+		if data is not None:
+			return CachedPhoto.deserialize(data)
+
+		with self._lock:
+			future = self._in_flight.get(key)
+			leader = future is None
+			if leader:
+				future = Future()
+				self._in_flight[key] = future
+		if not leader:
+			return future.result()
+
+		try:
+			data = self.store.get(request)
+			if data is not None:
+				photo = CachedPhoto.deserialize(data)
+			else:
+				self.upstream_fetches += 1
+				photo = CachedPhoto.from_body(*fetch())
+				try:
+					self.store.put(request, photo.serialize())
+				except OSError as exc:
+					logging.warning('Could not cache photo %s: %s', name, exc)
+			future.set_result(photo)
+			return photo
+		except BaseException as exc:
+			future.set_exception(exc)
+			raise
+		finally:
+			with self._lock:
+				self._in_flight.pop(key, None)
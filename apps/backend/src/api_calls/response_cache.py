@@ -0,0 +1,179 @@
+"""Content-addressed on-disk cache for API responses.
+
+Entries are stored as ``<dir>/<key[:2]>/<key>.json`` where ``key`` is the
+SHA-256 of the normalized request. The file mtime is the time the entry was
+written (used for the TTL) and the atime is bumped on every hit (used for
+LRU eviction once the cache grows over its byte budget).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from requests import Response
+
+CACHE_MODES = ('on', 'off', 'offline')
+
+
+class CacheMissError(LookupError):
+	"""Raised in offline mode when a request is not in the cache."""
+
+
+def request_key(request: dict[str, Any]) -> str:
+	"""Return the content address of a normalized request."""
+	canonical = json.dumps(request, sort_keys=True, separators=(',', ':'))
+	return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def cached_response(body: bytes) -> Response:
+	"""Build a requests.Response that replays a cached JSON body."""
+	response = Response()
+	response.status_code = 200
+	response._content = body
+	response.headers['Content-Type'] = 'application/json'
+	response.headers['X-Cache'] = 'HIT'
+	response.encoding = 'utf-8'
+	return response
+
+
+class ResponseCache:
+	"""Size-bounded LRU cache of successful JSON responses with a TTL.
+
+	Attributes:
+	:param directory: Path - where the entries are stored
+	:param ttl: float - seconds an entry stays valid
+	:param max_bytes: int - total size of the entries kept on disk
+	:param mode: str - 'on', 'off' (bypass) or 'offline' (never call the API)
+
+	Methods:
+	fetch(request, send) - return the cached response or call send() and store it
+	"""
+
+	def __init__(
+		self,
+		directory: str | Path,
+		ttl: float = 7 * 24 * 3600,
+		max_bytes: int = 256 * 1024 * 1024,
+		mode: str = 'on',
+	):
+		if mode not in CACHE_MODES:
+			raise ValueError(
+				f'Unknown cache mode {mode}, expected one of {CACHE_MODES}'
+			)
+		self.directory = Path(directory)
+		self.ttl = ttl
+		self.max_bytes = max_bytes
+		self.mode = mode
+		self.hits = 0
+		self.misses = 0
+		self._index: dict[str, tuple[int, float]] | None = None
+		self._size = 0
+		self._lock = threading.Lock()
+
+	def _path(self, key: str) -> Path:
+		return self.directory / key[:2] / f'{key}.json'
+
+	def _load_index(self):
+		"""Scan the directory once; afterwards the index is kept in memory."""
+		if self._index is not None:
+			return
+		self._index = {}
+		self._size = 0
+		if not self.directory.exists():
+			return
+		for path in self.directory.glob('*/*.json'):
+			stat = path.stat()
+			self._index[path.stem] = (stat.st_size, stat.st_atime)
+			self._size += stat.st_size
+
+	def _remove(self, key: str):
+		size, _ = self._index.pop(key, (0, 0))
+		self._size -= size
+		self._path(key).unlink(missing_ok=True)
+
+	def get(self, request: dict[str, Any]) -> bytes | None:
+		"""Return the cached body for a request, or None when missing or expired."""
+		key = request_key(request)
+		path = self._path(key)
+		with self._lock:
+			self._load_index()
+			if key not in self._index:
+				return None
+			try:
+				created = path.stat().st_mtime
+				if time.time() - created > self.ttl:
+					self._remove(key)
+					return None
+				body = path.read_bytes()
+				now = time.time()
+				os.utime(path, (now, created))
+			except FileNotFoundError:
+				self._remove(key)
+				return None
+			self._index[key] = (len(body), now)
+			return body
+
+	def put(self, request: dict[str, Any], body: bytes):
+		"""Store a body atomically and evict least recently used entries."""
+		key = request_key(request)
+		path = self._path(key)
+		path.parent.mkdir(parents=True, exist_ok=True)
+		tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+		tmp_path.write_bytes(body)
+		os.replace(tmp_path, path)
+		with self._lock:
+			self._load_index()
+			previous, _ = self._index.get(key, (0, 0))
+			self._index[key] = (len(body), time.time())
+			self._size += len(body) - previous
+			self._evict()
+
+	def _evict(self):
+		if self._size <= self.max_bytes:
+			return
+		for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+			if self._size <= self.max_bytes:
+				break
+			self._remove(key)
+
+	def fetch(self, request: dict[str, Any], send: Callable[[], Response]) -> Response:
+		"""Return a cached response for the request or send it and cache the result.
+
+		Only 200 responses are stored. In offline mode a miss raises
+		CacheMissError instead of calling send().
+		"""
+		if self.mode == 'off':
+			return send()
+		body = self.get(request)
+		with self._lock:
+			if body is not None:
+				self.hits += 1
+			else:
+				self.misses += 1
+		if body is not None:
+			return cached_response(body)
+		if self.mode == 'offline':
+			raise CacheMissError(f'Request not cached (offline mode): {request}')
+		response = send()
+		if response.status_code == 200:
+			try:
+				self.put(request, response.content)
+			except OSError as exc:
+				logging.warning('Could not cache response: %s', exc)
+		return response
+
+	def stats(self) -> dict[str, Any]:
+		with self._lock:
+			self._load_index()
+			return {
+				'mode': self.mode,
+				'entries': len(self._index),
+				'bytes': self._size,
+				'hits': self.hits,
+				'misses': self.misses,
+			}
@@ -1,15 +1,20 @@
 from datetime import datetime, timedelta
+from functools import cache
 
 import openmeteo_requests
 import requests_cache
 from retry_requests import retry
 
 
-def get_weather(lat, lon):
+@cache
+def _openmeteo_client():
+	"""Created once so the cache and its connection pool are shared between calls."""
 	cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
 	retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-	openmeteo = openmeteo_requests.Client(session=retry_session)
+	return openmeteo_requests.Client(session=retry_session)
+
 
+def get_weather(lat, lon):
 	url = 'https://api.open-meteo.com/v1/forecast'
 	params = {
 		'latitude': lat,
@@ -17,7 +22,7 @@ def get_weather(lat, lon):
 		'daily': 'weather_code',
 		'forecast_days': 16,
 	}
-	responses = openmeteo.weather_api(url, params=params)
+	responses = _openmeteo_client().weather_api(url, params=params)
 	response = responses[0]
 
 	daily = response.Daily()
@@ -0,0 +1,207 @@
+"""Edit the days of a stored trip without planning the whole trip again."""
+
+from datetime import date
+from typing import Any
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_visitor import PlaceVisitor
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.database import DataBase, DataBaseTrips, TripChangedError
+from src.database.places_cache import places_cache
+from src.route_optimalization.routing import Routing
+from src.route_optimalization.split_for_days import SplitForDays
+
+EDIT_OPERATIONS = ('remove', 'pin', 'swap')
+# place fields set by the user that survive re-planning a day
+KEPT_FIELDS = ('user_rating', 'pinned')
+# times an edit is planned again when the trip changed while it was solved
+EDIT_ATTEMPTS = 3
+
+
+class TripEditError(Exception):
+	"""Raised when an edit cannot be applied to the trip."""
+
+
+class TripEditNotFound(TripEditError):
+	"""Raised when the edited trip or a place of the edit does not exist."""
+
+
+def _place_ids(day: dict) -> list[str]:
+	return [place['id'] for place in day.get('places', [])]
+
+
+def _check_day(days: list[dict], day_index: int | None):
+	if day_index is None or not 0 <= day_index < len(days):
+		raise IndexError('Invalid day index')
+
+
+def _plan(
+	operation: str,
+	days: list[dict],
+	day_index: int,
+	place_id: str | None,
+	other_day_index: int | None,
+	place_map,
+) -> dict[int, list[str]]:
+	"""Place ids of every day the edit changes, in their stored order."""
+	ids = _place_ids(days[day_index])
+	if operation in ('remove', 'pin') and place_id is None:
+		raise TripEditError(f'The {operation} edit needs a place_id')
+	if operation == 'remove':
+		if place_id not in ids:
+			raise TripEditError(f'Place {place_id} is not on day {day_index}')
+		return {day_index: [i for i in ids if i != place_id]}
+	if operation == 'pin':
+		if place_id not in place_map:
+			raise TripEditNotFound(f'Place {place_id} not found')
+		plans = {
+			index: [i for i in _place_ids(day) if i != place_id]
+			for index, day in enumerate(days)
+			if index != day_index and place_id in _place_ids(day)
+		}
+		plans[day_index] = ids if place_id in ids else ids + [place_id]
+		return plans
+	if other_day_index is None:
+		raise TripEditError('The swap edit needs an other_day_index')
+	_check_day(days, other_day_index)
+	return {day_index: _place_ids(days[other_day_index]), other_day_index: ids}
+
+
+def _solve_day(
+	city: City,
+	places: list[Place],
+	stored: dict[str, dict],
+	initial_route: list[str],
+	pinned: set[str],
+	period_index: int,
+	weather: Any,
+) -> tuple[dict, list[str], dict]:
+	"""Route one day starting from its stored order, return (day, dropped ids, stats)."""
+	for place in places:
+		# keep the planned places unless they do not fit; wibit trips store no rating
+		place.ratings.cumulative_rating = (
+			stored.get(place.placeInfo.id, {}).get('personal_rating') or 1.0
+		)
+	routing = Routing(
+		Places(places, city),
+		depot=TripInfo(city=city).hotel,
+		period_index=period_index,
+		initial_route=initial_route,
+		pinned=pinned,
+	)
+	try:
+		route, transportations = routing.get_routes()
+	except ValueError:
+		raise TripEditError('The pinned places do not fit in the day') from None
+
+	day_places = []
+	for j, place in enumerate(route.get_list()):
+		transportation = transportations[j] if j < len(transportations) else None
+		itinerary_place = PlaceVisitor.place_to_itinerary(place, transportation)
+		previous = stored.get(place.placeInfo.id, {})
+		itinerary_place.update(
+			{key: previous[key] for key in KEPT_FIELDS if key in previous}
+		)
+		if place.placeInfo.id in pinned:
+			itinerary_place['pinned'] = True
+		day_places.append(itinerary_place)
+	visited = {place.placeInfo.id for place in route.get_list()}
+	dropped = [place_id for place_id in initial_route if place_id not in visited]
+	return {'places': day_places, 'weather': weather}, dropped, routing.stats
+
+
+def edit_trip(
+	db: DataBase,
+	db_trips: DataBaseTrips,
+	trip_id: str,
+	operation: str,
+	day_index: int,
+	place_id: str | None = None,
+	other_day_index: int | None = None,
+) -> dict:
+	"""Apply an edit to a stored trip, route only the days it changes and save them.
+
+	'remove' takes place_id off the day, 'pin' adds place_id from the city's
+	places to the day and keeps it there in later edits (moving it from
+	another day), 'swap' exchanges the places of day_index and
+	other_day_index. Each changed day is solved from its stored order, with
+	the travel times of the city's stored matrix; the other days are kept.
+	The days are saved only if the trip did not change while they were
+	solved, otherwise the edit is planned again from the new trip.
+
+	:return: the updated trip, the places dropped to fit the edit and the solver stats
+	"""
+	if operation not in EDIT_OPERATIONS:
+		raise TripEditError(
+			f'Unknown edit {operation}, expected one of {EDIT_OPERATIONS}'
+		)
+	for attempt in range(EDIT_ATTEMPTS):
+		try:
+			trip = db_trips.get_trip(trip_id)
+		except ValueError as exc:
+			raise TripEditNotFound(str(exc)) from None
+		edited, dropped, stats = _edit_days(
+			db, trip, operation, day_index, place_id, other_day_index
+		)
+		try:
+			db_trips.set_trip_days(trip_id, edited, expected_days=trip.get('days', []))
+		except TripChangedError:
+			if attempt == EDIT_ATTEMPTS - 1:
+				raise
+			continue
+		except ValueError as exc:
+			raise TripEditNotFound(str(exc)) from None
+		return {'trip': db_trips.get_trip(trip_id), 'dropped': dropped, 'stats': stats}
+
+
+def _edit_days(
+	db: DataBase,
+	trip: dict,
+	operation: str,
+	day_index: int,
+	place_id: str | None,
+	other_day_index: int | None,
+) -> tuple[dict[int, dict], list[str], list[dict]]:
+	"""Plan and solve the days one edit of the trip changes."""
+	days = trip.get('days', [])
+	_check_day(days, day_index)
+	if not trip.get('dates'):
+		raise TripEditError(f'Trip {trip["id"]} has no dates')
+	try:
+		start, end = (date.fromisoformat(d) for d in trip['dates'])
+	except (TypeError, ValueError):
+		raise TripEditError(f'Trip {trip["id"]} has invalid dates') from None
+	weekdays = SplitForDays.get_weekday_indices(start, end)
+
+	city = City(trip['city_id'])
+	place_map = places_cache.get(db, city).places
+	plans = _plan(operation, days, day_index, place_id, other_day_index, place_map)
+	stored = {place['id']: place for day in days for place in day.get('places', [])}
+
+	edited, dropped, stats = {}, [], []
+	for index, ids in plans.items():
+		if index >= len(weekdays):
+			raise IndexError('Invalid day index')
+		pinned = {i for i in ids if stored.get(i, {}).get('pinned')}
+		if operation == 'pin' and index == day_index:
+			pinned.add(place_id)
+		places = []
+		for i in ids:
+			if i not in place_map:
+				raise TripEditNotFound(f'Place {i} not found')
+			places.append(place_map[i])
+		day, day_dropped, day_stats = _solve_day(
+			city,
+			places,
+			stored,
+			ids,
+			pinned,
+			weekdays[index],
+			days[index].get('weather'),
+		)
+		edited[index] = day
+		dropped += day_dropped
+		stats.append({'day_index': index, **day_stats})
+	return edited, dropped, stats
@@ -3,6 +3,8 @@ import logging
 from datetime import date
 
 from src.api_calls.google_places import get_places_for_city
+from src.api_calls.weather import get_weather_for_dates
+from src.backend.itinerary_cache import itinerary_cache
 from src.data_model.city.city import City
 from src.data_model.place.place import PlaceCreatorAPI, PlaceCreatorDatabase
 from src.data_model.place.place_visitor import PlaceVisitor
@@ -10,6 +12,7 @@ from src.data_model.places.places import Places
 from src.data_model.user.user_info import TripInfo
 from src.data_model.user.user_preferences import UserPreferences
 from src.database import DataBase, DataBaseTrips
+from src.database.places_cache import places_cache
 from src.path import get_path
 from src.recommendation import Recommendation
 
@@ -55,7 +58,7 @@ def get_attractions(
 
 	if db.check_if_city_exist(city):
 		logging.info('City exist in database_module.')
-		attractions = db.read_places_data_from_db(city, 'places', PlaceCreatorDatabase)
+		attractions = places_cache.get(db, city, PlaceCreatorDatabase)
 
 	else:
 		attractions = get_places_for_city(
@@ -66,6 +69,19 @@ def get_attractions(
 	return attractions
 
 
+def reuse_itinerary(itinerary: dict, city: City, dates: tuple[date, date], weather=True):
+	"""Move a cached itinerary, made for the same weekdays, to the requested dates."""
+	requested = [d.isoformat() for d in dates]
+	if itinerary.get('dates') == requested:
+		return itinerary
+	itinerary['dates'] = requested
+	if weather:
+		forecast = get_weather_for_dates(city.lat, city.lng, dates[0], dates[1])
+		for day, day_weather in zip(itinerary['days'], forecast):
+			day['weather'] = day_weather
+	return itinerary
+
+
 def get_recommendations(
 	db: DataBase,
 	db_trips: DataBaseTrips,
@@ -74,20 +90,79 @@ def get_recommendations(
 	dates: tuple[date, date],
 	preferences: UserPreferences,
 	from_file: bool = False,
+	on_progress=None,
 ):
-	"""Function that returns a list of place for each day."""
+	"""Function that returns a list of place for each day.
+
+	An identical request for a city whose places did not change since is
+	answered from itinerary_cache and saved as a new trip.
+
+	:param on_progress: optional callback(stage, done, total) called as the pipeline advances
+	"""
 	city = City(city_id)
+	if on_progress is not None:
+		on_progress('places')
+
+	key = itinerary_cache.fingerprint('recommendation', city, dates, days, preferences)
+	version = None if db is None or from_file else db.city_version(city)
+	itinerary = itinerary_cache.get(key, version)
+	if itinerary is not None:
+		reuse_itinerary(itinerary, city, dates)
+	else:
+		user = TripInfo(
+			user_id='global', user_preferences=preferences, city=city, days=days, dates=dates
+		)
+
+		places_list = get_attractions(
+			db=db, city=city, user_preferences=user, from_file=from_file
+		)
+
+		recommendation = Recommendation(
+			places=places_list, user=user, on_progress=on_progress
+		).get_recommendation()
+		itinerary = recommendation.get_itinerary()
+		itinerary_cache.put(key, version, itinerary)
+	if on_progress is not None:
+		on_progress('saving')
+	trip_id = db_trips.save_trip_history(city, itinerary)
+	itinerary['id'] = trip_id
+	return itinerary
+
+
+def stream_recommendations(
+	db: DataBase,
+	db_trips: DataBaseTrips,
+	city_id: int,
+	days: int,
+	dates: tuple[date, date],
+	preferences: UserPreferences,
+	from_file: bool = False,
+):
+	"""Generate a recommendation as (event, data) pairs.
+
+	Yields 'start' right away, one 'day' per day as soon as its route is
+	solved, then 'summary' and finally 'done' with the saved trip id.
+	"""
+	city = City(city_id)
+	yield 'start', {
+		'city_id': city.id,
+		'city_name': city.name,
+		'dates': [d.isoformat() for d in dates],
+		'days_len': days,
+	}
 
 	user = TripInfo(
 		user_id='global', user_preferences=preferences, city=city, days=days, dates=dates
 	)
-
 	places_list = get_attractions(
 		db=db, city=city, user_preferences=user, from_file=from_file
 	)
 
-	recommendation = Recommendation(places=places_list, user=user).get_recommendation()
+	recommendation = Recommendation(places=places_list, user=user)
+	for index, day in recommendation.iter_days():
+		yield 'day', {'index': index, **day}
+	yield 'summary', {'summary': recommendation.summarize()}
+
 	itinerary = recommendation.get_itinerary()
 	trip_id = db_trips.save_trip_history(city, itinerary)
-	itinerary['id'] = trip_id
-	return itinerary
+	yield 'done', {'id': trip_id}
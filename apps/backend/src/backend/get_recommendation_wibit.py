@@ -1,7 +1,8 @@
 from datetime import date
 from typing import Tuple
 
-from src.backend.get_recommendation import get_attractions
+from src.backend.get_recommendation import get_attractions, reuse_itinerary
+from src.backend.itinerary_cache import itinerary_cache
 from src.data_model.city.city import City
 from src.data_model.user.user_info import TripInfo
 from src.data_model.user.user_preferences import UserPreferences
@@ -17,16 +18,30 @@ def get_recommendations_wibit(
 	dates: Tuple[date, date],
 	preferences: UserPreferences,
 	from_file: bool = False,
+	on_progress=None,
 ):
 	city = City(city_id)
-	user = TripInfo(
-		user_id='global', user_preferences=preferences, city=city, days=days, dates=dates
-	)
-	places_list = get_attractions(
-		db=db, city=city, user_preferences=user, from_file=from_file
-	)
+	if on_progress is not None:
+		on_progress('places')
+	key = itinerary_cache.fingerprint('wibit', city, dates, days, preferences)
+	version = None if db is None or from_file else db.city_version(city)
+	itinerary = itinerary_cache.get(key, version)
+	if itinerary is not None:
+		reuse_itinerary(itinerary, city, dates, weather=False)
+	else:
+		user = TripInfo(
+			user_id='global', user_preferences=preferences, city=city, days=days, dates=dates
+		)
+		places_list = get_attractions(
+			db=db, city=city, user_preferences=user, from_file=from_file
+		)
 
-	itinerary = recommend_itinerary(places_list, preferences, dates, city.name)
+		itinerary = recommend_itinerary(
+			places_list, preferences, dates, city.name, on_progress=on_progress
+		)
+		itinerary_cache.put(key, version, itinerary)
+	if on_progress is not None:
+		on_progress('saving')
 	trip_id = db_trips.save_trip_history(city, itinerary)
 	itinerary['id'] = trip_id
 	itinerary['city_name'] = city.name
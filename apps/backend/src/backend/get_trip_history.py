@@ -1,27 +1,49 @@
 from src.data_model.city.city import City
+from src.data_model.place.place import Place
 from src.data_model.place.place_visitor import PlaceVisitor
 from src.database import DataBase, DataBaseTrips
+from src.database.places_cache import places_cache
 
 
-def get_trip(db: DataBase, db_trips: DataBaseTrips, trip_id: str):
-	trip = db_trips.get_trip(trip_id)
-	city = City(trip['city_id'])
-	place_map = db.get_place_map(city)
+def _hydrate_trip(trip: dict, city: City, place_map: dict[str, Place]):
+	"""Merge the stored place details into the places of a trip."""
 	for day in trip['days']:
 		for i, place in enumerate(day['places']):
 			place_id = place.get('id')
 			full_place = place_map.get(place_id)
 			if full_place is None:
-				full_place = db.get_place(city, place_id)
+				raise ValueError(f'Place {place_id} not found for city {city.id}')
 			day['places'][i] = {**PlaceVisitor.place_to_itinerary(full_place), **place}
 	return trip
 
 
-def get_trip_history(db: DataBase, db_trips: DataBaseTrips):
-	trip_history = db_trips.get_trip_history()
-	for i, trip in enumerate(trip_history):
-		trip_history[i] = get_trip(db, db_trips, trip['id'])
-	return trip_history
+def get_trip(db: DataBase, db_trips: DataBaseTrips, trip_id: str):
+	trip = db_trips.get_trip(trip_id)
+	city = City(trip['city_id'])
+	return _hydrate_trip(trip, city, places_cache.get(db, city).places)
+
+
+def get_trip_history(
+	db: DataBase,
+	db_trips: DataBaseTrips,
+	cursor: str | None = None,
+	limit: int | None = None,
+) -> tuple[list[dict], str | None]:
+	"""Return a page of hydrated trips and the cursor of the next page.
+
+	The page is read from the store once and each city's places are loaded
+	once, however many trips share it.
+	"""
+	trips, next_cursor = db_trips.get_trip_page(cursor, limit)
+	by_city: dict[int, list[dict]] = {}
+	for trip in trips:
+		by_city.setdefault(trip['city_id'], []).append(trip)
+	for city_id, city_trips in by_city.items():
+		city = City(city_id)
+		place_map = places_cache.get(db, city).places
+		for trip in city_trips:
+			_hydrate_trip(trip, city, place_map)
+	return trips, next_cursor
 
 
 def get_trip_history_overview(db_trips: DataBaseTrips):
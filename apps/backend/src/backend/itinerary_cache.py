@@ -0,0 +1,138 @@
+"""Process-wide cache of finished itineraries for identical requests."""
+
+import copy
+import dataclasses
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any
+
+from dotenv import load_dotenv
+
+from src.api_calls.response_cache import request_key
+from src.data_model.city.city import City
+from src.data_model.user.user_preferences import UserPreferences
+
+load_dotenv()
+
+
+def _normalized(value: Any) -> Any:
+	"""Sort lists and dict keys so the order of the user's choices does not matter."""
+	if isinstance(value, dict):
+		return {str(key): _normalized(item) for key, item in sorted(value.items())}
+	if isinstance(value, (list, tuple, set)):
+		return sorted((_normalized(item) for item in value), key=repr)
+	return value
+
+
+class ItineraryCache:
+	"""TTL and LRU bounded cache of itineraries keyed by a request fingerprint.
+
+	The fingerprint covers what the pipeline depends on: the variant, the
+	city, the weekdays of the trip, the number of days and every
+	UserPreferences field, so two trips on the same weekdays of different
+	weeks share an entry. An entry is reused only while the city's
+	``db.city_version`` is unchanged, so new or updated places invalidate
+	it. Itineraries are copied in and out; the caller saves a hit as a new
+	trip and fixes up its dates.
+
+	Attributes:
+	:param max_entries: int - itineraries kept, $ITINERARY_CACHE_SIZE or 256 by default; 0 disables the cache
+	:param ttl: float - seconds an itinerary stays valid, $ITINERARY_CACHE_TTL or 6 h by default
+
+	Methods:
+	fingerprint(variant, city, dates, days, preferences) - key of a recommendation request
+	get(key, version) - return a copy of the cached itinerary or None
+	put(key, version, itinerary) - store an itinerary computed for the city version
+	"""
+
+	def __init__(self, max_entries: int | None = None, ttl: float | None = None):
+		if max_entries is None:
+			max_entries = int(os.getenv('ITINERARY_CACHE_SIZE') or 256)
+		if ttl is None:
+			ttl = float(os.getenv('ITINERARY_CACHE_TTL') or 6 * 3600)
+		self.max_entries = max_entries
+		self.ttl = ttl
+		self.hits = 0
+		self.misses = 0
+		self.expired = 0
+		self.invalidated = 0
+		self._entries: OrderedDict[str, tuple[float, Any, dict]] = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def fingerprint(
+		variant: str,
+		city: City,
+		dates: tuple[date, date],
+		days: int,
+		preferences: UserPreferences,
+	) -> str:
+		weekdays = [
+			(dates[0] + timedelta(days=i)).weekday()
+			for i in range((dates[1] - dates[0]).days + 1)
+		]
+		return request_key(
+			{
+				'variant': variant,
+				'city': city.id,
+				'weekdays': weekdays,
+				'days': days,
+				'preferences': _normalized(dataclasses.asdict(preferences)),
+			}
+		)
+
+	def get(self, key: str, version: Any) -> dict | None:
+		"""Return a copy of the itinerary, None if missing, expired or outdated."""
+		if self.max_entries <= 0 or version is None:
+			return None
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self.misses += 1
+				return None
+			created, entry_version, itinerary = entry
+			if entry_version != version:
+				del self._entries[key]
+				self.invalidated += 1
+				self.misses += 1
+				return None
+			if time.time() - created > self.ttl:
+				del self._entries[key]
+				self.expired += 1
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+		return copy.deepcopy(itinerary)
+
+	def put(self, key: str, version: Any, itinerary: dict):
+		"""Store an itinerary; nothing is kept for a city not in the database."""
+		if self.max_entries <= 0 or version is None:
+			return
+		itinerary = copy.deepcopy(itinerary)
+		itinerary.pop('id', None)
+		with self._lock:
+			self._entries[key] = (time.time(), version, itinerary)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+	def stats(self) -> dict[str, int]:
+		with self._lock:
+			return {
+				'entries': len(self._entries),
+				'hits': self.hits,
+				'misses': self.misses,
+				'expired': self.expired,
+				'invalidated': self.invalidated,
+			}
+
+
+itinerary_cache = ItineraryCache()
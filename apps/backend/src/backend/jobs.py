@@ -0,0 +1,193 @@
+"""Background jobs with per-stage progress, run on a bounded thread pool."""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+from src.api_calls.response_cache import request_key
+
+load_dotenv()
+
+ProgressCallback = Callable[..., None]
+
+
+@dataclass
+class Job:
+	"""Class representing a submitted job
+
+	Attributes:
+	:param id: str - job id returned to the client
+	:param key: str - fingerprint of the job input, used for deduplication
+	:param stages: dict[str, dict] - status ('pending', 'running', 'done') and optional done/total per stage
+	:param status: str - 'queued', 'running', 'succeeded' or 'failed'
+	:param stage: str - the stage currently running
+	:param result: Any - return value of the task once it succeeded
+	:param error: str - error message once it failed
+
+	"""
+
+	id: str
+	key: str
+	stages: dict[str, dict[str, Any]]
+	status: str = 'queued'
+	stage: str | None = None
+	result: Any = None
+	error: str | None = None
+	created: float = field(default_factory=time.time)
+	updated: float = field(default_factory=time.time)
+
+	@property
+	def finished(self) -> bool:
+		return self.status in ('succeeded', 'failed')
+
+	@property
+	def progress(self) -> float:
+		"""Fraction of the work done, counting partial progress of the running stage."""
+		if self.status == 'succeeded':
+			return 1.0
+		done = 0.0
+		for stage in self.stages.values():
+			if stage['status'] == 'done':
+				done += 1
+			elif stage['status'] == 'running' and stage.get('total'):
+				done += stage['done'] / stage['total']
+		return done / len(self.stages) if self.stages else 0.0
+
+	def to_dict(self) -> dict[str, Any]:
+		return {
+			'job_id': self.id,
+			'status': self.status,
+			'stage': self.stage,
+			'progress': round(self.progress, 3),
+			'stages': [{'name': name, **state} for name, state in self.stages.items()],
+			'result': self.result,
+			'error': self.error,
+		}
+
+
+class JobRunner:
+	"""Runs tasks in the background and keeps their state for polling.
+
+	A task is called with a progress callback ``report(stage, done=None,
+	total=None)``; reporting a stage marks the earlier ones as done. Submitting
+	the same input while an equal job is queued or running returns that job.
+
+	Attributes:
+	:param max_workers: int - jobs running at the same time, $RECOMMENDATION_WORKERS (2) by default
+	:param ttl: float - seconds a finished job stays available, $RECOMMENDATION_JOB_TTL (1 h) by default
+
+	Methods:
+	submit(request, stages, task) - start or reuse a job, returns (job, reused)
+	get(job_id) - return a job snapshot as a dict
+	"""
+
+	def __init__(self, max_workers: int | None = None, ttl: float | None = None):
+		if max_workers is None:
+			max_workers = int(os.getenv('RECOMMENDATION_WORKERS') or 2)
+		if ttl is None:
+			ttl = float(os.getenv('RECOMMENDATION_JOB_TTL') or 3600)
+		self.max_workers = max_workers
+		self.ttl = ttl
+		self._executor = ThreadPoolExecutor(
+			max_workers=max_workers, thread_name_prefix='job'
+		)
+		self._jobs: dict[str, Job] = {}
+		self._active: dict[str, Job] = {}
+		self._lock = threading.Lock()
+
+	def submit(
+		self,
+		request: dict[str, Any],
+		stages: list[str],
+		task: Callable[[ProgressCallback], Any],
+	) -> tuple[dict[str, Any], bool]:
+		"""Queue ``task`` unless an identical request is already queued or running."""
+		key = request_key(request)
+		with self._lock:
+			self._prune()
+			job = self._active.get(key)
+			if job is not None:
+				return job.to_dict(), True
+			job = Job(
+				id=str(uuid4()),
+				key=key,
+				stages={stage: {'status': 'pending'} for stage in stages},
+			)
+			self._jobs[job.id] = job
+			self._active[key] = job
+			snapshot = job.to_dict()
+		self._executor.submit(self._run, job, task)
+		return snapshot, False
+
+	def get(self, job_id: str) -> dict[str, Any]:
+		with self._lock:
+			job = self._jobs.get(job_id)
+			if job is None:
+				raise ValueError(f'Job {job_id} not found')
+			return job.to_dict()
+
+	def _report(
+		self, job: Job, stage: str, done: int | None = None, total: int | None = None
+	):
+		with self._lock:
+			if stage not in job.stages:
+				job.stages[stage] = {'status': 'pending'}
+			for name, state in job.stages.items():
+				if name == stage:
+					break
+				state['status'] = 'done'
+			job.stage = stage
+			job.stages[stage] = {'status': 'running'}
+			if total is not None:
+				job.stages[stage].update(done=done or 0, total=total)
+			job.updated = time.time()
+
+	def _run(self, job: Job, task: Callable[[ProgressCallback], Any]):
+		with self._lock:
+			job.status = 'running'
+			job.updated = time.time()
+		try:
+			result = task(lambda *args, **kwargs: self._report(job, *args, **kwargs))
+		except Exception as exc:
+			logging.exception('Job %s failed', job.id)
+			with self._lock:
+				job.status = 'failed'
+				job.error = str(exc)
+		else:
+			with self._lock:
+				for state in job.stages.values():
+					state['status'] = 'done'
+				job.status = 'succeeded'
+				job.result = result
+		finally:
+			with self._lock:
+				job.stage = None
+				job.updated = time.time()
+				self._active.pop(job.key, None)
+
+	def _prune(self):
+		"""Forget finished jobs older than the TTL; caller holds the lock."""
+		now = time.time()
+		expired = [
+			job_id
+			for job_id, job in self._jobs.items()
+			if job.finished and now - job.updated > self.ttl
+		]
+		for job_id in expired:
+			del self._jobs[job_id]
+
+	def stats(self) -> dict[str, int]:
+		with self._lock:
+			statuses = [job.status for job in self._jobs.values()]
+		counts = {
+			status: statuses.count(status)
+			for status in ('queued', 'running', 'succeeded', 'failed')
+		}
+		return {'workers': self.max_workers, **counts}
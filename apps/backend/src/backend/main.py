@@ -1,3 +1,4 @@
+import json
 import logging
 import os
 import re
@@ -7,15 +8,24 @@ from flask import Flask, Response, jsonify, request
 from flask_cors import CORS, cross_origin
 import requests
 
-from src.backend.get_recommendation import get_recommendations
+from src.api_calls import google_places
+from src.api_calls.http_client import http_client
+from src.api_calls.photo_cache import PhotoCache, PhotoFetchError
+from src.backend.edit_trip import TripEditError, TripEditNotFound, edit_trip
+from src.backend.get_recommendation import get_recommendations, stream_recommendations
 from src.backend.get_recommendation_wibit import get_recommendations_wibit
 from src.backend.get_trip_history import (
 	get_trip,
 	get_trip_history,
 	get_trip_history_overview,
 )
+from src.backend.itinerary_cache import itinerary_cache
+from src.backend.jobs import JobRunner
 from src.data_model import UserPreferences
-from src.database import DataBase, DataBaseTrips
+from src.database import DataBaseTrips, TripChangedError, create_database
+from src.database.places_cache import places_cache
+from src.route_optimalization.parallel_routing import day_solver
+from src.travel_time.osrm import osrm_client
 from src.api_calls.llama import Llama
 
 app = Flask(__name__)
@@ -23,8 +33,16 @@ app = Flask(__name__)
 ALLOWED_ORIGINS = ['http://localhost:4200', r'http://127\.0\.0\.1:\d+']
 CORS(app, resources={r'/api/*': {'origins': ALLOWED_ORIGINS}})
 
-db = DataBase()
+TRIP_HISTORY_PAGE_SIZE = 50
+TRIP_HISTORY_MAX_PAGE_SIZE = 500
+
+db = create_database()
 db_trips = DataBaseTrips()
+recommendation_jobs = JobRunner()
+photo_cache = PhotoCache(
+	directory=os.getenv('PHOTO_CACHE_DIR') or db.base_path / 'cache' / 'photos',
+	max_bytes=int(os.getenv('PHOTO_CACHE_MAX_BYTES') or 512 * 1024 * 1024),
+)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -32,11 +50,60 @@ def health_check():
 	return jsonify({'success': True}), 200
 
 
+@app.route('/api/health/http', methods=['GET'])
+def http_stats():
+	return jsonify({'success': True, 'data': http_client.stats()}), 200
+
+
+@app.route('/api/health/cache', methods=['GET'])
+def cache_stats():
+	return jsonify(
+		{
+			'success': True,
+			'data': {
+				'places': places_cache.stats(),
+				'osrm': osrm_client.stats(),
+				'routes': day_solver.route_cache_stats(),
+				'itineraries': itinerary_cache.stats(),
+			},
+		}
+	), 200
+
+
+@app.route('/api/health/jobs', methods=['GET'])
+def job_stats():
+	return jsonify({'success': True, 'data': recommendation_jobs.stats()}), 200
+
+
+@app.route('/api/health/routing', methods=['GET'])
+def routing_stats():
+	return jsonify({'success': True, 'data': day_solver.stats()}), 200
+
+
 @app.route('/api/trip-history', methods=['GET'])
 def trip_history():
+	cursor = request.args.get('cursor') or None
+	limit = request.args.get('limit')
+	# without paging parameters the whole history is returned, as clients expect
+	if limit is None and cursor is not None:
+		limit = TRIP_HISTORY_PAGE_SIZE
+	if limit is not None:
+		try:
+			limit = int(limit)
+		except ValueError:
+			return jsonify({'success': False, 'message': 'limit must be an integer.'}), 400
+		if not 1 <= limit <= TRIP_HISTORY_MAX_PAGE_SIZE:
+			return jsonify(
+				{
+					'success': False,
+					'message': f'limit must be between 1 and {TRIP_HISTORY_MAX_PAGE_SIZE}.',
+				}
+			), 400
 	try:
-		trips = get_trip_history(db, db_trips)
-		return jsonify({'success': True, 'data': trips}), 200
+		trips, next_cursor = get_trip_history(db, db_trips, cursor, limit)
+		return jsonify({'success': True, 'data': trips, 'next_cursor': next_cursor}), 200
+	except ValueError as exc:
+		return jsonify({'success': False, 'message': str(exc)}), 404
 	except Exception as exc:
 		logging.exception(exc)
 		return jsonify({'success': False, 'message': str(exc)}), 500
@@ -94,6 +161,47 @@ def rate_trip(trip_id: str):
 		return jsonify({'success': False, 'message': str(exc)}), 500
 
 
+@app.route('/api/trip-history/<trip_id>/edit', methods=['POST'])
+def edit_stored_trip(trip_id: str):
+	"""Remove, pin or swap places of a stored trip, re-planning only the changed days."""
+	data = request.json or {}
+	try:
+		operation = str(data['operation'])
+		day_index = int(data['day_index'])
+		other_day_index = data.get('other_day_index')
+		if other_day_index is not None:
+			other_day_index = int(other_day_index)
+		place_id = data.get('place_id')
+	except (KeyError, TypeError, ValueError) as exc:
+		return jsonify({'success': False, 'message': f'Invalid payload: {exc}'}), 400
+	if operation in ('remove', 'pin') and not place_id:
+		return jsonify(
+			{'success': False, 'message': f'Invalid payload: {operation} needs place_id'}
+		), 400
+
+	try:
+		result = edit_trip(
+			db, db_trips, trip_id, operation, day_index, place_id, other_day_index
+		)
+	except TripEditNotFound as exc:
+		return jsonify({'success': False, 'message': str(exc)}), 404
+	except (IndexError, TripEditError) as exc:
+		return jsonify({'success': False, 'message': str(exc)}), 400
+	except TripChangedError as exc:
+		return jsonify({'success': False, 'message': str(exc)}), 409
+	except Exception as exc:
+		logging.exception(exc)
+		return jsonify({'success': False, 'message': str(exc)}), 500
+	return jsonify(
+		{
+			'success': True,
+			'data': result['trip'],
+			'dropped': result['dropped'],
+			'stats': result['stats'],
+		}
+	), 200
+
+
 @app.route('/api/trip-history/<trip_id>', methods=['DELETE'])
 def delete_trip(trip_id: str):
 	try:
@@ -145,26 +253,8 @@ def get_with_categories():
 	if not data:
 		return jsonify({'status': 'error', 'message': 'No data in the request'})
 
-	categories = [category for category in data['preferences']['categories'].keys()]
-	subcategories = data['preferences']['categories']
-	dates = [datetime.strptime(date, '%Y-%m-%d').date() for date in data['dates']]
-	dates_tuple = (dates[0], dates[1])
-
-	user_specified_needs = UserPreferences(
-		data['preferences']['money'],
-		categories,
-		subcategories,
-		data['preferences']['needs'],
-	)
 	try:
-		recommendation = get_recommendations(
-			db,
-			db_trips,
-			data['city_id'],
-			data['days'],
-			dates_tuple,
-			user_specified_needs,
-		)
+		recommendation = _build_recommendation_from_preferences(data)
 	except Exception as e:
 		logging.exception(e.__str__())
 		return jsonify({'status': 'error', 'received_data': e.__str__()})
@@ -211,18 +301,50 @@ def get_with_categories_wibit():
 	return jsonify({'status': 'success', 'received_data': recommendation})
 
 
-def _build_recommendation_from_free_text(data: dict, use_wibit: bool):
+def _parse_recommendation_request(data: dict, free_text: bool):
+	"""Return the (start, end) dates and UserPreferences of a recommendation payload.
+
+	Free-text variants carry restaurant categories as well as needs.
+	"""
 	categories = [category for category in data['preferences']['categories'].keys()]
 	subcategories = data['preferences']['categories']
 	dates = [datetime.strptime(date, '%Y-%m-%d').date() for date in data['dates']]
 	dates_tuple = (dates[0], dates[1])
-	user_specified_needs = UserPreferences(
-		data['preferences']['money'],
-		categories,
-		subcategories,
-		data['preferences'].get('restaurant_categories', []),
-		data['preferences'].get('needs', []),
+	if free_text:
+		user_specified_needs = UserPreferences(
+			data['preferences']['money'],
+			categories,
+			subcategories,
+			data['preferences'].get('restaurant_categories', []),
+			data['preferences'].get('needs', []),
+		)
+	else:
+		user_specified_needs = UserPreferences(
+			data['preferences']['money'],
+			categories,
+			subcategories,
+			data['preferences']['needs'],
+		)
+	return dates_tuple, user_specified_needs
+
+
+def _build_recommendation_from_preferences(data: dict, on_progress=None):
+	dates_tuple, user_specified_needs = _parse_recommendation_request(data, False)
+	return get_recommendations(
+		db,
+		db_trips,
+		data['city_id'],
+		data['days'],
+		dates_tuple,
+		user_specified_needs,
+		on_progress=on_progress,
 	)
+
+
+def _build_recommendation_from_free_text(
+	data: dict, use_wibit: bool, on_progress=None
+):
+	dates_tuple, user_specified_needs = _parse_recommendation_request(data, True)
 	if use_wibit:
 		return get_recommendations_wibit(
 			db,
@@ -231,6 +353,7 @@ def _build_recommendation_from_free_text(data: dict, use_wibit: bool):
 			data['days'],
 			dates_tuple,
 			user_specified_needs,
+			on_progress=on_progress,
 		)
 	return get_recommendations(
 		db,
@@ -239,6 +362,7 @@ def _build_recommendation_from_free_text(data: dict, use_wibit: bool):
 		data['days'],
 		dates_tuple,
 		user_specified_needs,
+		on_progress=on_progress,
 	)
 
 
@@ -318,10 +442,120 @@ def get_with_note_wibit():
 	return jsonify({'status': 'success', 'received_data': recommendation})
 
 
+RECOMMENDATION_STAGES = ['places', 'rating', 'clustering', 'routing', 'summary', 'saving']
+WIBIT_STAGES = ['places', 'planning', 'summary', 'saving']
+RECOMMENDATION_VARIANTS = {
+	'preferences': (False, None),
+	'messages': (False, 'messages'),
+	'note': (False, 'note'),
+	'wibit/preferences': (True, None),
+	'wibit/messages': (True, 'messages'),
+	'wibit/note': (True, 'note'),
+}
+
+
+def _extract_preferences(data: dict, source: str):
+	"""Turn free-text preferences into structured ones, as the sync endpoints do."""
+	if source == 'messages':
+		return Llama.get_preferences_from_messages(data.get('preferences', []))
+	return Llama.get_preferences_from_text(data.get('preferences', ''))
+
+
+def _recommendation_task(variant: str, data: dict):
+	"""Return the job stages and the task computing a recommendation variant."""
+	use_wibit, source = RECOMMENDATION_VARIANTS[variant]
+	stages = list(WIBIT_STAGES if use_wibit else RECOMMENDATION_STAGES)
+	if source is not None:
+		stages.insert(0, 'preferences')
+
+	def task(on_progress):
+		payload = dict(data)
+		if source is not None:
+			on_progress('preferences')
+			payload['preferences'] = _extract_preferences(data, source)
+		if variant == 'preferences':
+			return _build_recommendation_from_preferences(payload, on_progress)
+		return _build_recommendation_from_free_text(payload, use_wibit, on_progress)
+
+	return stages, task
+
+
+@app.route('/api/recommendation/jobs/<path:variant>', methods=['POST'])
+@cross_origin(
+	origins=ALLOWED_ORIGINS,
+	allow_headers=['Content-Type', 'Authorization'],
+)
+def create_recommendation_job(variant: str):
+	"""Start a recommendation in the background; poll it with the returned job_id."""
+	if variant not in RECOMMENDATION_VARIANTS:
+		return jsonify({'success': False, 'message': f'Unknown variant {variant}.'}), 404
+	data = request.json
+	if not data:
+		return jsonify({'success': False, 'message': 'No data in the request'}), 400
+	stages, task = _recommendation_task(variant, data)
+	job, reused = recommendation_jobs.submit(
+		{'variant': variant, 'data': data}, stages, task
+	)
+	return jsonify({'success': True, 'reused': reused, 'data': job}), 202
+
+
+@app.route('/api/recommendation/jobs/<job_id>', methods=['GET'])
+def recommendation_job(job_id: str):
+	try:
+		return jsonify({'success': True, 'data': recommendation_jobs.get(job_id)}), 200
+	except ValueError as exc:
+		return jsonify({'success': False, 'message': str(exc)}), 404
+
+
+def _sse(event: str, data) -> str:
+	return f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+@app.route('/api/recommendation/stream/<variant>', methods=['POST'])
+@cross_origin(
+	origins=ALLOWED_ORIGINS,
+	allow_headers=['Content-Type', 'Authorization'],
+)
+def stream_recommendation(variant: str):
+	"""Stream a recommendation as server-sent events, one 'day' event per solved day."""
+	if variant not in ('preferences', 'messages', 'note'):
+		return jsonify({'success': False, 'message': f'Unknown variant {variant}.'}), 404
+	data = request.json
+	if not data:
+		return jsonify({'success': False, 'message': 'No data in the request'}), 400
+
+	def events():
+		try:
+			payload = dict(data)
+			if variant != 'preferences':
+				payload['preferences'] = _extract_preferences(data, variant)
+			dates_tuple, user_specified_needs = _parse_recommendation_request(
+				payload, variant != 'preferences'
+			)
+			for event, event_data in stream_recommendations(
+				db,
+				db_trips,
+				payload['city_id'],
+				payload['days'],
+				dates_tuple,
+				user_specified_needs,
+			):
+				yield _sse(event, event_data)
+		except Exception as exc:
+			logging.exception(exc)
+			yield _sse('error', {'message': str(exc)})
+
+	return Response(
+		events(),
+		mimetype='text/event-stream',
+		headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+	)
+
+
 PLACES_PHOTO_PATTERN = re.compile(r'^places/[^/]+/photos/[^/]+$')
 DEFAULT_MAX_DIMENSION = 400
 MAX_ALLOWED_DIMENSION = 1600
-GOOGLE_PLACES_MEDIA_URL = 'https://places.googleapis.com/v1/{name}/media'
+GOOGLE_PLACES_MEDIA_URL = '{base_url}/{name}/media'
 GOOGLE_REQUEST_TIMEOUT = (5, 10)  # (connect, read)
 
 
@@ -354,68 +588,70 @@ def _extract_google_error_message(response: requests.Response) -> str:
 	return text or 'Google Places API error.'
 
 
-@app.route('/api/places/photos/<path:name>', methods=['GET'])
-def get_place_photo(name: str):
-	if not PLACES_PHOTO_PATTERN.match(name):
-		return jsonify({'success': False, 'message': 'Invalid photo name format.'}), 400
-	try:
-		max_height = _parse_dimension(request.args.get('maxHeightPx'), 'maxHeightPx')
-		max_width = _parse_dimension(request.args.get('maxWidthPx'), 'maxWidthPx')
-	except ValueError as exc:
-		return jsonify({'success': False, 'message': str(exc)}), 400
-
+def _fetch_place_photo(name: str, max_height: int, max_width: int):
+	"""Download a photo from Google Places; returns (content_type, body)."""
 	api_key = os.environ.get('GOOGLE_PLACES_API_KEY')
 	if not api_key:
-		return jsonify(
-			{'success': False, 'message': 'GOOGLE_PLACES_API_KEY not configured.'}
-		), 500
+		raise PhotoFetchError(500, 'GOOGLE_PLACES_API_KEY not configured.')
 
-	url = GOOGLE_PLACES_MEDIA_URL.format(name=name)
+	url = GOOGLE_PLACES_MEDIA_URL.format(
+		base_url=google_places.PLACES_API_URL, name=name
+	)
 	params = {'maxHeightPx': max_height, 'maxWidthPx': max_width}
 	headers = {'X-Goog-Api-Key': api_key}
 
 	try:
-		google_response = requests.get(
+		google_response = http_client.get(
 			url,
 			params=params,
 			headers=headers,
-			stream=True,
 			timeout=GOOGLE_REQUEST_TIMEOUT,
 		)
 	except requests.Timeout:
-		return jsonify(
-			{'success': False, 'message': 'Request to Google Places timed out.'}
-		), 504
+		raise PhotoFetchError(504, 'Request to Google Places timed out.')
 	except requests.RequestException as exc:  # network or other transport errors
-		return jsonify({'success': False, 'message': str(exc)}), 502
+		raise PhotoFetchError(502, str(exc))
 
 	if not google_response.ok:
 		message = _extract_google_error_message(google_response)
-		return jsonify(
-			{'success': False, 'message': message}
-		), google_response.status_code
+		raise PhotoFetchError(google_response.status_code, message)
 
 	content_type = google_response.headers.get('Content-Type', '').lower()
 	if not content_type.startswith('image/'):
-		google_response.close()
-		return jsonify(
-			{'success': False, 'message': 'Google Places did not return an image.'}
-		), 502
-
-	def generate():
-		for chunk in google_response.iter_content(chunk_size=8192):
-			if chunk:
-				yield chunk
-		google_response.close()
-
-	response_headers = {
-		'Content-Type': content_type,
-		'Cache-Control': 'public, max-age=86400',
-	}
-	content_length = google_response.headers.get('Content-Length')
-	if content_length:
-		response_headers['Content-Length'] = content_length
+		raise PhotoFetchError(502, 'Google Places did not return an image.')
+	return content_type, google_response.content
 
-	return Response(
-		generate(), headers=response_headers, status=google_response.status_code
+
+@app.route('/api/places/photos/<path:name>', methods=['GET'])
+def get_place_photo(name: str):
+	"""Serve a place photo from the local cache, fetching it from Google once.
+
+	Responses carry an ETag, so revalidation with If-None-Match returns 304.
+	"""
+	if not PLACES_PHOTO_PATTERN.match(name):
+		return jsonify({'success': False, 'message': 'Invalid photo name format.'}), 400
+	try:
+		max_height = _parse_dimension(request.args.get('maxHeightPx'), 'maxHeightPx')
+		max_width = _parse_dimension(request.args.get('maxWidthPx'), 'maxWidthPx')
+	except ValueError as exc:
+		return jsonify({'success': False, 'message': str(exc)}), 400
+
+	try:
+		photo = photo_cache.get(
+			name,
+			max_height,
+			max_width,
+			lambda: _fetch_place_photo(name, max_height, max_width),
+		)
+	except PhotoFetchError as exc:
+		return jsonify({'success': False, 'message': exc.message}), exc.status
+
+	response = Response(
+		photo.body,
+		headers={
+			'Content-Type': photo.content_type,
+			'Cache-Control': 'public, max-age=86400',
+		},
 	)
+	response.set_etag(photo.etag)
+	return response.make_conditional(request)
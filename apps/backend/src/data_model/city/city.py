@@ -1,12 +1,11 @@
-import math
 import pathlib
 from dataclasses import dataclass
-from random import random
 from typing import Any
 
-import pandas as pd
 from dataclasses_json import dataclass_json
 
+from src.data_model.city.city_registry import city_registry, get_cities_csv
+
 
 @dataclass_json
 @dataclass
@@ -46,12 +45,7 @@ class City:
 
 	def _get_city(self) -> dict[str, Any]:
 		"""Function that returns a city object."""
-		path = get_cities()
-		data = pd.read_csv(path)
-		data = data[data['id'] == self.id]
-		attributes = ['id', 'city', 'country', 'population', 'lat', 'lng']
-		data = data[attributes].to_dict('records')[0]
-		return {str(k): v for k, v in data.items()}
+		return city_registry.get(self.id)
 
 	@staticmethod
 	def get_const_krakow():
@@ -61,9 +55,7 @@ class City:
 	@staticmethod
 	def get_random_city_id():
 		"""Function that returns a city object."""
-		path: pathlib.Path = get_cities()
-		data: pd.DataFrame = pd.read_csv(path)
-		return data[['id']].to_dict('records')[math.floor(random() * len(data))]['id']
+		return city_registry.random_id()
 
 	def __str__(self):
 		return f'City: {self.name}, {self.country}, {self.lat}, {self.lng}, {self.id}, {self.population}'
@@ -85,10 +77,6 @@ class City:
 		}
 
 
-def get_cities():
+def get_cities() -> pathlib.Path:
 	"""Function that returns the path to the file worldcities"""
-	management_path = pathlib.Path(__file__).parent
-	parent_path = management_path.parent.parent
-	project_path = parent_path / 'constants'
-	path = project_path / 'worldcities/worldcities.csv'
-	return path
+	return get_cities_csv()
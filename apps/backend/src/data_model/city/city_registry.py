@@ -0,0 +1,121 @@
+"""Process-wide in-memory index of the worldcities dataset."""
+
+import logging
+import pathlib
+import pickle
+import threading
+from random import choice
+from typing import Any
+
+import pandas as pd
+
+CITY_ATTRIBUTES = ['id', 'city', 'country', 'population', 'lat', 'lng']
+
+
+def get_cities_csv() -> pathlib.Path:
+	"""Function that returns the path to the worldcities CSV file."""
+	return pathlib.Path(__file__).parents[2] / 'constants/worldcities/worldcities.csv'
+
+
+def _read_csv_columns(csv_path: str | pathlib.Path) -> dict[str, list]:
+	"""Read the CSV the same way City used to and return it column-wise."""
+	data = pd.read_csv(csv_path)
+	records = data[CITY_ATTRIBUTES].to_dict('records')
+	return {key: [record[key] for record in records] for key in CITY_ATTRIBUTES}
+
+
+def compile_cities(
+	csv_path: str | pathlib.Path, binary_path: str | pathlib.Path
+) -> dict[str, list]:
+	"""Compile the worldcities CSV into a columnar pickle.
+
+	:param csv_path: path to the source CSV file
+	:param binary_path: path of the compiled file
+	:return: columns of the compiled dataset
+	"""
+	columns = _read_csv_columns(csv_path)
+	binary_path = pathlib.Path(binary_path)
+	tmp_path = binary_path.with_suffix(binary_path.suffix + '.tmp')
+	with open(tmp_path, 'wb') as handle:
+		pickle.dump(columns, handle, protocol=pickle.HIGHEST_PROTOCOL)
+	tmp_path.replace(binary_path)
+	return columns
+
+
+class CityRegistry:
+	"""Lazily loaded, thread-safe index of cities keyed by id.
+
+	The CSV is parsed at most once and compiled to a pickle stored next to it,
+	so later processes only unpickle the columns.
+
+	Methods:
+	get(city_id) - returns the attributes of a city
+	random_id() - returns an id of a random city
+	"""
+
+	def __init__(
+		self,
+		csv_path: str | pathlib.Path | None = None,
+		binary_path: str | pathlib.Path | None = None,
+	):
+		self.csv_path = pathlib.Path(csv_path or get_cities_csv())
+		self.binary_path = pathlib.Path(
+			binary_path or self.csv_path.with_suffix('.pkl')
+		)
+		self._columns: dict[str, list] | None = None
+		self._index: dict[int, int] | None = None
+		self._lock = threading.Lock()
+
+	def _is_binary_fresh(self) -> bool:
+		if not self.binary_path.exists():
+			return False
+		if not self.csv_path.exists():
+			return True
+		return self.binary_path.stat().st_mtime >= self.csv_path.stat().st_mtime
+
+	def _read_columns(self) -> dict[str, list]:
+		if self._is_binary_fresh():
+			with open(self.binary_path, 'rb') as handle:
+				return pickle.load(handle)
+		try:
+			return compile_cities(self.csv_path, self.binary_path)
+		except OSError as exc:
+			if not self.csv_path.exists():
+				raise
+			logging.warning('Could not write compiled cities file: %s', exc)
+			return _read_csv_columns(self.csv_path)
+
+	def load(self):
+		"""Load the dataset once; subsequent calls are no-ops."""
+		if self._index is not None:
+			return
+		with self._lock:
+			if self._index is not None:
+				return
+			columns = self._read_columns()
+			self._columns = columns
+			self._index = {city_id: row for row, city_id in enumerate(columns['id'])}
+
+	def get(self, city_id) -> dict[str, Any]:
+		"""Return the attributes of a city, the same as a row of the CSV."""
+		self.load()
+		row = self._index.get(int(city_id))
+		if row is None:
+			raise ValueError(f'City {city_id} not found')
+		return {key: self._columns[key][row] for key in CITY_ATTRIBUTES}
+
+	def random_id(self) -> int:
+		"""Return an id of a random city."""
+		self.load()
+		return choice(self._columns['id'])
+
+	def __contains__(self, city_id) -> bool:
+		self.load()
+		return int(city_id) in self._index
+
+	def __len__(self):
+		self.load()
+		return len(self._index)
+
+
+city_registry = CityRegistry()
@@ -83,11 +83,7 @@ class Visitor:
 		place_type: str,
 		categories: list[str],
 	):
-		db.add_categories_to_database(
-			city=city, category_type=category_type, categories=categories
-		)
-		for place in places.get_list():
-			db.add_place_to_database(place, city, category_type, place_type, categories)
+		db.bulk_upsert_places(city, places.get_list(), category_type, categories)
 
 	@abstractmethod
 	def save_places_to_database(
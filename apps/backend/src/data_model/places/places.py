@@ -1,4 +1,6 @@
-from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+
+import numpy as np
 
 from src.data_model.city.city import City
 from src.data_model.place.place import Place
@@ -6,18 +8,42 @@ from src.data_model.place.place_subclasses import Location
 from src.rating.statistical_rating import StatisticalRating
 
 
+class _PlacesById(Mapping):
+	"""Live read-only id -> Place view of a Places container, in its order."""
+
+	def __init__(self, places: 'Places'):
+		self._owner = places
+
+	def __getitem__(self, place_id: str) -> Place:
+		return self._owner.get_place_by_id(place_id)
+
+	def __iter__(self) -> Iterator[str]:
+		return iter(list(self._owner._index))
+
+	def __len__(self) -> int:
+		return self._owner.count
+
+
 class Places:
 	"""A list of place with their attributes.
 
+	Places are kept in a list with an id -> position map, so lookups by id
+	and by index are O(1). Coordinates, ratings and estimated times are
+	also available as NumPy columns, built on first use and dropped by every
+	change made through this container; call refresh_columns() after
+	changing a place object directly.
+
 	Attributes:
-	:param _places: OrderedDict[str, Place] - dictionary of places
+	:param _places: list[Place] - places in order
+	:param _index: dict[str, int] - position of every place id in _places
 	:param city: City - city where the places are located
 	:param _average_rating: float - average rating of all places
 	:param _average_rating_count: float - average rating count of all places
 
 	"""
 
-	_places: OrderedDict[str, Place]
+	_places: list[Place]
+	_index: dict[str, int]
 	city: City
 	_average_rating: float = -1
 	_average_rating_count: float = -1
@@ -25,7 +51,9 @@ class Places:
 	def __init__(self, _places=None, city: City = None):
 		if _places is None:
 			_places = []
-		self._places = OrderedDict()
+		self._places = []
+		self._index = {}
+		self._columns: dict[str, np.ndarray] = {}
 		self.city = city
 
 		self.init_with_places(_places)
@@ -34,15 +62,19 @@ class Places:
 	def init_with_places(self, places_list: list[Place]):
 		"""Init place list with place"""
 		for atr in places_list:
-			self._places[atr.placeInfo.id] = atr
+			self.set_place(atr)
+
+	def _reindex(self):
+		self._index = {place.placeInfo.id: i for i, place in enumerate(self._places)}
+		self._columns.clear()
 
 	def get_location_by_id(self, place_id: str) -> Location:
 		"""Returns a location of a place by its id"""
-		return self._places[place_id].location
+		return self.get_place_by_id(place_id).location
 
 	def get_location_dict_with_id(self, place_id: str) -> dict:
 		"""Returns a location of a place by its id"""
-		place = self._places[place_id]
+		place = self.get_place_by_id(place_id)
 		return {
 			'id': place.placeInfo.id,
 			'lat': place.location.latitude,
@@ -51,11 +83,11 @@ class Places:
 
 	def get_place_by_id(self, place_id: str) -> Place:
 		"""Returns a place by its id"""
-		return self._places[place_id]
+		return self._places[self._index[place_id]]
 
 	def get_list(self) -> list[Place]:
 		"""Returns a list of all place"""
-		return list(self._places.values())
+		return list(self._places)
 
 	def create_new_places_with_id_list(self, places_ids_list):
 		"""Returns a list of place from a list of place ids"""
@@ -66,20 +98,17 @@ class Places:
 
 	def add_place(self, place: Place):
 		"""Adds a place to the list"""
-		self._places[place.placeInfo.id] = place
+		self.set_place(place)
 
 	def sort_by_rating(self):
 		"""Sorts place by their ratings.
 		Used for restaurants to pick the best ones.
 		:return: sorted list of place
 		"""
-		self._places = OrderedDict(
-			sorted(
-				self._places.items(),
-				key=lambda x: x[1].ratings.cumulative_rating,
-				reverse=True,
-			)
+		self._places.sort(
+			key=lambda place: place.ratings.cumulative_rating, reverse=True
 		)
+		self._reindex()
 		return self
 
 	@property
@@ -92,19 +121,68 @@ class Places:
 
 	def get_by_index(self, index):
 		"""Returns a place by its index"""
-		return list(self._places.values())[index]
+		return self._places[index]
 
 	def __getitem__(self, index):
 		"""Returns a place by its index"""
-		return list(self._places.values())[index]
+		return self._places[index]
 
 	def remove_place(self, place: Place):
 		"""Removes a place from the list"""
-		self._places.pop(place.placeInfo.id)
+		del self._places[self._index[place.placeInfo.id]]
+		self._reindex()
 
 	@property
-	def places(self):
-		return self._places
+	def places(self) -> Mapping[str, Place]:
+		"""Returns a live id -> place mapping"""
+		return _PlacesById(self)
 
 	def set_place(self, place: Place):
-		self._places[place.placeInfo.id] = place
+		"""Replaces the place with the same id in place, or appends it"""
+		index = self._index.get(place.placeInfo.id)
+		if index is None:
+			self._index[place.placeInfo.id] = len(self._places)
+			self._places.append(place)
+		else:
+			self._places[index] = place
+		self._columns.clear()
+
+	def _column(self, name: str, dtype, value) -> np.ndarray:
+		column = self._columns.get(name)
+		if column is None:
+			column = np.fromiter(
+				(value(place) for place in self._places),
+				dtype=dtype,
+				count=len(self._places),
+			)
+			column.flags.writeable = False
+			self._columns[name] = column
+		return column
+
+	def refresh_columns(self):
+		"""Drop the cached columns after places were changed directly"""
+		self._columns.clear()
+
+	@property
+	def latitudes(self) -> np.ndarray:
+		"""Latitude of every place, in order"""
+		return self._column('latitudes', float, lambda place: place.location.latitude)
+
+	@property
+	def longitudes(self) -> np.ndarray:
+		"""Longitude of every place, in order"""
+		return self._column('longitudes', float, lambda place: place.location.longitude)
+
+	@property
+	def ratings(self) -> np.ndarray:
+		"""Cumulative rating of every place, in order"""
+		return self._column(
+			'ratings', float, lambda place: place.ratings.cumulative_rating
+		)
+
+	@property
+	def estimated_times(self) -> np.ndarray:
+		"""Minutes to spend at every place, in order"""
+		return self._column(
+			'estimated_times', np.int64, lambda place: place.estimatedTime
+		)
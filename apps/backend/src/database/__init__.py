@@ -1,4 +1,6 @@
 """Database module."""
 
+from src.database.backends import create_database
 from src.database.database import DataBase
-from src.database.trip_database import DataBaseTrips
+from src.database.sqlite_database import SQLiteDataBase
+from src.database.trip_database import DataBaseTrips, TripChangedError
@@ -0,0 +1,31 @@
+"""Selection of the places storage backend."""
+
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from src.database.database import DataBase
+from src.database.sqlite_database import SQLiteDataBase
+
+load_dotenv()
+
+DATABASE_BACKENDS: dict[str, type[DataBase]] = {
+	'json': DataBase,
+	'sqlite': SQLiteDataBase,
+}
+
+
+def create_database(
+	base_path: str | Path | None = None, backend: str | None = None
+) -> DataBase:
+	"""Return the places store selected by ``backend`` or $DATABASE_BACKEND.
+
+	:param backend: 'json' (default) or 'sqlite'
+	"""
+	name = (backend or os.getenv('DATABASE_BACKEND') or 'json').lower()
+	if name not in DATABASE_BACKENDS:
+		raise ValueError(
+			f'Unknown database backend {name}, expected one of {list(DATABASE_BACKENDS)}'
+		)
+	return DATABASE_BACKENDS[name](base_path)
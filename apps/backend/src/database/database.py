@@ -2,6 +2,8 @@
 
 import json
 import os
+import threading
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any
 
@@ -14,13 +16,17 @@ from src.data_model.place.place import Place, PlaceCreator, PlaceCreatorDatabase
 
 load_dotenv()
 
+# one lock per city file, shared by every DataBase on the same directory
+_city_locks: dict[Path, threading.Lock] = {}
+_city_locks_lock = threading.Lock()
+
 
 class DataBase:
 	"""Lightweight local persistence layer that replaces Firebase."""
 
 	def __init__(self, base_path: str | Path | None = None):
 		default_base = Path(__file__).resolve().parents[2] / 'data'
-		self.base_path = Path(os.getenv('DATA_DIR', base_path or default_base))
+		self.base_path = Path(base_path or os.getenv('DATA_DIR') or default_base)
 		self.places_path = self.base_path / 'places'
 		self.places_path.mkdir(parents=True, exist_ok=True)
 		self._categories = default_categories
@@ -31,6 +37,12 @@ class DataBase:
 		country = str(city.country).replace(' ', '_').lower()
 		return Path(f'{country}_{city.id}.json')
 
+	def _city_lock(self, city: City) -> threading.Lock:
+		"""Lock held around a read-merge-write of the city file."""
+		file_path = (self.places_path / self._city_file(city)).resolve()
+		with _city_locks_lock:
+			return _city_locks.setdefault(file_path, threading.Lock())
+
 	def _load_city_payload(self, city: City) -> dict[str, Any]:
 		file_path = self.places_path / self._city_file(city)
 		if not file_path.exists():
@@ -42,10 +54,16 @@ class DataBase:
 				return {'places': [], 'categories': {}}
 
 	def _write_city_payload(self, city: City, payload: dict[str, Any]):
+		"""Write the city file via a temporary file and an atomic rename."""
 		file_path = self.places_path / self._city_file(city)
 		file_path.parent.mkdir(parents=True, exist_ok=True)
-		with open(file_path, 'w', encoding='utf-8') as handle:
+		# unique per thread, so concurrent saves of a city never share a temporary file
+		tmp_path = file_path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+		with open(tmp_path, 'w', encoding='utf-8') as handle:
 			json.dump(payload, handle)
+			handle.flush()
+			os.fsync(handle.fileno())
+		os.replace(tmp_path, file_path)
 
 	def add_place_to_database(
 		self,
@@ -56,26 +74,65 @@ class DataBase:
 		categories: list[str],
 	):
 		"""Persist a place locally; avoids duplicate ids."""
-		payload = self._load_city_payload(city)
 		place_dict = json.loads(place.to_json())
-		existing = [
-			p for p in payload.get('places', []) if p.get('placeInfo', {}).get('id') != place.placeInfo.id
-		]
-		existing.append(place_dict)
-		payload['places'] = existing
-		cat_map = payload.get('categories', {})
-		cat_map[category_type] = categories
-		payload['categories'] = cat_map
-		self._write_city_payload(city, payload)
+		with self._city_lock(city):
+			payload = self._load_city_payload(city)
+			existing = [
+				p for p in payload.get('places', []) if p.get('placeInfo', {}).get('id') != place.placeInfo.id
+			]
+			existing.append(place_dict)
+			payload['places'] = existing
+			cat_map = payload.get('categories', {})
+			cat_map[category_type] = categories
+			payload['categories'] = cat_map
+			self._write_city_payload(city, payload)
+
+	def bulk_upsert_places(
+		self,
+		city: City,
+		places: Iterable[Place],
+		category_type: str,
+		categories: list[str],
+	):
+		"""Persist many places with a single read and a single write.
+
+		Places are merged by id: existing entries with the same id are
+		replaced and the new ones are appended in the given order, exactly as
+		calling add_place_to_database for each place would. Concurrent saves
+		of a city are serialized, so none of them loses the others' places.
+		"""
+		upserts: dict[str, dict[str, Any]] = {}
+		for place in places:
+			upserts.pop(place.placeInfo.id, None)
+			upserts[place.placeInfo.id] = json.loads(place.to_json())
+
+		with self._city_lock(city):
+			payload = self._load_city_payload(city)
+			merged = [
+				p
+				for p in payload.get('places', [])
+				if p.get('placeInfo', {}).get('id') not in upserts
+			]
+			merged.extend(upserts.values())
+			payload['places'] = merged
+			cat_map = payload.get('categories', {})
+			cat_map[category_type] = categories
+			payload['categories'] = cat_map
+			self._write_city_payload(city, payload)
 
 	def add_categories_to_database(
 		self, city, category_type: str, categories: list[str]
 	):
-		payload = self._load_city_payload(city)
-		cat_map = payload.get('categories', {})
-		cat_map[category_type] = categories
-		payload['categories'] = cat_map
-		self._write_city_payload(city, payload)
+		with self._city_lock(city):
+			payload = self._load_city_payload(city)
+			cat_map = payload.get('categories', {})
+			cat_map[category_type] = categories
+			payload['categories'] = cat_map
+			self._write_city_payload(city, payload)
+
+	def get_categories(self, city) -> dict[str, list[str]]:
+		"""Return the category lists stored for a city."""
+		return self._load_city_payload(city).get('categories', {})
 
 	def read_places_data_from_db(
 		self, city, place_type: str, placeCreator: type[PlaceCreator]
@@ -92,6 +149,14 @@ class DataBase:
 		"""Check if we have cached data for a city."""
 		return (self.places_path / self._city_file(city)).exists()
 
+	def city_version(self, city) -> tuple | None:
+		"""Return a token that changes whenever the city's stored data changes."""
+		try:
+			stat = (self.places_path / self._city_file(city)).stat()
+		except FileNotFoundError:
+			return None
+		return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
 	def get_all_places(self, city, place_type: str):
 		"""Return all raw places for a city."""
 		payload = self._load_city_payload(city)
@@ -114,3 +179,26 @@ class DataBase:
 			if place_id:
 				place_map[place_id] = PlaceCreatorDatabase(item, city).create_place()
 		return place_map
+
+	def query_places(
+		self,
+		city: City,
+		place_type: str | None = None,
+		min_rating: float | None = None,
+		limit: int | None = None,
+	) -> list[dict[str, Any]]:
+		"""Return raw places of a city filtered by type and minimum rating.
+
+		Results are ordered by rating, best first.
+		"""
+		matches = []
+		for item in self._load_city_payload(city).get('places', []):
+			types = set(item.get('types') or []) | {item.get('primaryType') or ''}
+			rating = float(item.get('ratings', {}).get('rating') or 0)
+			if place_type is not None and place_type not in types:
+				continue
+			if min_rating is not None and rating < min_rating:
+				continue
+			matches.append((rating, item))
+		matches.sort(key=lambda match: -match[0])
+		return [item for _, item in matches[:limit]]
@@ -0,0 +1,32 @@
+"""Copy the JSON places files into the SQLite store.
+
+Run from apps/backend: ``uv run python -m src.database.migrate_places``.
+Reads $DATA_DIR/places/*.json and writes $PLACES_DB_PATH (by default
+$DATA_DIR/places.sqlite3). The JSON files are left untouched; set
+DATABASE_BACKEND=sqlite afterwards to serve from the new store.
+"""
+
+import argparse
+
+from src.database.sqlite_database import SQLiteDataBase
+
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument(
+		'--source', help='directory with <country>_<city id>.json files'
+	)
+	parser.add_argument('--target', help='SQLite file to write')
+	args = parser.parse_args()
+
+	db = SQLiteDataBase(db_path=args.target)
+	imported = db.import_json_places(args.source)
+	for city_key, count in imported.items():
+		print(f'{city_key}: {count} places')
+	print(
+		f'Imported {sum(imported.values())} places from {len(imported)} cities into {db.db_path}'
+	)
+
+
+if __name__ == '__main__':
+	main()
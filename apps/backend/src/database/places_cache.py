@@ -0,0 +1,106 @@
+"""Process-wide cache of hydrated city datasets."""
+
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from dotenv import load_dotenv
+
+from src.data_model import Places
+from src.data_model.city.city import City
+from src.data_model.place.place import PlaceCreator, PlaceCreatorDatabase
+from src.database.database import DataBase
+
+load_dotenv()
+
+
+class PlacesCache:
+	"""LRU cache of the places read for a city, bounded by a byte budget.
+
+	An entry is reused only while ``db.city_version(city)`` is unchanged, so
+	any write to the city (from this or another process) invalidates it.
+	Places are kept pickled: the pickle size is what counts against the
+	budget, and every get() unpickles a fresh copy so a request can mutate
+	ratings or opening hours without affecting other requests.
+
+	Attributes:
+	:param max_bytes: int - total size of the pickled datasets kept in memory, 0 disables the cache
+
+	Methods:
+	get(db, city, placeCreator) - return the city's places, reading them from db on a miss
+	clear() - drop every entry
+	"""
+
+	def __init__(self, max_bytes: int | None = None):
+		if max_bytes is None:
+			max_bytes = int(os.getenv('CITY_CACHE_MAX_BYTES') or 128 * 1024 * 1024)
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self._entries: OrderedDict[tuple, tuple[Any, bytes]] = OrderedDict()
+		self._size = 0
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _key(db: DataBase, city: City, placeCreator: type[PlaceCreator]) -> tuple:
+		return (
+			type(db).__name__,
+			str(db.base_path),
+			db._city_file(city).name,
+			placeCreator.__name__,
+		)
+
+	def get(
+		self,
+		db: DataBase,
+		city: City,
+		placeCreator: type[PlaceCreator] = PlaceCreatorDatabase,
+	) -> Places:
+		"""Return an isolated copy of the city's places."""
+		key = self._key(db, city, placeCreator)
+		version = db.city_version(city)
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None and entry[0] == version:
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return Places(pickle.loads(entry[1]), city)
+			self.misses += 1
+
+		places = db.read_places_data_from_db(city, 'places', placeCreator)
+		if version is not None and self.max_bytes > 0:
+			self._put(
+				key, version, pickle.dumps(places.get_list(), pickle.HIGHEST_PROTOCOL)
+			)
+		return places
+
+	def _put(self, key: tuple, version: Any, blob: bytes):
+		with self._lock:
+			_, previous = self._entries.pop(key, (None, b''))
+			self._size -= len(previous)
+			if len(blob) > self.max_bytes:
+				return
+			self._entries[key] = (version, blob)
+			self._size += len(blob)
+			while self._size > self.max_bytes:
+				_, (_, evicted) = self._entries.popitem(last=False)
+				self._size -= len(evicted)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._size = 0
+
+	def stats(self) -> dict[str, int]:
+		with self._lock:
+			return {
+				'entries': len(self._entries),
+				'bytes': self._size,
+				'hits': self.hits,
+				'misses': self.misses,
+			}
+
+
+places_cache = PlacesCache()
@@ -0,0 +1,319 @@
+"""SQLite-backed storage for places data.
+
+Same interface as the JSON DataBase, but every place is its own row, so
+looking up one id or filtering a city by type or rating goes through an
+index instead of parsing and hydrating the whole city file.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from src.data_model import Places
+from src.data_model.city.city import City
+from src.data_model.place.place import Place, PlaceCreator, PlaceCreatorDatabase
+from src.database.database import DataBase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cities (
+	city_key TEXT PRIMARY KEY,
+	city_id TEXT NOT NULL,
+	version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS places (
+	city_key TEXT NOT NULL,
+	place_id TEXT NOT NULL,
+	position INTEGER NOT NULL,
+	primary_type TEXT NOT NULL DEFAULT '',
+	rating REAL NOT NULL DEFAULT 0,
+	data TEXT NOT NULL,
+	PRIMARY KEY (city_key, place_id)
+);
+CREATE TABLE IF NOT EXISTS place_types (
+	city_key TEXT NOT NULL,
+	place_id TEXT NOT NULL,
+	type TEXT NOT NULL,
+	PRIMARY KEY (city_key, place_id, type)
+);
+CREATE TABLE IF NOT EXISTS categories (
+	city_key TEXT NOT NULL,
+	category_type TEXT NOT NULL,
+	categories TEXT NOT NULL,
+	PRIMARY KEY (city_key, category_type)
+);
+CREATE INDEX IF NOT EXISTS places_by_id ON places (place_id);
+CREATE INDEX IF NOT EXISTS places_by_position ON places (city_key, position);
+CREATE INDEX IF NOT EXISTS places_by_rating ON places (city_key, rating);
+CREATE INDEX IF NOT EXISTS place_types_by_type ON place_types (city_key, type);
+"""
+
+
+def _place_row(place_dict: dict[str, Any]) -> tuple[str, str, float, list[str]]:
+	"""Extract the indexed columns from a serialized place."""
+	place_id = place_dict.get('placeInfo', {}).get('id', '')
+	primary_type = place_dict.get('primaryType') or ''
+	rating = float(place_dict.get('ratings', {}).get('rating') or 0)
+	types = set(place_dict.get('types') or [])
+	if primary_type:
+		types.add(primary_type)
+	return place_id, primary_type, rating, sorted(types)
+
+
+class SQLiteDataBase(DataBase):
+	"""Places persistence on an embedded SQLite file.
+
+	Places are kept in insertion order, so reads return them in the same
+	order as the JSON backend. Each thread gets its own connection and the
+	file runs in WAL mode, so the threaded server can read while it writes.
+
+	Attributes:
+	:param db_path: Path - the SQLite file, $DATA_DIR/places.sqlite3 by default
+	"""
+
+	def __init__(
+		self, base_path: str | Path | None = None, db_path: str | Path | None = None
+	):
+		super().__init__(base_path)
+		self.db_path = Path(
+			db_path or os.getenv('PLACES_DB_PATH') or self.base_path / 'places.sqlite3'
+		)
+		self.db_path.parent.mkdir(parents=True, exist_ok=True)
+		self._local = threading.local()
+		self._write_lock = threading.Lock()
+		with self._connection() as connection:
+			connection.executescript(SCHEMA)
+
+	def _connection(self) -> sqlite3.Connection:
+		connection = getattr(self._local, 'connection', None)
+		if connection is None:
+			connection = sqlite3.connect(self.db_path, timeout=30)
+			connection.execute('PRAGMA journal_mode=WAL')
+			connection.execute('PRAGMA synchronous=NORMAL')
+			self._local.connection = connection
+		return connection
+
+	@staticmethod
+	def _city_key(city: City) -> str:
+		return DataBase._city_file(city).stem
+
+	def _upsert(
+		self,
+		city_key: str,
+		city_id: str,
+		place_dicts: Iterable[dict[str, Any]],
+		category_type: str | None = None,
+		categories: list[str] | None = None,
+	):
+		"""Insert or replace places in one transaction.
+
+		A replaced place moves to the end, like in the JSON backend.
+		"""
+		with self._write_lock, self._connection() as connection:
+			connection.execute(
+				'INSERT OR IGNORE INTO cities (city_key, city_id) VALUES (?, ?)',
+				(city_key, city_id),
+			)
+			connection.execute(
+				'UPDATE cities SET version = version + 1 WHERE city_key = ?',
+				(city_key,),
+			)
+			(position,) = connection.execute(
+				'SELECT COALESCE(MAX(position), -1) FROM places WHERE city_key = ?',
+				(city_key,),
+			).fetchone()
+			for place_dict in place_dicts:
+				place_id, primary_type, rating, types = _place_row(place_dict)
+				position += 1
+				connection.execute(
+					'INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?)',
+					(
+						city_key,
+						place_id,
+						position,
+						primary_type,
+						rating,
+						json.dumps(place_dict),
+					),
+				)
+				connection.execute(
+					'DELETE FROM place_types WHERE city_key = ? AND place_id = ?',
+					(city_key, place_id),
+				)
+				connection.executemany(
+					'INSERT INTO place_types VALUES (?, ?, ?)',
+					[(city_key, place_id, place_type) for place_type in types],
+				)
+			if category_type is not None:
+				connection.execute(
+					'INSERT OR REPLACE INTO categories VALUES (?, ?, ?)',
+					(city_key, category_type, json.dumps(categories)),
+				)
+
+	def _place_dicts(self, city: City) -> list[dict[str, Any]]:
+		rows = self._connection().execute(
+			'SELECT data FROM places WHERE city_key = ? ORDER BY position',
+			(self._city_key(city),),
+		)
+		return [json.loads(data) for (data,) in rows]
+
+	def add_place_to_database(
+		self,
+		place: Place,
+		city: City,
+		category_type: str,
+		place_type: str,
+		categories: list[str],
+	):
+		"""Persist a place; a place with the same id is replaced."""
+		self._upsert(
+			self._city_key(city),
+			str(city.id),
+			[json.loads(place.to_json())],
+			category_type,
+			categories,
+		)
+
+	def bulk_upsert_places(
+		self,
+		city: City,
+		places: Iterable[Place],
+		category_type: str,
+		categories: list[str],
+	):
+		"""Persist many places in a single transaction."""
+		self._upsert(
+			self._city_key(city),
+			str(city.id),
+			(json.loads(place.to_json()) for place in places),
+			category_type,
+			categories,
+		)
+
+	def add_categories_to_database(
+		self, city, category_type: str, categories: list[str]
+	):
+		self._upsert(self._city_key(city), str(city.id), [], category_type, categories)
+
+	def get_categories(self, city) -> dict[str, list[str]]:
+		"""Return the category lists stored for a city."""
+		rows = self._connection().execute(
+			'SELECT category_type, categories FROM categories WHERE city_key = ?',
+			(self._city_key(city),),
+		)
+		return {category_type: json.loads(data) for category_type, data in rows}
+
+	def read_places_data_from_db(
+		self, city, place_type: str, placeCreator: type[PlaceCreator]
+	) -> Places:
+		"""Load places for a city and hydrate them into objects."""
+		places = [
+			placeCreator(item, city).create_place() for item in self._place_dicts(city)
+		]
+		return Places(places, city)
+
+	def check_if_city_exist(self, city):
+		"""Check if we have stored data for a city."""
+		row = (
+			self._connection()
+			.execute('SELECT 1 FROM cities WHERE city_key = ?', (self._city_key(city),))
+			.fetchone()
+		)
+		return row is not None
+
+	def city_version(self, city) -> tuple | None:
+		"""Return the city's write counter, bumped by every upsert."""
+		row = (
+			self._connection()
+			.execute(
+				'SELECT version FROM cities WHERE city_key = ?', (self._city_key(city),)
+			)
+			.fetchone()
+		)
+		return None if row is None else (str(self.db_path), row[0])
+
+	def get_all_places(self, city, place_type: str):
+		"""Return all raw places for a city."""
+		return self._place_dicts(city)
+
+	def get_place(self, city, place_id: str):
+		"""Return a single place by id."""
+		row = (
+			self._connection()
+			.execute(
+				'SELECT data FROM places WHERE city_key = ? AND place_id = ?',
+				(self._city_key(city), place_id),
+			)
+			.fetchone()
+		)
+		if row is None:
+			raise ValueError(f'Place {place_id} not found for city {city.id}')
+		return PlaceCreatorDatabase(json.loads(row[0]), city).create_place()
+
+	def get_place_map(self, city: City) -> dict[str, Place]:
+		"""Return a map of place id -> Place for a city."""
+		return {
+			item['placeInfo']['id']: PlaceCreatorDatabase(item, city).create_place()
+			for item in self._place_dicts(city)
+			if item.get('placeInfo', {}).get('id')
+		}
+
+	def query_places(
+		self,
+		city: City,
+		place_type: str | None = None,
+		min_rating: float | None = None,
+		limit: int | None = None,
+	) -> list[dict[str, Any]]:
+		"""Return raw places of a city filtered by type and minimum rating.
+
+		Results are ordered by rating, best first.
+		"""
+		query = 'SELECT data FROM places p WHERE p.city_key = ?'
+		params: list[Any] = [self._city_key(city)]
+		if place_type is not None:
+			query += (
+				' AND EXISTS (SELECT 1 FROM place_types t WHERE t.city_key = p.city_key'
+				' AND t.place_id = p.place_id AND t.type = ?)'
+			)
+			params.append(place_type)
+		if min_rating is not None:
+			query += ' AND p.rating >= ?'
+			params.append(min_rating)
+		query += ' ORDER BY p.rating DESC, p.position'
+		if limit is not None:
+			query += ' LIMIT ?'
+			params.append(limit)
+		return [
+			json.loads(data) for (data,) in self._connection().execute(query, params)
+		]
+
+	def import_json_places(
+		self, places_path: str | Path | None = None
+	) -> dict[str, int]:
+		"""Copy every ``<country>_<city id>.json`` file into the SQLite store.
+
+		Re-running the import is safe: places are upserted by id.
+
+		:param places_path: directory with the JSON files, defaults to $DATA_DIR/places
+		:return: number of places imported per city file
+		"""
+		imported = {}
+		for file_path in sorted(Path(places_path or self.places_path).glob('*.json')):
+			with open(file_path, 'r', encoding='utf-8') as handle:
+				try:
+					payload = json.load(handle)
+				except json.JSONDecodeError:
+					continue
+			city_key = file_path.stem
+			places = payload.get('places', [])
+			self._upsert(city_key, city_key.rsplit('_', 1)[-1], places)
+			for category_type, categories in payload.get('categories', {}).items():
+				self._upsert(
+					city_key, city_key.rsplit('_', 1)[-1], [], category_type, categories
+				)
+			imported[city_key] = len(places)
+		return imported
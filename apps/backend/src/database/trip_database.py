@@ -1,10 +1,31 @@
-"""Local JSON-backed storage for trip history (global, no users)."""
+"""Local log-structured storage for trip history (global, no users).
+
+Every mutation is appended to ``trips.log`` as one JSON line:
+
+- ``{"op": "put", "trip": {...}}`` stores a trip; an existing id moves to the end,
+- ``{"op": "update", "trip": {...}}`` replaces a trip in place (ratings, edited days),
+- ``{"op": "del", "ids": [...]}`` removes trips.
+
+An in-memory index maps each live trip id to the offset of its latest
+record and is rebuilt by replaying the log at startup. Superseded records
+are dropped by a background compaction that rewrites the live trips to a
+new file and swaps it in with an atomic rename.
+
+Writes go through a single writer thread that group-commits: mutations
+queued within one commit window are applied in order and made durable with
+one write and one fsync; each caller blocks until its batch is on disk.
+"""
 
 import copy
 import json
+import logging
 import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 from uuid import uuid4
 
 from dotenv import load_dotenv
@@ -14,34 +35,321 @@ from src.data_model.city.city import City
 load_dotenv()
 
 
+def _encode(record: dict[str, Any]) -> bytes:
+	return json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+class _Batch:
+	"""Trips as seen by the mutations of one commit.
+
+	Reads see the committed log plus the records added earlier in the batch.
+	"""
+
+	def __init__(self, store: 'DataBaseTrips'):
+		self._store = store
+		self._overlay: dict[str, dict[str, Any] | None] = {}
+		self.records: list[dict[str, Any]] = []
+
+	def exists(self, trip_id: str) -> bool:
+		if trip_id in self._overlay:
+			return self._overlay[trip_id] is not None
+		return trip_id in self._store._index
+
+	def get(self, trip_id: str) -> dict[str, Any]:
+		if trip_id in self._overlay:
+			return copy.deepcopy(self._overlay[trip_id])
+		return self._store._read([trip_id])[0]
+
+	def add(self, record: dict[str, Any]):
+		self.records.append(record)
+		if record['op'] == 'del':
+			self._overlay.update(dict.fromkeys(record['ids']))
+		else:
+			self._overlay[record['trip']['id']] = record['trip']
+
+
+class TripChangedError(Exception):
+	"""Raised when a trip changed after the caller read it."""
+
+
 class DataBaseTrips:
-	"""Global persistence for trips, without user scoping."""
+	"""Global persistence for trips, without user scoping.
+
+	Each store runs a writer thread and keeps the log open; close() it, or use
+	it as a context manager, when done.
 
-	def __init__(self, base_path: str | Path | None = None):
+	Attributes:
+	:param compact_min_bytes: int - superseded bytes tolerated before compacting
+	:param commit_window: float - extra seconds the writer waits to gather a batch,
+		$TRIPS_COMMIT_WINDOW_MS (0) by default; with 0 a batch is whatever
+		queued up while the previous commit was being written
+	"""
+
+	def __init__(
+		self,
+		base_path: str | Path | None = None,
+		compact_min_bytes: int = 1024 * 1024,
+		commit_window: float | None = None,
+	):
 		default_base = Path(__file__).resolve().parents[2] / 'data'
-		self.base_path = Path(os.getenv('DATA_DIR', base_path or default_base))
+		self.base_path = Path(base_path or os.getenv('DATA_DIR') or default_base)
 		self.base_path.mkdir(parents=True, exist_ok=True)
 		self.trips_file = self.base_path / 'trips.json'
-		if not self.trips_file.exists():
-			self._persist({'trips': []})
+		self.log_file = self.base_path / 'trips.log'
+		self.compact_min_bytes = compact_min_bytes
+		self._lock = threading.RLock()
+		self._compact_lock = threading.Lock()
+		self._compaction: threading.Thread | None = None
+		self._index: dict[str, tuple[int, int]] = {}
+		self._live_bytes = 0
+		self._size = 0
+		if not self.log_file.exists():
+			self._import_legacy()
+		self._replay()
+		self._handle = open(self.log_file, 'ab')
+		if commit_window is None:
+			commit_window = float(os.getenv('TRIPS_COMMIT_WINDOW_MS') or 0) / 1000
+		self.commit_window = commit_window
+		self.commits = 0
+		self._queue: queue.SimpleQueue = queue.SimpleQueue()
+		self._submit_lock = threading.Lock()
+		self._closed = False
+		self._writer_thread = threading.Thread(target=self._writer, daemon=True)
+		self._writer_thread.start()
+
+	def _import_legacy(self):
+		"""Write the trips of a pre-log ``trips.json`` (if any) as the initial log."""
+		trips = []
+		if self.trips_file.exists():
+			with open(self.trips_file, 'r', encoding='utf-8') as handle:
+				try:
+					trips = json.load(handle).get('trips', [])
+				except json.JSONDecodeError:
+					logging.warning(
+						'Could not parse %s, starting empty', self.trips_file
+					)
+		self._write_atomically(
+			self.log_file, [_encode({'op': 'put', 'trip': trip}) for trip in trips]
+		)
+
+	@staticmethod
+	def _write_atomically(path: Path, lines: list[bytes]):
+		tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+		with open(tmp_path, 'wb') as handle:
+			handle.writelines(lines)
+			handle.flush()
+			os.fsync(handle.fileno())
+		os.replace(tmp_path, path)
 
-	def _load(self) -> dict[str, Any]:
-		with open(self.trips_file, 'r', encoding='utf-8') as handle:
+	@staticmethod
+	def _apply(
+		index: dict[str, tuple[int, int]],
+		record: dict[str, Any],
+		offset: int,
+		length: int,
+	) -> int:
+		"""Apply one log record to an index; returns the change in live bytes."""
+		delta = 0
+		if record['op'] == 'del':
+			for trip_id in record['ids']:
+				_, previous = index.pop(trip_id, (0, 0))
+				delta -= previous
+			return delta
+		trip_id = record['trip']['id']
+		if record['op'] == 'put':
+			_, previous = index.pop(trip_id, (0, 0))
+		else:
+			_, previous = index.get(trip_id, (0, 0))
+		index[trip_id] = (offset, length)
+		return length - previous
+
+	def _replay(self):
+		"""Rebuild the index from the log, dropping a torn last record.
+
+		Only a final line without its newline is a torn write and is cut off;
+		an unreadable record before it raises ValueError instead of silently
+		losing every trip written after it.
+		"""
+		offset = 0
+		with open(self.log_file, 'rb') as handle:
+			for line in handle:
+				if not line.endswith(b'\n'):
+					logging.warning(
+						'Truncating incomplete record at the end of %s', self.log_file
+					)
+					os.truncate(self.log_file, offset)
+					break
+				try:
+					record = json.loads(line)
+				except json.JSONDecodeError:
+					raise ValueError(
+						f'Corrupt record at byte {offset} of {self.log_file}'
+					) from None
+				self._live_bytes += self._apply(self._index, record, offset, len(line))
+				offset += len(line)
+		self._size = offset
+
+	def _append(self, records: list[dict[str, Any]]):
+		"""Durably append records and update the index; caller holds the lock."""
+		lines = [_encode(record) for record in records]
+		try:
+			self._handle.write(b''.join(lines))
+			self._handle.flush()
+			os.fsync(self._handle.fileno())
+		except Exception:
+			# keep a partial write from ending up in the middle of the log, and
+			# reopen the handle so bytes still buffered in it are dropped too
+			os.truncate(self.log_file, self._size)
 			try:
-				return json.load(handle)
-			except json.JSONDecodeError:
-				return {'trips': []}
+				self._handle.close()
+			except OSError:
+				pass
+			self._handle = open(self.log_file, 'ab')
+			raise
+		for record, line in zip(records, lines):
+			self._live_bytes += self._apply(self._index, record, self._size, len(line))
+			self._size += len(line)
+		self._maybe_compact()
+
+	def _writer(self):
+		"""Commit queued mutations until close() queues None."""
+		while True:
+			item = self._queue.get()
+			if item is None:
+				return
+			batch = [item]
+			deadline = time.monotonic() + self.commit_window
+			while True:
+				try:
+					item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+				except queue.Empty:
+					break
+				if item is None:
+					self._commit(batch)
+					return
+				batch.append(item)
+			self._commit(batch)
+
+	def _commit(self, batch: list[tuple[Callable[[_Batch], Any], Future]]):
+		"""Apply queued mutations in order and persist them with one fsync."""
+		outcomes = []
+		with self._lock:
+			staged = _Batch(self)
+			for mutation, future in batch:
+				try:
+					outcomes.append((future, mutation(staged), None))
+				except Exception as exc:
+					outcomes.append((future, None, exc))
+			if staged.records:
+				try:
+					self._append(staged.records)
+					self.commits += 1
+				except Exception as exc:
+					logging.exception(
+						'Could not persist %d trip records', len(staged.records)
+					)
+					outcomes = [
+						(future, None, error or exc) for future, _, error in outcomes
+					]
+		for future, result, error in outcomes:
+			if error is None:
+				future.set_result(result)
+			else:
+				future.set_exception(error)
 
-	def _persist(self, payload: dict[str, Any]):
-		self.trips_file.parent.mkdir(parents=True, exist_ok=True)
-		with open(self.trips_file, 'w', encoding='utf-8') as handle:
-			json.dump(payload, handle)
+	def _submit(self, mutation: Callable[[_Batch], Any]) -> Any:
+		"""Queue a mutation and wait until the batch containing it is durable."""
+		future = Future()
+		with self._submit_lock:
+			if self._closed:
+				raise RuntimeError(f'Trip store {self.log_file} is closed')
+			self._queue.put((mutation, future))
+		return future.result()
+
+	def close(self):
+		"""Commit the queued mutations, stop the writer thread and close the log."""
+		with self._submit_lock:
+			if self._closed:
+				return
+			self._closed = True
+			self._queue.put(None)
+		self._writer_thread.join()
+		if self._compaction is not None:
+			self._compaction.join()
+		with self._lock:
+			self._handle.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+	def _read(self, trip_ids: list[str]) -> list[dict[str, Any]]:
+		"""Return the latest stored trips; caller holds the lock."""
+		with open(self.log_file, 'rb') as handle:
+			trips = []
+			for trip_id in trip_ids:
+				offset, length = self._index[trip_id]
+				trips.append(
+					json.loads(os.pread(handle.fileno(), length, offset))['trip']
+				)
+			return trips
+
+	def _maybe_compact(self):
+		garbage = self._size - self._live_bytes
+		if garbage < max(self.compact_min_bytes, self._live_bytes):
+			return
+		if self._compaction is not None and self._compaction.is_alive():
+			return
+		self._compaction = threading.Thread(target=self.compact, daemon=True)
+		self._compaction.start()
+
+	def compact(self):
+		"""Rewrite the log with only the live records.
+
+		The bulk copy runs without the lock; records appended meanwhile are
+		copied over under the lock right before the new file is swapped in.
+		"""
+		with self._compact_lock:
+			self._compact()
+
+	def _compact(self):
+		with self._lock:
+			snapshot = list(self._index.items())
+			snapshot_size = self._size
+		tmp_path = self.log_file.with_suffix('.compact.tmp')
+		index: dict[str, tuple[int, int]] = {}
+		live_bytes = offset = 0
+		with open(self.log_file, 'rb') as source, open(tmp_path, 'wb') as target:
+			for trip_id, (old_offset, length) in snapshot:
+				line = os.pread(source.fileno(), length, old_offset)
+				record = json.loads(line)
+				record['op'] = 'put'
+				line = _encode(record)
+				target.write(line)
+				index[trip_id] = (offset, len(line))
+				live_bytes += len(line)
+				offset += len(line)
+			with self._lock:
+				source.seek(snapshot_size)
+				for line in source:
+					live_bytes += self._apply(
+						index, json.loads(line), offset, len(line)
+					)
+					target.write(line)
+					offset += len(line)
+				target.flush()
+				os.fsync(target.fileno())
+				os.replace(tmp_path, self.log_file)
+				self._handle.close()
+				self._handle = open(self.log_file, 'ab')
+				self._index = index
+				self._live_bytes = live_bytes
+				self._size = offset
 
 	def save_trip_history(self, city: City, itinerary: dict) -> str:
 		"""Persist a trip itinerary globally."""
-		data = self._load()
-		trips = data.setdefault('trips', [])
-
 		itinerary_copy = copy.deepcopy(itinerary)
 		days = itinerary_copy.pop('days', [])
 		trip_id = itinerary_copy.pop('id', str(uuid4()))
@@ -53,11 +361,7 @@ class DataBaseTrips:
 			'city_name': city.name,
 			**itinerary_copy,
 		}
-
-		trips = [t for t in trips if t.get('id') != trip_id]
-		trips.append(payload)
-		data['trips'] = trips
-		self._persist(data)
+		self._submit(lambda batch: batch.add({'op': 'put', 'trip': payload}))
 		return trip_id
 
 	@staticmethod
@@ -68,48 +372,65 @@ class DataBaseTrips:
 		return trip_info
 
 	def get_trip(self, trip_id: str):
-		data = self._load()
-		for trip in data.get('trips', []):
-			if trip.get('id') == trip_id:
-				return self._trip_to_dict(trip)
-		raise ValueError(f'Trip {trip_id} not found')
+		with self._lock:
+			if trip_id not in self._index:
+				raise ValueError(f'Trip {trip_id} not found')
+			return self._trip_to_dict(self._read([trip_id])[0])
 
 	def get_trip_history(self):
-		data = self._load()
-		return [self._trip_to_dict(trip) for trip in data.get('trips', [])]
+		return self.get_trip_page()[0]
+
+	def get_trip_page(
+		self, cursor: str | None = None, limit: int | None = None
+	) -> tuple[list[dict[str, Any]], str | None]:
+		"""Return trips in history order, starting after the trip id ``cursor``.
+
+		:return: (trips, next_cursor); next_cursor is None on the last page
+		"""
+		with self._lock:
+			ids = list(self._index)
+			start = 0
+			if cursor is not None:
+				if cursor not in self._index:
+					raise ValueError(f'Trip {cursor} not found')
+				start = ids.index(cursor) + 1
+			end = len(ids) if limit is None else start + limit
+			page = ids[start:end]
+			trips = [self._trip_to_dict(trip) for trip in self._read(page)]
+		next_cursor = page[-1] if page and end < len(ids) else None
+		return trips, next_cursor
 
 	def delete_trip(self, trip_id: str):
 		"""Delete a trip from history."""
-		data = self._load()
-		trips = data.get('trips', [])
-		remaining = [trip for trip in trips if trip.get('id') != trip_id]
-		if len(remaining) == len(trips):
-			raise ValueError(f'Trip {trip_id} not found')
-		data['trips'] = remaining
-		self._persist(data)
+
+		def mutation(batch: _Batch):
+			if not batch.exists(trip_id):
+				raise ValueError(f'Trip {trip_id} not found')
+			batch.add({'op': 'del', 'ids': [trip_id]})
+
+		self._submit(mutation)
 
 	def delete_trips(self, trip_ids: list[str]) -> tuple[list[str], list[str]]:
 		"""Delete multiple trips atomically; returns (deleted_ids, missing_ids)."""
-		data = self._load()
-		trips = data.get('trips', [])
-		existing_ids = {trip.get('id') for trip in trips}
-		missing_ids = [trip_id for trip_id in trip_ids if trip_id not in existing_ids]
-		if missing_ids:
-			return [], missing_ids
-		remaining = [trip for trip in trips if trip.get('id') not in set(trip_ids)]
-		data['trips'] = remaining
-		self._persist(data)
-		return trip_ids, []
+
+		def mutation(batch: _Batch):
+			missing_ids = [trip_id for trip_id in trip_ids if not batch.exists(trip_id)]
+			if missing_ids:
+				return [], missing_ids
+			batch.add({'op': 'del', 'ids': list(trip_ids)})
+			return trip_ids, []
+
+		return self._submit(mutation)
 
 	def set_trip_rating(
 		self, trip_id: str, day_index: int, place_index: int, rating: float
 	):
 		"""Update rating for a place within a stored trip."""
-		data = self._load()
-		trips = data.get('trips', [])
-		for trip in trips:
-			if trip.get('id') != trip_id:
-				continue
+
+		def mutation(batch: _Batch):
+			if not batch.exists(trip_id):
+				raise ValueError(f'Trip {trip_id} not found')
+			trip = batch.get(trip_id)
 			days = trip.get('days', [])
 			if day_index >= len(days):
 				raise IndexError('Invalid day index')
@@ -117,6 +438,34 @@ class DataBaseTrips:
 			if place_index >= len(places):
 				raise IndexError('Invalid place index')
 			places[place_index]['user_rating'] = rating
-			self._persist(data)
-			return
-		raise ValueError(f'Trip {trip_id} not found')
+			batch.add({'op': 'update', 'trip': trip})
+
+		self._submit(mutation)
+
+	def set_trip_days(
+		self,
+		trip_id: str,
+		days: dict[int, dict[str, Any]],
+		expected_days: list[dict[str, Any]] | None = None,
+	):
+		"""Replace days of a stored trip, keyed by day index.
+
+		With expected_days, the days are only replaced if the stored ones
+		still equal them, otherwise TripChangedError is raised, so changes
+		computed from an earlier read do not overwrite later ones.
+		"""
+
+		def mutation(batch: _Batch):
+			if not batch.exists(trip_id):
+				raise ValueError(f'Trip {trip_id} not found')
+			trip = batch.get(trip_id)
+			stored_days = trip.get('days', [])
+			if expected_days is not None and stored_days != expected_days:
+				raise TripChangedError(f'Trip {trip_id} changed during the edit')
+			for day_index, day in days.items():
+				if day_index >= len(stored_days):
+					raise IndexError('Invalid day index')
+				stored_days[day_index] = day
+			batch.add({'op': 'update', 'trip': trip})
+
+		self._submit(mutation)
@@ -20,7 +20,7 @@ class DataBaseUsers:
 
 	def __init__(self, base_path: str | Path | None = None):
 		default_base = Path(__file__).resolve().parents[2] / 'data'
-		self.base_path = Path(os.getenv('DATA_DIR', base_path or default_base))
+		self.base_path = Path(base_path or os.getenv('DATA_DIR') or default_base)
 		self.base_path.mkdir(parents=True, exist_ok=True)
 		self.users_file = self.base_path / 'users.json'
 		if not self.users_file.exists():
@@ -1,57 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 
-def initialize_centroids_kmeans_plusplus(data, k):
+def initialize_centroids_kmeans_plusplus(data, k, rng=None):
+	"""Pick k initial centroids among the points with k-means++ seeding.
+	:param data: array of points, one row per point
+	:param k: number of centroids
+	:param rng: numpy Generator, a fresh one by default
+	:return: array of k centroids
+	"""
+	rng = np.random.default_rng(rng)
 	n, features = data.shape
 	centroids = np.zeros((k, features))
+	centroids[0] = data[rng.integers(n)]
 
-	initial_idx = np.random.choice(n)
-	centroids[0] = data[initial_idx]
-
+	# squared distance of every point to its closest centroid so far
+	closest = ((data - centroids[0]) ** 2).sum(axis=1)
 	for i in range(1, k):
-		distances = np.array(
-			[min([np.linalg.norm(x - c) for c in centroids[:i]]) for x in data]
-		)
-
-		probabilities = distances**2 / np.sum(distances**2)
-
-		centroids[i] = data[np.random.choice(n, p=probabilities)]
+		total = closest.sum()
+		if total > 0:
+			index = rng.choice(n, p=closest / total)
+		else:
+			# every point sits on a centroid already
+			index = rng.integers(n)
+		centroids[i] = data[index]
+		closest = np.minimum(closest, ((data - centroids[i]) ** 2).sum(axis=1))
 
 	return centroids
 
 
-def constrained_kmeans(data, k, fixed_clusters, flexible_clusters, max_iter=100):
-	n, features = data.shape
-	cluster_assignment = np.full(n, -1)
+def _allowed_clusters(n, k, fixed_clusters, flexible_clusters):
+	"""Boolean (n, k) mask of the clusters every point may join."""
+	allowed = np.ones((n, k), dtype=bool)
+	for idx, clusters in flexible_clusters.items():
+		allowed[idx] = False
+		allowed[idx, clusters] = True
 	for idx, cluster in fixed_clusters.items():
-		cluster_assignment[idx] = cluster
+		allowed[idx] = False
+		allowed[idx, cluster] = True
+	return allowed
 
-	centroids = initialize_centroids_kmeans_plusplus(data, k)
+
+def _kmeans_run(data, k, allowed, max_iter, rng):
+	"""One constrained k-means run, returns (centroids, assignment, inertia)."""
+	spatial = data[:, :-1]
+	centroids = initialize_centroids_kmeans_plusplus(data, k, rng)
 
 	for _ in range(max_iter):
-		spatial_distances = np.sqrt(
-			((data[:, np.newaxis, :-1] - centroids[:, :-1]) ** 2).sum(axis=2)
-		)
+		distances = ((spatial[:, np.newaxis, :] - centroids[:, :-1]) ** 2).sum(axis=2)
+		cluster_assignment = np.where(allowed, distances, np.inf).argmin(axis=1)
 
-		for i in range(n):
-			if i in flexible_clusters:
-				valid_clusters = flexible_clusters[i]
-				valid_distances = spatial_distances[i, valid_clusters]
-				cluster_assignment[i] = valid_clusters[np.argmin(valid_distances)]
-			elif i not in fixed_clusters:
-				cluster_assignment[i] = np.argmin(spatial_distances[i])
-
-		new_centroids = np.array(
-			[
-				data[cluster_assignment == i].mean(axis=0)
-				if np.any(cluster_assignment == i)
-				else centroids[i]
-				for i in range(k)
-			]
+		sums = np.zeros_like(centroids)
+		np.add.at(sums, cluster_assignment, data)
+		counts = np.bincount(cluster_assignment, minlength=k)
+		new_centroids = np.where(
+			counts[:, np.newaxis] > 0,
+			sums / np.maximum(counts, 1)[:, np.newaxis],
+			centroids,
 		)
 		if np.allclose(centroids, new_centroids):
 			break
 		centroids = new_centroids
 
-	w_averages = np.array([data[cluster_assignment == i, -1].mean() for i in range(k)])
+	inertia = ((spatial - centroids[cluster_assignment, :-1]) ** 2).sum()
+	return centroids, cluster_assignment, inertia
+
+
+def constrained_kmeans(
+	data,
+	k,
+	fixed_clusters,
+	flexible_clusters,
+	max_iter=100,
+	n_init=1,
+	random_state=None,
+	n_jobs=1,
+):
+	"""K-means where some points are pinned to one cluster or limited to a few.
+
+	Points are assigned by their distance on every feature but the last one
+	(the weight); centroids average all features. Runs n_init times with
+	seeds derived from random_state and keeps the run with the lowest
+	inertia, so the same random_state always gives the same clusters.
+
+	:param data: array of points, one row per point, the weight last
+	:param k: number of clusters
+	:param fixed_clusters: dict[int, int] - point index -> the only cluster it may join
+	:param flexible_clusters: dict[int, list[int]] - point index -> clusters it may join
+	:param max_iter: iterations per run
+	:param n_init: number of runs
+	:param random_state: seed of the runs, fresh entropy by default
+	:param n_jobs: runs executed at the same time in threads
+	:return: centroids, cluster of every point, average weight of every cluster
+	"""
+	n = data.shape[0]
+	allowed = _allowed_clusters(n, k, fixed_clusters, flexible_clusters)
+	seeds = np.random.SeedSequence(random_state).spawn(n_init)
+
+	def run(seed):
+		return _kmeans_run(data, k, allowed, max_iter, np.random.default_rng(seed))
+
+	if n_jobs > 1 and n_init > 1:
+		with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+			runs = list(executor.map(run, seeds))
+	else:
+		runs = [run(seed) for seed in seeds]
+	centroids, cluster_assignment, _ = min(runs, key=lambda result: result[2])
+
+	counts = np.bincount(cluster_assignment, minlength=k)
+	weights = np.bincount(cluster_assignment, weights=data[:, -1], minlength=k)
+	with np.errstate(invalid='ignore', divide='ignore'):
+		w_averages = weights / counts
 	return centroids, cluster_assignment, w_averages
@@ -13,7 +13,7 @@ from ..data_model.user.user_info import TripInfo
 from ..path import get_path
 from ..rating.cumulative_rating import calculate_cumulative_rating
 from ..route_optimalization import SplitForDays
-from ..route_optimalization.routing import Routing
+from ..route_optimalization.parallel_routing import day_solver
 
 breakfast_time = 60 * 8
 coffee_time = 60 * 10
@@ -26,7 +26,8 @@ eating_list = [breakfast_time, coffee_time, lunch_time, dinner_time, bar_time]
 class Recommendation:
 	"""Class that handles the recommendation process."""
 
-	def __init__(self, places: Places, user: TripInfo):
+	def __init__(self, places: Places, user: TripInfo, on_progress=None):
+		self.on_progress = on_progress
 		self.attractions_in_graph = None
 		self.user_hotel = user.hotel
 		self.days = user.days
@@ -40,6 +41,7 @@ class Recommendation:
 		self.dates = user.dates
 		self.weather = []
 		self.transportations = []
+		self.routing_stats = []
 
 	def check_good_hours(self):
 		for day in range(7):
@@ -51,8 +53,18 @@ class Recommendation:
 					place.regularOpeningHours.periods[day].open_in_minutes = 0
 					place.regularOpeningHours.periods[day].close_in_minutes = 0
 
-	def get_recommendation(self):
-		"""Function that gets the recommendation."""
+	def _report(self, stage: str, done: int | None = None, total: int | None = None):
+		"""Tell the caller (e.g. a background job) which stage is running."""
+		if self.on_progress is not None:
+			self.on_progress(stage, done, total)
+
+	def iter_days(self):
+		"""Run the pipeline up to routing and yield (index, day) as each day is solved.
+
+		Days are yielded in order, formatted like get_itinerary()['days'].
+		The summary is not computed; call summarize() afterwards.
+		"""
+		self._report('rating')
 		calculate_cumulative_rating(places=self.places, user_needs=self.user_needs)
 
 		self.check_good_hours()
@@ -69,33 +81,63 @@ class Recommendation:
 			]
 		)
 
-		splitForDays = SplitForDays(
-			from_date=self.dates[0],
-			to_date=self.dates[1],
-			places=places_positive_rating,
-		)
-		clustered_places = splitForDays.split()
-		print('clustered_places', clustered_places)
-		path = get_path('clusters.html', 'outputs')
-		# open_map(clustered_places, save_name=path)
-
 		self.recommended_places = []
-
-		for i, places in enumerate(clustered_places):
-			route, transportations = Routing(
-				places,
-				depot=self.user_hotel,
-				num_routes=1,
-				period_index=splitForDays.weekday_indices[i],
-			).get_routes()
+		self.transportations = []
+		self.routing_stats = []
+
+		if day_solver.planner == 'trip':
+			weekday_indices = SplitForDays.get_weekday_indices(
+				self.dates[0], self.dates[1]
+			)
+			self._report('routing', 0, len(weekday_indices))
+			solved_days = day_solver.solve_trip(
+				places_positive_rating, self.user_hotel, weekday_indices
+			)
+		else:
+			self._report('clustering')
+			splitForDays = SplitForDays(
+				from_date=self.dates[0],
+				to_date=self.dates[1],
+				places=places_positive_rating,
+			)
+			clustered_places = splitForDays.split()
+			print('clustered_places', clustered_places)
+			path = get_path('clusters.html', 'outputs')
+			# open_map(clustered_places, save_name=path)
+			weekday_indices = splitForDays.weekday_indices
+
+			self._report('routing', 0, len(clustered_places))
+			solved_days = day_solver.solve(
+				clustered_places, self.user_hotel, weekday_indices
+			)
+		for i, (route, transportations, stats) in enumerate(solved_days):
 			self.recommended_places.append(route)
 			self.transportations.append(transportations)
+			# the trip planner shares the stats of its single solve between the days
+			if stats not in self.routing_stats:
+				self.routing_stats.append(stats)
+			self._report('routing', i + 1, len(weekday_indices))
+			yield i, self.format_day(i)
 
 		print('recommended_places', self.recommended_places)
+		logging.info(
+			'Routing took %.0f ms for %d days',
+			sum(stats['wall_ms'] for stats in self.routing_stats),
+			len(self.recommended_places),
+		)
 
+	def summarize(self):
+		"""Ask the LLM for a summary of the solved days."""
+		self._report('summary')
 		self._get_summary()
-
 		print('summary', self.summary)
+		return self.summary
+
+	def get_recommendation(self):
+		"""Function that gets the recommendation."""
+		for _ in self.iter_days():
+			pass
+		self.summarize()
 
 		# open_map(self.recommended_places, city=self.places.city)
 		return self
@@ -167,24 +209,22 @@ class Recommendation:
 		toc = time.perf_counter()
 		print(f'Summary in {toc - tic:0.4f} seconds')
 
+	def format_day(self, index: int) -> dict:
+		"""Function that returns the places (with transportation) and weather of a day."""
+		day_with_attributes = []
+		for j, place in enumerate(self.recommended_places[index].get_list()):
+			try:
+				transportation = self.transportations[index][j]
+			except IndexError:
+				transportation = None
+			day_with_attributes.append(
+				PlaceVisitor().place_to_itinerary(place, transportation)
+			)
+		return {'places': day_with_attributes, 'weather': self.weather[index]}
+
 	def get_itinerary(self):
 		"""Function that returns a list of place for each day."""
-		formatted_places = []
-		for i, places in enumerate(self.recommended_places):
-			day_with_attributes = []
-			for j, place in enumerate(places.get_list()):
-				try:
-					transportation = self.transportations[i][j]
-				except IndexError:
-					transportation = None
-				day_with_attributes.append(
-					PlaceVisitor().place_to_itinerary(place, transportation)
-				)
-			formatted_places.append(day_with_attributes)
-		days = [
-			{'places': places, 'weather': self.weather[i]}
-			for i, places in enumerate(formatted_places)
-		]
+		days = [self.format_day(i) for i in range(len(self.recommended_places))]
 		itinerary = {
 			'days': days,
 			'summary': self.summary,
@@ -192,5 +232,5 @@ class Recommendation:
 			'city_name': self.places.city.name,
 			'city_id': self.places.city.id,
 		}
-		logging.info(formatted_places)
+		logging.info([day['places'] for day in days])
 		return itinerary
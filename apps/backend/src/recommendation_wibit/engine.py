@@ -352,8 +352,11 @@ def _preferred_categories(preferences: UserPreferences) -> List[str]:
     return [c for c in codes if c]
 
 
-def recommend_itinerary(places: Places, preferences: UserPreferences, dates: Tuple[date, date], city_name: str | None = None) -> dict:
-    """Build itinerary using the WiBIT-like heuristic."""
+def recommend_itinerary(places: Places, preferences: UserPreferences, dates: Tuple[date, date], city_name: str | None = None, on_progress=None) -> dict:
+    """Build itinerary using the WiBIT-like heuristic.
+
+    on_progress, when given, is called as on_progress(stage, done, total).
+    """
     poi_candidates: List[Tuple[PointOfInterest, Place]] = []
     for place in places.get_list():
         poi = _to_poi(place)
@@ -379,7 +382,9 @@ def recommend_itinerary(places: Places, preferences: UserPreferences, dates: Tup
     schedule: List[Trajectory] = []
     days = _days_from_dates(dates)
 
-    for day in days:
+    for i, day in enumerate(days):
+        if on_progress is not None:
+            on_progress('planning', i, len(days))
         best_candidates = evaluator.extract_best(day, already_recommended)
         trajectory = build_trajectory(day, best_candidates, visiting_time_provider)
         for event in trajectory.events:
@@ -405,6 +410,8 @@ def recommend_itinerary(places: Places, preferences: UserPreferences, dates: Tup
 
     summary = ''
     if city_name:
+        if on_progress is not None:
+            on_progress('summary')
         summary = Llama.get_summary(city=city_name, trip=summary_trip)
 
     # Persist the selected date range so the frontend can show start/end dates in history.
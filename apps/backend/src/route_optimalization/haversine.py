@@ -1,5 +1,6 @@
 import math
 
+import numpy as np
 from numpy import inf
 
 
@@ -27,6 +28,28 @@ def calculate_distance(lat1, lng1, lat2, lng2) -> float:
 	return distance
 
 
+def calculate_distances(lat1, lng1, lat2, lng2) -> np.ndarray:
+	"""Vectorized calculate_distance over arrays of coordinates.
+	Same formula; NumPy's trigonometry may differ from math's in the last bit.
+	"""
+	earth_radius = 6371.0
+	lat1_rad = np.radians(np.asarray(lat1, dtype=float))
+	lng1_rad = np.radians(np.asarray(lng1, dtype=float))
+	lat2_rad = np.radians(np.asarray(lat2, dtype=float))
+	lng2_rad = np.radians(np.asarray(lng2, dtype=float))
+
+	dlat = lat2_rad - lat1_rad
+	dlng = lng2_rad - lng1_rad
+
+	a = (
+		np.sin(dlat / 2) ** 2
+		+ np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlng / 2) ** 2
+	)
+	c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+	return earth_radius * c
+
+
 def calculate_nearest_place(
 	user_location, places: list[dict]
 ) -> dict[str, str | float]:
@@ -0,0 +1,161 @@
+"""Plan every day of a trip as one VRP, with a vehicle per day."""
+
+import logging
+
+import numpy as np
+
+from src.data_model.place.place import Place
+from src.data_model.places.places import Places
+from src.route_optimalization.routing import Routing, SolverProfile
+
+
+class MultiDayRouting(Routing):
+	"""Vehicles Routing Problem over the whole trip, one vehicle per day.
+
+	Unlike clustering the places into days first and routing each day on
+	its own, a place can end up on any day it is open, so it is not lost
+	because its cluster's day is full. Every place gets one visit node per
+	trip day it is open on, restricted to that day's vehicle and with that
+	weekday's time window; the visit nodes of a place share one disjunction,
+	so it is visited at most once or dropped for its penalty.
+
+	Only the must-see places and the best rated others, up to
+	``candidates_per_day`` places per day, are routed, which keeps the
+	number of visit nodes close to what the per-day solves see.
+
+	Attributes:
+	:param period_indices: list[int] - weekday index of every day of the trip
+	:param candidates_per_day: int - places routed per day of the trip
+	:param visits: list[tuple[int, int]] - (place position, day) of every visit node after the depot
+
+	Methods:
+	get_day_routes() - (route, transportations) of every day, in day order
+	"""
+
+	def __init__(
+		self,
+		places: Places,
+		depot: Place,
+		period_indices: list[int],
+		profile: SolverProfile | str | None = None,
+		candidates_per_day: int = 30,
+	):
+		self.period_indices = list(period_indices)
+		self.candidates_per_day = candidates_per_day
+		self.visits: list[tuple[int, int]] = []
+		super().__init__(
+			self._candidates(places),
+			depot=depot,
+			num_routes=len(self.period_indices),
+			period_index=self.period_indices[0],
+			profile=profile,
+		)
+
+	def _candidates(self, places: Places) -> Places:
+		"""Places open on some day of the trip, must-see first, then by rating."""
+		candidates = [
+			place
+			for place in places.get_list()
+			if any(
+				place.regularOpeningHours.periods[period_index].open_today
+				for period_index in self.period_indices
+			)
+		]
+		candidates.sort(
+			key=lambda place: (place.must_see, place.ratings.cumulative_rating),
+			reverse=True,
+		)
+		limit = max(
+			self.candidates_per_day * len(self.period_indices),
+			sum(place.must_see for place in candidates),
+		)
+		return Places(candidates[:limit], places.city)
+
+	def _open_close_time(self):
+		"""Time windows of the depot and of every visit node.
+		:return: opening and closing time for every node
+		"""
+		self.visits = []
+		time_windows = [(600, self.max_time)]
+		for position, place in enumerate(self.places.get_list()):
+			for day, period_index in enumerate(self.period_indices):
+				if place.regularOpeningHours.periods[period_index].open_today:
+					self.visits.append((position, day))
+					time_windows.append(self._visit_window(place, period_index))
+		return time_windows
+
+	def _node_rows(self) -> np.ndarray:
+		"""Row of the time matrix of every node."""
+		return np.array([0] + [position + 1 for position, _ in self.visits], dtype=int)
+
+	def _transit_matrix(self) -> list[list[int]]:
+		"""Travel time between the nodes plus the time spent at the start node."""
+		rows = self._node_rows()
+		service_times = np.concatenate([[0], self.places.estimated_times])[rows]
+		transit = np.array(self.matrix, dtype=np.int64)[np.ix_(rows, rows)]
+		return (transit + service_times[:, np.newaxis]).tolist()
+
+	def _add_disjunctions(self, manager, routing):
+		"""Visit every place at most once, on a day it is open."""
+		nodes_of_place: dict[int, list[int]] = {}
+		for node, (position, day) in enumerate(self.visits, start=1):
+			index = manager.NodeToIndex(node)
+			# -1: unperformed
+			routing.VehicleVar(index).SetValues([-1, day])
+			nodes_of_place.setdefault(position, []).append(index)
+		for position, indices in nodes_of_place.items():
+			place = self.places.get_by_index(position)
+			routing.AddDisjunction(indices, self._penalty(place), 1)
+
+	def print_solution(self, manager, routing, solution):
+		"""Logs the places of every day."""
+		for vehicle_id in range(self.num_routes):
+			route, _ = self._routes_from_solution(
+				manager, routing, solution, vehicle_id
+			)
+			logging.debug(
+				'Day %d: %s',
+				vehicle_id,
+				[place.placeInfo.displayName for place in route.get_list()],
+			)
+
+	def _routes_from_solution(
+		self, manager, routing, solution, vehicle_id: int = 0
+	) -> tuple[Places, list[tuple[int, str]]]:
+		"""Function that returns the route of one day from the solution.
+		:param vehicle_id: day of the trip
+		:return: places of the day and the transportation between them
+		"""
+		rows = self._node_rows()
+		day = []
+		transportations = []
+		index = routing.Start(vehicle_id)
+		last_row = 0
+		while not routing.IsEnd(index):
+			row = rows[manager.IndexToNode(index)]
+			if row != 0:
+				day.append(self.places.get_by_index(row - 1))
+			if row != 0 and last_row != 0:
+				transportations.append(
+					(self.matrix[last_row][row], self.transport_modes[last_row][row])
+				)
+			last_row = row
+			index = solution.Value(routing.NextVar(index))
+		return Places(day, self.places.city), transportations
+
+	def get_day_routes(self) -> list[tuple[Places, list[tuple[int, str]]]]:
+		manager, routing, solution = self.solver_route()
+		days = [
+			self._routes_from_solution(manager, routing, solution, vehicle_id)
+			for vehicle_id in range(self.num_routes)
+		]
+		visited = {
+			place.placeInfo.id for route, _ in days for place in route.get_list()
+		}
+		self.stats['days'] = self.num_routes
+		self.stats['visits'] = len(self.visits)
+		self.stats['dropped_must_see'] = sum(
+			place.must_see and place.placeInfo.id not in visited
+			for place in self.places.get_list()
+		)
+		return days
@@ -0,0 +1,232 @@
+"""Solve the per-day routing problems of a trip on a process pool."""
+
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from collections import deque
+from collections.abc import Iterator
+from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+
+from dotenv import load_dotenv
+
+from src.data_model.place.place import Place
+from src.data_model.places.places import Places
+from src.route_optimalization.multi_day_routing import MultiDayRouting
+from src.route_optimalization.route_cache import route_cache
+from src.route_optimalization.routing import Routing, SolverProfile, get_solver_profile
+
+load_dotenv()
+
+DayRoute = tuple[Places, list[tuple[int, str]], dict[str, Any]]
+
+
+def solve_day(
+	places: Places,
+	depot: Place,
+	period_index: int,
+	profile: SolverProfile | None = None,
+) -> DayRoute:
+	"""Solve one day; module level so worker processes can unpickle it.
+
+	A day solved before with the same places, weekday, depot and profile is
+	taken from route_cache without building the time matrix.
+	"""
+	profile = get_solver_profile(profile)
+	start = perf_counter()
+	key = route_cache.key(places, depot, period_index, profile)
+	cached = route_cache.get(key, places)
+	if cached is not None:
+		route, transportations, stats = cached
+		stats['wall_ms'] = round((perf_counter() - start) * 1000, 1)
+		return route, transportations, stats
+	routing = Routing(
+		places, depot=depot, num_routes=1, period_index=period_index, profile=profile
+	)
+	route, transportations = routing.get_routes()
+	route_cache.put(key, route, transportations, routing.stats)
+	return route, transportations, routing.stats
+
+
+def solve_trip(
+	places: Places,
+	depot: Place,
+	period_indices: list[int],
+	profile: SolverProfile | None = None,
+) -> list[DayRoute]:
+	"""Solve all days as one VRP; every day carries the stats of that one solve."""
+	routing = MultiDayRouting(places, depot, period_indices, profile=profile)
+	return [
+		(route, transportations, routing.stats)
+		for route, transportations in routing.get_day_routes()
+	]
+
+
+class DaySolver:
+	"""Runs the independent per-day VRP solves in worker processes.
+
+	With the transit matrix registered natively, the search itself runs
+	without the GIL, but building the model (time windows, disjunctions,
+	dimension bounds per node), the solution callback and reading the routes
+	back are Python; in threads they would be serialized by the GIL and
+	compete with the server's request threads. Worker processes also keep a
+	crash in the native solver from taking the server down. Days are yielded
+	in order, each as soon as it and all earlier days are solved. With one
+	worker, a single day, or a broken pool the days are solved serially in
+	this process, which gives the same routes. The solver stats of the last
+	solves are kept for stats().
+
+	The planner decides how a trip is split: 'days' clusters the places into
+	days and routes every day on its own (solve), 'trip' routes all days at
+	once with MultiDayRouting (solve_trip).
+
+	Attributes:
+	:param workers: int - worker processes, $ROUTING_WORKERS or min(4, CPUs) by default; 1 disables the pool
+	:param planner: str - 'days' or 'trip', $ROUTING_PLANNER or 'days' by default
+	"""
+
+	def __init__(self, workers: int | None = None, planner: str | None = None):
+		if workers is None:
+			workers = int(os.getenv('ROUTING_WORKERS') or min(4, os.cpu_count() or 1))
+		self.workers = workers
+		self.planner = planner or os.getenv('ROUTING_PLANNER') or 'days'
+		if self.planner not in ('days', 'trip'):
+			raise ValueError(f'Unknown routing planner {self.planner}')
+		self._pool: ProcessPoolExecutor | None = None
+		self._lock = threading.Lock()
+		self._recent: deque[dict[str, Any]] = deque(maxlen=1000)
+		self._route_cache_counts = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+	def _get_pool(self) -> ProcessPoolExecutor:
+		with self._lock:
+			if self._pool is None:
+				# spawn: forking the multi-threaded server process is not safe
+				self._pool = ProcessPoolExecutor(
+					max_workers=self.workers,
+					mp_context=multiprocessing.get_context('spawn'),
+				)
+			return self._pool
+
+	def _reset_pool(self):
+		with self._lock:
+			if self._pool is not None:
+				self._pool.shutdown(wait=False, cancel_futures=True)
+				self._pool = None
+
+	def solve(
+		self,
+		days: list[Places],
+		depot: Place,
+		period_indices: list[int],
+		profile: SolverProfile | str | None = None,
+	) -> Iterator[DayRoute]:
+		"""Yield (route, transportations, solver stats) for every day, in day order."""
+		# resolved here so the server's $ROUTING_PROFILE applies in the workers too
+		profile = get_solver_profile(profile)
+		for result in self._solve(days, depot, period_indices, profile):
+			stats = result[2]
+			with self._lock:
+				self._recent.append(stats)
+				if not stats.get('cached'):
+					self._route_cache_counts['misses'] += 1
+				elif stats.get('cached_from') == 'disk':
+					self._route_cache_counts['disk_hits'] += 1
+				else:
+					self._route_cache_counts['hits'] += 1
+			yield result
+
+	def solve_trip(
+		self,
+		places: Places,
+		depot: Place,
+		period_indices: list[int],
+		profile: SolverProfile | str | None = None,
+	) -> list[DayRoute]:
+		"""(route, transportations, solver stats) of every day, planned in one solve."""
+		days = solve_trip(places, depot, period_indices, get_solver_profile(profile))
+		with self._lock:
+			self._recent.append(
+				{**days[0][2], 'profile': f'trip/{days[0][2]["profile"]}'}
+			)
+		return days
+
+	def _solve(
+		self,
+		days: list[Places],
+		depot: Place,
+		period_indices: list[int],
+		profile: SolverProfile,
+	) -> Iterator[DayRoute]:
+		if self.workers <= 1 or len(days) <= 1:
+			for places, period_index in zip(days, period_indices):
+				yield solve_day(places, depot, period_index, profile)
+			return
+
+		pool = self._get_pool()
+		futures = [
+			pool.submit(solve_day, places, depot, period_index, profile)
+			for places, period_index in zip(days, period_indices)
+		]
+		for i, future in enumerate(futures):
+			try:
+				result = future.result()
+			except (BrokenProcessPool, pickle.PicklingError) as exc:
+				logging.warning('Routing pool failed (%s), solving serially', exc)
+				self._reset_pool()
+				for places, period_index in zip(days[i:], period_indices[i:]):
+					yield solve_day(places, depot, period_index, profile)
+				return
+			yield result
+
+	def stats(self) -> dict[str, Any]:
+		"""Latency and outcome of the last solves, per profile."""
+		with self._lock:
+			recent = list(self._recent)
+		profiles = {}
+		for name in dict.fromkeys(stats['profile'] for stats in recent):
+			solves = [stats for stats in recent if stats['profile'] == name]
+			wall = sorted(stats['wall_ms'] for stats in solves)
+			profiles[name] = {
+				'solves': len(solves),
+				'p50_ms': wall[len(wall) // 2],
+				'p95_ms': wall[min(len(wall) - 1, int(len(wall) * 0.95))],
+				'max_ms': wall[-1],
+				'cached': sum(stats.get('cached', False) for stats in solves),
+				'hit_time_limit': sum(
+					stats['time_limit_ms'] is not None
+					and stats['wall_ms'] >= stats['time_limit_ms']
+					for stats in solves
+				),
+				'statuses': {
+					status: sum(stats['status'] == status for stats in solves)
+					for status in dict.fromkeys(stats['status'] for stats in solves)
+				},
+			}
+		return {'workers': self.workers, 'planner': self.planner, 'profiles': profiles}
+
+	def route_cache_stats(self) -> dict[str, Any]:
+		"""Route cache hits and misses of every day solved here or in a worker.
+
+		Hits happen in whichever process solves the day, so route_cache.stats()
+		of the server process alone misses the workers' share; the counts here
+		come from the stats returned with each day. 'main_process_routes' is
+		the number of routes in this process's memory cache only.
+		"""
+		main = route_cache.stats()
+		with self._lock:
+			counts = dict(self._route_cache_counts)
+		return {
+			**counts,
+			'main_process_routes': main['routes'],
+			'persistent': main['persistent'],
+		}
+
+	def shutdown(self):
+		self._reset_pool()
+
+
+day_solver = DaySolver()
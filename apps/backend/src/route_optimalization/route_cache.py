@@ -0,0 +1,193 @@
+"""Memoized day routes, shared between requests and routing workers."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from src.data_model.place.place import Place
+from src.data_model.places.places import Places
+from src.route_optimalization import routing
+from src.route_optimalization.routing import Routing, SolverProfile
+
+load_dotenv()
+
+
+class RouteCache:
+	"""LRU cache of solved day routes keyed by what the solver gets to see.
+
+	The key hashes the day's places sorted by id, with each place's location,
+	visit time, drop penalty and opening hours on the day, plus the weekday,
+	the depot location, the solver profile and where the travel times come
+	from (the version of the city's stored matrix and the regression models
+	and OSRM setup of the estimator), so two requests that cluster the same
+	places into a day share one solve whatever the place order, while a
+	moved place or a rebuilt matrix is solved again. Only the place ids of
+	the route are stored; a hit rebuilds the route from the caller's own
+	Place objects. With a directory set, entries are also written there as
+	JSON, so they survive restarts and are seen by the routing worker
+	processes, which each have their own memory cache.
+
+	Attributes:
+	:param size: int - routes kept in memory, $ROUTE_CACHE_SIZE or 1000 by default; 0 disables the cache
+	:param directory: Path | None - where routes are persisted, $ROUTE_CACHE_DIR or no persistence by default
+
+	Methods:
+	key(places, depot, period_index, profile) - canonical hash of a day's routing problem
+	get(key, places) - return the cached (route, transportations, stats) or None
+	stats() - counters of this process only; DaySolver.route_cache_stats() covers the workers too
+	put(key, route, transportations, stats) - store a solved route
+	"""
+
+	def __init__(self, size: int | None = None, directory: str | Path | None = None):
+		if size is None:
+			size = int(os.getenv('ROUTE_CACHE_SIZE') or 1000)
+		self.size = size
+		directory = directory or os.getenv('ROUTE_CACHE_DIR')
+		self.directory = Path(directory) if directory else None
+		self.hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def key(
+		places: Places, depot: Place, period_index: int, profile: SolverProfile
+	) -> str:
+		"""Canonical hash of a day's routing problem."""
+		day = []
+		for place in places.get_list():
+			period = place.regularOpeningHours.periods[period_index]
+			day.append(
+				[
+					place.placeInfo.id,
+					place.location.latitude,
+					place.location.longitude,
+					place.estimatedTime,
+					Routing._penalty(place),
+					period.open_in_minutes,
+					period.close_in_minutes,
+				]
+			)
+		day.sort()
+		problem = {
+			'places': day,
+			'period_index': period_index,
+			'depot': [depot.location.latitude, depot.location.longitude],
+			'profile': [
+				profile.name,
+				profile.first_solution_strategy,
+				profile.metaheuristic,
+				profile.time_limit,
+			],
+			'travel': [
+				routing.city_travel_matrix.version(
+					places.city, [place_id for place_id, *_ in day]
+				),
+				routing.travel_estimator.source(places.city),
+			],
+		}
+		return hashlib.sha256(json.dumps(problem).encode()).hexdigest()
+
+	def _path(self, key: str) -> Path:
+		return self.directory / key[:2] / f'{key}.json'
+
+	def _read(self, key: str) -> dict[str, Any] | None:
+		try:
+			with open(self._path(key), 'r', encoding='utf-8') as handle:
+				return json.load(handle)
+		except (FileNotFoundError, json.JSONDecodeError):
+			return None
+
+	def _write(self, key: str, entry: dict[str, Any]):
+		path = self._path(key)
+		try:
+			path.parent.mkdir(parents=True, exist_ok=True)
+			tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+			with open(tmp_path, 'w', encoding='utf-8') as handle:
+				json.dump(entry, handle)
+			os.replace(tmp_path, path)
+		except OSError as exc:
+			logging.warning('Could not persist route %s: %s', key, exc)
+
+	def _remember(self, key: str, entry: dict[str, Any]):
+		with self._lock:
+			self._entries[key] = entry
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.size:
+				self._entries.popitem(last=False)
+
+	def get(
+		self, key: str, places: Places
+	) -> tuple[Places, list[tuple[int, str]], dict[str, Any]] | None:
+		"""Return the cached route built from the given places, None on a miss."""
+		if self.size <= 0:
+			return None
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				self._entries.move_to_end(key)
+				self.hits += 1
+		source = 'memory'
+		if entry is None and self.directory is not None:
+			entry = self._read(key)
+			if entry is not None:
+				source = 'disk'
+				self._remember(key, entry)
+				with self._lock:
+					self.disk_hits += 1
+		if entry is None:
+			with self._lock:
+				self.misses += 1
+			return None
+		route = Places([places.get_place_by_id(place_id) for place_id in entry['ids']])
+		transportations = [
+			tuple(transportation) for transportation in entry['transportations']
+		]
+		return (
+			route,
+			transportations,
+			{**entry['stats'], 'cached': True, 'cached_from': source},
+		)
+
+	def put(
+		self,
+		key: str,
+		route: Places,
+		transportations: list[tuple[int, str]],
+		stats: dict[str, Any],
+	):
+		if self.size <= 0:
+			return
+		entry = {
+			'ids': [place.placeInfo.id for place in route.get_list()],
+			'transportations': [[int(time), mode] for time, mode in transportations],
+			'stats': stats,
+		}
+		self._remember(key, entry)
+		if self.directory is not None:
+			self._write(key, entry)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+	def stats(self) -> dict[str, Any]:
+		with self._lock:
+			return {
+				'routes': len(self._entries),
+				'hits': self.hits,
+				'disk_hits': self.disk_hits,
+				'misses': self.misses,
+				'persistent': self.directory is not None,
+			}
+
+
+route_cache = RouteCache()
@@ -1,15 +1,105 @@
 """Vehicles Routing Problem (VRP) with Time Windows."""
 
+import logging
+import os
+from dataclasses import dataclass, replace
+from time import perf_counter
+
+import numpy as np
+from dotenv import load_dotenv
 from ortools.constraint_solver import pywrapcp, routing_enums_pb2
 
 from src.data_model.place.place import Place
 from src.data_model.places.places import Places
 from src.travel_time import travel_estimator
+from src.travel_time.travel_matrix import city_travel_matrix
+
+load_dotenv()
+
+FirstSolution = routing_enums_pb2.FirstSolutionStrategy
+Metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic
+
+
+@dataclass(frozen=True)
+class SolverProfile:
+	"""Search settings of Routing.solver_route.
+
+	With a time limit the solver stops at it and returns the best solution
+	found so far, so the limit bounds the latency of one day's solve.
+
+	Attributes:
+	:param name: str - profile name
+	:param first_solution_strategy: int - FirstSolutionStrategy of the initial route
+	:param metaheuristic: int - LocalSearchMetaheuristic used to improve it
+	:param time_limit: float | None - wall-clock limit of the search in seconds, None for no limit
+	"""
+
+	name: str
+	first_solution_strategy: int
+	metaheuristic: int
+	time_limit: float | None
+
+
+SOLVER_PROFILES = {
+	# local search until the first local optimum with no time limit, the original behaviour
+	'fast': SolverProfile(
+		'fast',
+		FirstSolution.PATH_MOST_CONSTRAINED_ARC,
+		Metaheuristic.GREEDY_DESCENT,
+		None,
+	),
+	# guided local search keeps escaping local optima until the deadline
+	'balanced': SolverProfile(
+		'balanced',
+		FirstSolution.PATH_MOST_CONSTRAINED_ARC,
+		Metaheuristic.GUIDED_LOCAL_SEARCH,
+		0.5,
+	),
+	'thorough': SolverProfile(
+		'thorough',
+		FirstSolution.PATH_MOST_CONSTRAINED_ARC,
+		Metaheuristic.GUIDED_LOCAL_SEARCH,
+		3.0,
+	),
+}
+
+
+def get_solver_profile(profile: 'SolverProfile | str | None' = None) -> SolverProfile:
+	"""Resolve a profile or profile name, $ROUTING_PROFILE ('fast') by default.
+
+	$ROUTING_TIME_LIMIT (seconds) overrides the time limit of named profiles.
+	"""
+	if isinstance(profile, SolverProfile):
+		return profile
+	name = profile or os.getenv('ROUTING_PROFILE') or 'fast'
+	if name not in SOLVER_PROFILES:
+		raise ValueError(f'Unknown routing profile {name}')
+	time_limit = os.getenv('ROUTING_TIME_LIMIT')
+	if time_limit:
+		return replace(SOLVER_PROFILES[name], time_limit=float(time_limit))
+	return SOLVER_PROFILES[name]
 
 
 class Routing:
-	def __init__(self, places: Places, depot=None, num_routes=1, period_index=0):
+	def __init__(
+		self,
+		places: Places,
+		depot=None,
+		num_routes=1,
+		period_index=0,
+		profile: SolverProfile | str | None = None,
+		initial_route: list[str] | None = None,
+		pinned: set[str] | None = None,
+	):
+		"""
+		:param initial_route: place ids of a known route of the first vehicle, the search starts from it
+		:param pinned: ids of the places that must be visited, the others may be dropped
+		"""
 		self.places = places
+		self.profile = get_solver_profile(profile)
+		self.initial_route = initial_route
+		self.pinned = pinned or set()
+		self.stats = {}
 		self.num_routes = num_routes
 		self.depot_idx = 0
 		self.depot = depot
@@ -24,27 +114,31 @@ class Routing:
 		:return: time matrix for each day
 		"""
 		places_list = self.places.get_list()
+		stored = city_travel_matrix.lookup(
+			self.places.city, [place.placeInfo.id for place in places_list]
+		)
 		places_list.insert(0, self.depot)
-		time_matrix = [
-			[0 for _ in range(len(places_list))] for _ in range(len(places_list))
-		]
-		self.transport_modes = [
-			['' for _ in range(len(places_list))] for _ in range(len(places_list))
-		]
-		for idx_day, place1 in enumerate(places_list):
-			for idx_day2, place2 in enumerate(places_list):
-				if idx_day == idx_day2:
-					travel_time = 0
-					transport_mode = ''
-				else:
-					travel_time, transport_mode = travel_estimator.get_estimated_time(
-						place1.location, place2.location, self.places.city
-					)
-				time_matrix[idx_day][idx_day2] = travel_time
-				time_matrix[idx_day2][idx_day] = travel_time
-				self.transport_modes[idx_day][idx_day2] = transport_mode
-				self.transport_modes[idx_day2][idx_day] = transport_mode
-		return time_matrix
+		locations = [place.location for place in places_list]
+		if stored is None:
+			time_matrix, transport_modes = travel_estimator.get_estimated_time_matrix(
+				locations, self.places.city
+			)
+		else:
+			# only the depot (hotel) row is estimated, the rest comes from the city matrix
+			size = len(locations)
+			time_matrix = np.zeros((size, size), dtype=int)
+			transport_modes = np.full((size, size), '', dtype=object)
+			time_matrix[1:, 1:], transport_modes[1:, 1:] = stored
+			depot_times, depot_modes = travel_estimator.get_estimated_times(
+				locations,
+				np.arange(1, size),
+				np.zeros(size - 1, dtype=int),
+				self.places.city,
+			)
+			time_matrix[0, 1:] = time_matrix[1:, 0] = depot_times
+			transport_modes[0, 1:] = transport_modes[1:, 0] = depot_modes
+		self.transport_modes = transport_modes.tolist()
+		return time_matrix.tolist()
 
 	def _print_time_matrix(self, time_matrix):
 		"""Function that prints a time matrix.
@@ -58,29 +152,36 @@ class Routing:
 		"""Function that returns the opening and closing time for a place.
 		:return: opening and closing time for a place
 		"""
-		time_for_place = []
-		for place in self.places.get_list():
-			opening_time, closing_time = self._get_opening_close_time(place)
-			adjusted_close = min(
-				max(opening_time, closing_time - place.estimatedTime), self.max_time
-			)
-			adjusted_open = min(opening_time, adjusted_close)
-			time_for_place.append((adjusted_open, adjusted_close))
+		time_for_place = [
+			self._visit_window(place, self.period_index)
+			for place in self.places.get_list()
+		]
 		time_for_place.insert(0, (600, self.max_time))
 		return time_for_place
 
-	def _get_opening_close_time(self, place: Place):
+	def _visit_window(self, place: Place, period_index: int) -> tuple[int, int]:
+		"""Function that returns when a visit to a place can start on a weekday.
+		:param place: place
+		:param period_index: weekday index of the opening hours
+		:return: earliest and latest start of the visit in minutes
+		"""
+		opening_time, closing_time = self._get_opening_close_time(place, period_index)
+		adjusted_close = min(
+			max(opening_time, closing_time - place.estimatedTime), self.max_time
+		)
+		adjusted_open = min(opening_time, adjusted_close)
+		return adjusted_open, adjusted_close
+
+	def _get_opening_close_time(self, place: Place, period_index: int | None = None):
 		"""Function that returns the opening and closing time for a place.
 		:param place: place
+		:param period_index: weekday index, the routed day by default
 		:return: opening and closing time for a place
 		"""
-		opening_time = place.regularOpeningHours.periods[
-			self.period_index
-		].open_in_minutes
-		closing_time = place.regularOpeningHours.periods[
-			self.period_index
-		].close_in_minutes
-		return opening_time, closing_time
+		if period_index is None:
+			period_index = self.period_index
+		period = place.regularOpeningHours.periods[period_index]
+		return period.open_in_minutes, period.close_in_minutes
 
 	def print_solution(self, manager, routing, solution):
 		"""Prints solution on console."""
@@ -144,27 +245,59 @@ class Routing:
 			total_time += solution.Min(time_var)
 		print(f'Total time of all routes: {total_time}min = {total_time / 60}h')
 
+	def _transit_matrix(self) -> list[list[int]]:
+		"""Travel time between the nodes plus the time spent at the start node."""
+		service_times = np.concatenate([[0], self.places.estimated_times])
+		transit = np.array(self.matrix, dtype=np.int64) + service_times[:, np.newaxis]
+		return transit.tolist()
+
+	def _register_transit(self, manager, routing) -> int:
+		"""Register the transit times as a matrix, evaluated natively by the solver."""
+		return routing.RegisterTransitMatrix(self._transit_matrix())
+
+	@staticmethod
+	def _penalty(place: Place) -> int:
+		"""Cost of leaving a place out of the route."""
+		penalty = 1000
+		if place.must_see:
+			return penalty * penalty
+		return int(place.ratings.cumulative_rating * penalty)
+
+	def _add_disjunctions(self, manager, routing):
+		"""Let the solver drop any place for its penalty."""
+		for node in range(1, len(self.matrix)):
+			place = self.places.get_by_index(node - 1)
+			if place.placeInfo.id in self.pinned:
+				continue
+			routing.AddDisjunction([manager.NodeToIndex(node)], self._penalty(place))
+
+	def _initial_assignment(self, routing, search_parameters):
+		"""Assignment of initial_route, None if there is none or it is infeasible."""
+		if self.initial_route is None:
+			return None
+		nodes = {
+			place.placeInfo.id: node
+			for node, place in enumerate(self.places.get_list(), start=1)
+		}
+		routing.CloseModelWithParameters(search_parameters)
+		assignment = routing.ReadAssignmentFromRoutes(
+			[[nodes[place_id] for place_id in self.initial_route if place_id in nodes]],
+			True,
+		)
+		if assignment is None:
+			logging.info('Initial route is infeasible, solving from scratch')
+		return assignment
+
 	def solver_route(self):
 		"""Solve the VRP with time windows."""
 		manager = pywrapcp.RoutingIndexManager(
-			len(self.matrix),
+			len(self.time_windows),
 			self.num_routes,
 			self.depot_idx,
 		)
 		routing = pywrapcp.RoutingModel(manager)
 
-		def time_callback(from_index, to_index):
-			"""Returns the travel time between the two nodes."""
-			from_node = manager.IndexToNode(from_index)
-			to_node = manager.IndexToNode(to_index)
-			time_spend = (
-				0
-				if from_node == 0
-				else self.places.get_by_index(from_node - 1).estimatedTime
-			)
-			return self.matrix[from_node][to_node] + time_spend
-
-		transit_callback_index = routing.RegisterTransitCallback(time_callback)
+		transit_callback_index = self._register_transit(manager, routing)
 		routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 		time = 'Time'
 		routing.AddDimension(
@@ -196,21 +329,51 @@ class Routing:
 				time_dimension.CumulVar(routing.End(i))
 			)
 
-		penalty = 1000
-		for node in range(1, len(self.matrix)):
-			place = self.places.get_by_index(node - 1)
-			place_penalty = (
-				penalty * penalty
-				if place.must_see
-				else int(place.ratings.cumulative_rating * penalty)
-			)
-			routing.AddDisjunction([manager.NodeToIndex(node)], place_penalty)
+		self._add_disjunctions(manager, routing)
 
 		search_parameters = pywrapcp.DefaultRoutingSearchParameters()
-		search_parameters.first_solution_strategy = (
-			routing_enums_pb2.FirstSolutionStrategy.PATH_MOST_CONSTRAINED_ARC
-		)
-		solution = routing.SolveWithParameters(search_parameters)
+		search_parameters.first_solution_strategy = self.profile.first_solution_strategy
+		search_parameters.local_search_metaheuristic = self.profile.metaheuristic
+		if self.profile.time_limit is not None:
+			search_parameters.time_limit.FromMilliseconds(
+				int(self.profile.time_limit * 1000)
+			)
+
+		start = perf_counter()
+		improvements = []
+
+		def on_solution():
+			cost = routing.CostVar().Value()
+			if not improvements or cost < improvements[-1][1]:
+				improvements.append((perf_counter() - start, cost))
+
+		routing.AddAtSolutionCallback(on_solution)
+		initial = self._initial_assignment(routing, search_parameters)
+		if initial is not None:
+			solution = routing.SolveFromAssignmentWithParameters(
+				initial, search_parameters
+			)
+		else:
+			solution = routing.SolveWithParameters(search_parameters)
+		self.stats = {
+			'profile': self.profile.name,
+			'warm_start': initial is not None,
+			'status': routing_enums_pb2.RoutingSearchStatus.Value.Name(
+				routing.status()
+			),
+			'places': len(self.matrix) - 1,
+			'time_limit_ms': (
+				round(self.profile.time_limit * 1000)
+				if self.profile.time_limit is not None
+				else None
+			),
+			'wall_ms': round((perf_counter() - start) * 1000, 1),
+			'improvements': len(improvements),
+			'best_found_ms': round(improvements[-1][0] * 1000, 1)
+			if improvements
+			else None,
+			'objective': solution.ObjectiveValue() if solution else None,
+		}
 		if solution:
 			self.print_solution(manager, routing, solution)
 			return manager, routing, solution
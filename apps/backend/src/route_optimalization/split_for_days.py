@@ -7,6 +7,10 @@ from src.ml_operations.kmeans_constrained import constrained_kmeans
 
 
 class SplitForDays:
+	# seeded restarts of the clustering, so the same places always give the same days
+	kmeans_restarts = 8
+	kmeans_seed = 0
+
 	def __init__(self, from_date: date, to_date: date, places: Places):
 		self.fixed_places = None
 		self.days_with_open_places = None
@@ -49,28 +53,22 @@ class SplitForDays:
 			city=self.places.city,
 		)
 
-		data = []
 		fixed_clusters = {}
 		flexible_clusters = {}
 
-		for i, (place_id, days) in enumerate(places_to_days.items()):
-			if len(days) == 0:
-				continue
+		for i, days in enumerate(places_to_days.values()):
 			if len(days) == 1:
 				fixed_clusters[i] = self.weekday_indices.index(days[0])
 			else:
 				flexible_clusters[i] = [self.weekday_indices.index(day) for day in days]
 
-			place = self.open_places.get_place_by_id(place_id)
-			data.append(
-				[
-					place.location.latitude,
-					place.location.longitude,
-					place.ratings.cumulative_rating * 10,
-				]
-			)
-
-		data = np.array(data)
+		data = np.column_stack(
+			[
+				self.open_places.latitudes,
+				self.open_places.longitudes,
+				self.open_places.ratings * 10,
+			]
+		)
 
 		k = self.days
 		centroids, cluster_assignment, w_averages = constrained_kmeans(
@@ -78,6 +76,8 @@ class SplitForDays:
 			k=k,
 			fixed_clusters=fixed_clusters,
 			flexible_clusters=flexible_clusters,
+			n_init=self.kmeans_restarts,
+			random_state=self.kmeans_seed,
 		)
 		split_places = {i: [] for i in self.weekday_indices}
 		for i in range(len(self.open_places)):
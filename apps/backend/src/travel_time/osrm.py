@@ -0,0 +1,212 @@
+"""Driving times from an OSRM server, batched through its table service."""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import numpy as np
+import requests
+from dotenv import load_dotenv
+
+from src.data_model.place.place_subclasses import Location
+
+load_dotenv()
+
+Pair = tuple[float, float, float, float]
+
+
+class OSRMClient:
+	"""Client for the OSRM route and table services with a per-pair cache.
+
+	In 'table' mode the uncached pairs of a request are answered by one
+	``/table`` call (split into blocks of at most ``max_table_size``
+	locations, OSRM's default limit is 100). 'route' mode sends one
+	``/route`` call per pair, like the estimator did originally. Only
+	positive durations are cached, so a pair that failed is retried next
+	time.
+
+	Attributes:
+	:param url: str - OSRM server, $OSRM_URL or http://127.0.0.1:5002 by default
+	:param mode: str - 'table' or 'route', $OSRM_MODE or 'table' by default
+	:param timeout: float - seconds per request, $OSRM_TIMEOUT or 1 s (table) / 0.1 s (route) by default
+	:param max_table_size: int - locations per table request, $OSRM_MAX_TABLE_SIZE or 100 by default
+	:param cache_size: int - pairs kept in the LRU cache, $OSRM_CACHE_SIZE or 100000 by default
+
+	Methods:
+	durations(starts, ends) - driving seconds for every pair, NaN where OSRM has no answer
+	"""
+
+	def __init__(
+		self,
+		url: str | None = None,
+		mode: str | None = None,
+		timeout: float | None = None,
+		max_table_size: int | None = None,
+		cache_size: int | None = None,
+	):
+		self.url = (url or os.getenv('OSRM_URL') or 'http://127.0.0.1:5002').rstrip('/')
+		self.mode = mode or os.getenv('OSRM_MODE') or 'table'
+		if self.mode not in ('table', 'route'):
+			raise ValueError(f'Unknown OSRM mode {self.mode}')
+		if timeout is None:
+			timeout = float(
+				os.getenv('OSRM_TIMEOUT') or (1.0 if self.mode == 'table' else 0.1)
+			)
+		self.timeout = timeout
+		self.max_table_size = max(
+			2, max_table_size or int(os.getenv('OSRM_MAX_TABLE_SIZE') or 100)
+		)
+		self.cache_size = (
+			cache_size
+			if cache_size is not None
+			else int(os.getenv('OSRM_CACHE_SIZE') or 100_000)
+		)
+		self.requests = 0
+		self.hits = 0
+		self.misses = 0
+		self._cache: OrderedDict[Pair, float] = OrderedDict()
+		self._lock = threading.Lock()
+		self._session = requests.Session()
+
+	@staticmethod
+	def _pair(start: Location, end: Location) -> Pair:
+		return (
+			float(start.latitude),
+			float(start.longitude),
+			float(end.latitude),
+			float(end.longitude),
+		)
+
+	def durations(
+		self, starts: Sequence[Location], ends: Sequence[Location]
+	) -> np.ndarray:
+		"""Return the driving time in seconds from every start to its end."""
+		pairs = [self._pair(start, end) for start, end in zip(starts, ends)]
+		result = np.full(len(pairs), np.nan)
+		missing = {}
+		with self._lock:
+			for k, pair in enumerate(pairs):
+				seconds = self._cache.get(pair)
+				if seconds is None:
+					missing.setdefault(pair, []).append(k)
+				else:
+					self._cache.move_to_end(pair)
+					result[k] = seconds
+			misses = sum(len(ks) for ks in missing.values())
+			self.hits += len(pairs) - misses
+			self.misses += misses
+		if not missing:
+			return result
+
+		if self.mode == 'table':
+			fetched = self._fetch_table(list(missing))
+		else:
+			fetched = {pair: self._fetch_route(pair) for pair in missing}
+		with self._lock:
+			for pair, seconds in fetched.items():
+				if seconds is None or not seconds > 0:
+					continue
+				for k in missing[pair]:
+					result[k] = seconds
+				self._cache[pair] = seconds
+				self._cache.move_to_end(pair)
+			while len(self._cache) > self.cache_size:
+				self._cache.popitem(last=False)
+		return result
+
+	def _get(self, path: str, params: dict | None = None) -> dict | None:
+		with self._lock:
+			self.requests += 1
+		try:
+			response = self._session.get(
+				f'{self.url}{path}', params=params, timeout=self.timeout
+			)
+		except requests.RequestException as exc:
+			logging.debug('OSRM unavailable: %s', exc)
+			return None
+		if response.status_code != 200:
+			logging.warning('OSRM returned %s for %s', response.status_code, path)
+			return None
+		try:
+			data = response.json()
+		except ValueError:
+			logging.warning('OSRM returned a malformed body for %s', path)
+			return None
+		if not isinstance(data, dict) or data.get('code', 'Ok') != 'Ok':
+			return None
+		return data
+
+	def _fetch_route(self, pair: Pair) -> float | None:
+		start_lat, start_lng, end_lat, end_lng = pair
+		data = self._get(
+			f'/route/v1/driving/{start_lng},{start_lat};{end_lng},{end_lat}',
+			{'overview': 'false'},
+		)
+		if data is None or not data.get('routes'):
+			return None
+		return data['routes'][0]['duration']
+
+	def _fetch_table(self, pairs: list[Pair]) -> dict[Pair, float | None]:
+		"""Answer the pairs with as few table requests as the size limit allows."""
+		sources = list(dict.fromkeys(pair[:2] for pair in pairs))
+		destinations = list(dict.fromkeys(pair[2:] for pair in pairs))
+		wanted = set(pairs)
+		block = self.max_table_size // 2
+		if len(set(sources) | set(destinations)) <= self.max_table_size:
+			blocks = [(sources, destinations)]
+		else:
+			blocks = [
+				(sources[i : i + block], destinations[j : j + block])
+				for i in range(0, len(sources), block)
+				for j in range(0, len(destinations), block)
+			]
+
+		fetched: dict[Pair, float | None] = {}
+		for block_sources, block_destinations in blocks:
+			if not any(
+				source + destination in wanted
+				for source in block_sources
+				for destination in block_destinations
+			):
+				continue
+			coordinates = list(dict.fromkeys(block_sources + block_destinations))
+			position = {coordinate: i for i, coordinate in enumerate(coordinates)}
+			data = self._get(
+				'/table/v1/driving/'
+				+ ';'.join(f'{lng},{lat}' for lat, lng in coordinates),
+				{
+					'sources': ';'.join(
+						str(position[source]) for source in block_sources
+					),
+					'destinations': ';'.join(
+						str(position[destination]) for destination in block_destinations
+					),
+					'annotations': 'duration',
+				},
+			)
+			if data is None:
+				continue
+			for source, row in zip(block_sources, data.get('durations') or []):
+				for destination, seconds in zip(block_destinations, row):
+					if source + destination in wanted:
+						fetched[source + destination] = seconds
+		return fetched
+
+	def clear(self):
+		with self._lock:
+			self._cache.clear()
+
+	def stats(self) -> dict[str, int | str]:
+		with self._lock:
+			return {
+				'mode': self.mode,
+				'pairs': len(self._cache),
+				'hits': self.hits,
+				'misses': self.misses,
+				'requests': self.requests,
+			}
+
+
+osrm_client = OSRMClient()
@@ -0,0 +1,123 @@
+"""Local stand-in for an OSRM server, for tests, benchmarks and development.
+
+Answers the route and table services of the driving profile with the
+haversine distance driven at ``speed`` km/h times ``detour``. Start it with
+``python -m src.travel_time.osrm_stub [--port 5002] [--delay 0.05]``.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from src.route_optimalization.haversine import calculate_distance
+
+
+class OSRMStub(ThreadingHTTPServer):
+	"""Threaded HTTP server answering like OSRM's /route and /table services.
+
+	Every request sleeps ``delay`` seconds first, like a round trip to a
+	remote server, and is recorded in ``requests``. With ``body`` set, it is
+	sent as is with status 200 instead of the answer, to mimic a broken
+	server or proxy.
+	"""
+
+	daemon_threads = True
+
+	def __init__(
+		self,
+		port: int = 0,
+		delay: float = 0.0,
+		speed: float = 40.0,
+		detour: float = 1.3,
+	):
+		super().__init__(('127.0.0.1', port), OSRMStubHandler)
+		self.delay = delay
+		self.speed = speed
+		self.detour = detour
+		self.requests: list[str] = []
+		self.body: bytes | None = None
+		self._lock = threading.Lock()
+
+	@property
+	def url(self) -> str:
+		return f'http://127.0.0.1:{self.server_address[1]}'
+
+	def handle_error(self, request, client_address):
+		# clients that gave up after their timeout are expected, not errors
+		pass
+
+	def record(self, path: str):
+		with self._lock:
+			self.requests.append(path)
+
+	def duration(self, start: tuple[float, float], end: tuple[float, float]) -> float:
+		"""Driving seconds between two (lng, lat) points."""
+		distance = calculate_distance(start[1], start[0], end[1], end[0])
+		return distance * self.detour / self.speed * 3600
+
+
+class OSRMStubHandler(BaseHTTPRequestHandler):
+	server: OSRMStub
+
+	def log_message(self, *args):
+		pass
+
+	def _send(self, status: int, payload: dict):
+		body = json.dumps(payload).encode()
+		if self.server.body is not None:
+			status, body = 200, self.server.body
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def do_GET(self):
+		self.server.record(self.path)
+		time.sleep(self.server.delay)
+		url = urlsplit(self.path)
+		parts = url.path.strip('/').split('/')
+		if len(parts) != 4 or parts[1] != 'v1' or parts[0] not in ('route', 'table'):
+			self._send(400, {'code': 'InvalidUrl'})
+			return
+		try:
+			coordinates = [
+				tuple(float(value) for value in point.split(','))
+				for point in parts[3].split(';')
+			]
+		except ValueError:
+			self._send(400, {'code': 'InvalidQuery'})
+			return
+
+		if parts[0] == 'route':
+			duration = sum(
+				self.server.duration(start, end)
+				for start, end in zip(coordinates, coordinates[1:])
+			)
+			self._send(200, {'code': 'Ok', 'routes': [{'duration': duration}]})
+			return
+
+		query = parse_qs(url.query)
+		everything = ';'.join(str(i) for i in range(len(coordinates)))
+		sources = [int(i) for i in query.get('sources', [everything])[0].split(';')]
+		destinations = [
+			int(i) for i in query.get('destinations', [everything])[0].split(';')
+		]
+		durations = [
+			[self.server.duration(coordinates[i], coordinates[j]) for j in destinations]
+			for i in sources
+		]
+		self._send(200, {'code': 'Ok', 'durations': durations})
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Local OSRM stand-in server.')
+	parser.add_argument('--port', type=int, default=5002)
+	parser.add_argument('--delay', type=float, default=0.0)
+	args = parser.parse_args()
+	server = OSRMStub(args.port, args.delay)
+	print(f'OSRM stub listening on {server.url}')
+	server.serve_forever()
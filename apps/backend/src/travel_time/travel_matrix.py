@@ -0,0 +1,272 @@
+"""All-pairs travel times between the stored places of a city.
+
+Computed when places are ingested and kept on disk, so Routing only slices
+the rows of the day's places instead of estimating every pair per request.
+
+Backfill cities ingested before the matrix existed with
+``python -m src.travel_time.travel_matrix <city id> [<city id> ...]``.
+"""
+
+import argparse
+import json
+import os
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location
+from src.travel_time.travel_time import travel_estimator
+
+load_dotenv()
+
+MODES = np.array(['', 'FOOT', 'CAR'], dtype=object)
+MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+
+
+def _default_directory() -> Path:
+	data_dir = os.getenv('DATA_DIR') or Path(__file__).resolve().parents[2] / 'data'
+	return Path(data_dir) / 'travel_matrix'
+
+
+@dataclass
+class _Matrix:
+	stamp: tuple[int, int, int]
+	version: int
+	positions: dict[str, int]
+	times: np.ndarray
+	modes: np.ndarray
+
+
+class CityTravelMatrix:
+	"""Persisted travel-time and transport-mode matrices keyed by place id.
+
+	Each city directory holds ``index.json`` (place ids, coordinates and the
+	current version) and ``times-<version>.npy`` (int32 minutes) and
+	``modes-<version>.npy`` (uint8 codes into MODES), opened memory-mapped.
+	An update writes the next version next to the current one and then
+	replaces index.json, so readers, including routing worker processes,
+	always see a complete matrix. Only the pairs involving added or moved
+	places are estimated; the rest is copied from the previous version.
+
+	Attributes:
+	:param directory: Path - where the matrices are kept, $TRAVEL_MATRIX_DIR or $DATA_DIR/travel_matrix by default
+
+	Methods:
+	add_places(city, places) - add places to the city's matrix, returns how many were (re)computed
+	lookup(city, place_ids) - return the (times, modes) submatrix, None if a place is missing
+	"""
+
+	def __init__(self, directory: str | Path | None = None):
+		self.directory = Path(
+			directory or os.getenv('TRAVEL_MATRIX_DIR') or _default_directory()
+		)
+		self._matrices: dict[Path, _Matrix] = {}
+		self._lock = threading.Lock()
+		self._write_lock = threading.Lock()
+
+	def _city_directory(self, city: City) -> Path:
+		country = str(city.country).replace(' ', '_').lower()
+		return self.directory / f'{country}_{city.id}'
+
+	@staticmethod
+	def _read_index(city_directory: Path) -> dict:
+		try:
+			with open(city_directory / 'index.json', 'r', encoding='utf-8') as handle:
+				return json.load(handle)
+		except (FileNotFoundError, json.JSONDecodeError):
+			return {'version': 0, 'ids': [], 'lats': [], 'lngs': []}
+
+	def _load(self, city_directory: Path) -> _Matrix | None:
+		"""Return the current matrix, reopening it only when index.json changed."""
+		try:
+			stat = os.stat(city_directory / 'index.json')
+		except FileNotFoundError:
+			return None
+		stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+		with self._lock:
+			matrix = self._matrices.get(city_directory)
+			if matrix is not None and matrix.stamp == stamp:
+				return matrix
+		index = self._read_index(city_directory)
+		version = index['version']
+		try:
+			times = np.load(city_directory / f'times-{version}.npy', mmap_mode='r')
+			modes = np.load(city_directory / f'modes-{version}.npy', mmap_mode='r')
+		except FileNotFoundError:
+			# replaced by a newer version between reading the index and the arrays
+			return None
+		matrix = _Matrix(
+			stamp,
+			version,
+			{place_id: i for i, place_id in enumerate(index['ids'])},
+			times,
+			modes,
+		)
+		with self._lock:
+			self._matrices[city_directory] = matrix
+		return matrix
+
+	def version(self, city: City | None, place_ids: list[str]) -> int | None:
+		"""Version of the city's matrix if it has all the places, else None."""
+		if city is None:
+			return None
+		matrix = self._load(self._city_directory(city))
+		if matrix is None or not all(
+			place_id in matrix.positions for place_id in place_ids
+		):
+			return None
+		return matrix.version
+
+	def lookup(
+		self, city: City | None, place_ids: list[str]
+	) -> tuple[np.ndarray, np.ndarray] | None:
+		"""Return the time and mode matrices between the given places, in their order."""
+		if city is None:
+			return None
+		matrix = self._load(self._city_directory(city))
+		if matrix is None:
+			return None
+		try:
+			rows = np.array(
+				[matrix.positions[place_id] for place_id in place_ids], dtype=int
+			)
+		except KeyError:
+			return None
+		grid = np.ix_(rows, rows)
+		return matrix.times[grid].astype(int), MODES[matrix.modes[grid]]
+
+	@staticmethod
+	def _dirty_pairs(size: int, dirty: list[int]) -> tuple[np.ndarray, np.ndarray]:
+		"""Every unordered pair with at least one dirty place, as (later, earlier)."""
+		is_dirty = np.zeros(size, dtype=bool)
+		is_dirty[dirty] = True
+		columns = np.arange(size)
+		rows, cols = [], []
+		for row in dirty:
+			col = np.flatnonzero(~is_dirty | (columns < row))
+			col = col[col != row]
+			rows.append(np.full(len(col), row))
+			cols.append(col)
+		rows, cols = np.concatenate(rows), np.concatenate(cols)
+		return np.maximum(rows, cols), np.minimum(rows, cols)
+
+	def add_places(self, city: City, places: Iterable[Place]) -> int:
+		"""Add places to the city's matrix.
+
+		Places already stored at the same coordinates are skipped, a stored
+		place with new coordinates gets its row recomputed.
+
+		:return: number of places whose travel times were computed
+		"""
+		with self._write_lock:
+			return self._add_places(self._city_directory(city), city, places)
+
+	def _add_places(
+		self, city_directory: Path, city: City, places: Iterable[Place]
+	) -> int:
+		index = self._read_index(city_directory)
+		ids, lats, lngs = index['ids'], index['lats'], index['lngs']
+		old_size = len(ids)
+		positions = {place_id: i for i, place_id in enumerate(ids)}
+		dirty = set()
+		for place in places:
+			place_id = place.placeInfo.id
+			lat, lng = float(place.location.latitude), float(place.location.longitude)
+			position = positions.get(place_id)
+			if position is None:
+				positions[place_id] = position = len(ids)
+				ids.append(place_id)
+				lats.append(lat)
+				lngs.append(lng)
+			elif (lats[position], lngs[position]) == (lat, lng):
+				continue
+			lats[position], lngs[position] = lat, lng
+			dirty.add(position)
+		if not dirty:
+			return 0
+
+		size = len(ids)
+		version = index['version'] + 1
+		city_directory.mkdir(parents=True, exist_ok=True)
+		times = np.lib.format.open_memmap(
+			city_directory / f'times-{version}.npy',
+			mode='w+',
+			dtype=np.int32,
+			shape=(size, size),
+		)
+		modes = np.lib.format.open_memmap(
+			city_directory / f'modes-{version}.npy',
+			mode='w+',
+			dtype=np.uint8,
+			shape=(size, size),
+		)
+		previous = self._load(city_directory)
+		if previous is not None and old_size:
+			times[:old_size, :old_size] = previous.times
+			modes[:old_size, :old_size] = previous.modes
+		del previous
+
+		starts, ends = self._dirty_pairs(size, sorted(dirty))
+		locations = [Location(lat, lng) for lat, lng in zip(lats, lngs)]
+		pair_times, pair_modes = travel_estimator.get_estimated_times(
+			locations, starts, ends, city
+		)
+		pair_codes = np.array([MODE_CODES[mode] for mode in pair_modes], dtype=np.uint8)
+		times[starts, ends] = times[ends, starts] = pair_times
+		modes[starts, ends] = modes[ends, starts] = pair_codes
+		times.flush()
+		modes.flush()
+		del times, modes
+
+		tmp_path = city_directory / f'index.{os.getpid()}.{threading.get_ident()}.tmp'
+		with open(tmp_path, 'w', encoding='utf-8') as handle:
+			json.dump(
+				{'version': version, 'ids': ids, 'lats': lats, 'lngs': lngs}, handle
+			)
+		os.replace(tmp_path, city_directory / 'index.json')
+		# release this process's mapping of the old arrays before deleting them
+		with self._lock:
+			self._matrices.pop(city_directory, None)
+		self._remove_stale(city_directory, version)
+		return len(dirty)
+
+	@staticmethod
+	def _remove_stale(city_directory: Path, version: int):
+		"""Delete the arrays of older versions.
+
+		An array still mapped elsewhere cannot be deleted on Windows; it is
+		left in place and removed by a later update.
+		"""
+		for path in city_directory.glob('*-*.npy'):
+			stored = path.stem.rsplit('-', 1)[1]
+			if stored.isdigit() and int(stored) < version:
+				try:
+					path.unlink()
+				except OSError:
+					pass
+
+
+city_travel_matrix = CityTravelMatrix()
+
+
+if __name__ == '__main__':
+	from src.data_model.place.place import PlaceCreatorDatabase
+	from src.database.backends import create_database
+
+	parser = argparse.ArgumentParser(
+		description='Build the travel-time matrix of already stored cities.'
+	)
+	parser.add_argument('city_ids', nargs='+', type=int)
+	args = parser.parse_args()
+	db = create_database()
+	for city_id in args.city_ids:
+		city = City(city_id)
+		places = db.read_places_data_from_db(city, 'places', PlaceCreatorDatabase)
+		computed = city_travel_matrix.add_places(city, places.get_list())
+		print(f'{city.name}: {computed} of {places.count} places computed')
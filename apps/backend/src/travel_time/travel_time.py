@@ -1,3 +1,4 @@
+import hashlib
 from pathlib import Path
 import numpy as np
 import requests
@@ -5,7 +6,13 @@ from joblib import load
 
 from src.data_model.city.city import City
 from src.data_model.place.place_subclasses import Location
-from src.route_optimalization.haversine import calculate_distance
+from src.route_optimalization.haversine import calculate_distance, calculate_distances
+from src.travel_time.osrm import OSRMClient, osrm_client
+
+# Batch entries closer than this to a minute boundary (or to the 5 km switch)
+# are recomputed per pair, so last-bit differences between NumPy and math
+# cannot change the truncated result.
+_BOUNDARY_EPS = 1e-6
 
 
 class TravelEstimator:
@@ -19,9 +26,21 @@ class TravelEstimator:
 			/ 'time_estimation_models'
 			/ 'foot_model.joblib'
 		).resolve(),
+		osrm: OSRMClient = osrm_client,
 	):
 		self.car_model = load(car_model_path)
 		self.foot_model = load(foot_model_path)
+		self.osrm = osrm
+		# identifies the models, so results cached with other models are not reused
+		self.model_tag = hashlib.sha256(
+			Path(car_model_path).read_bytes() + Path(foot_model_path).read_bytes()
+		).hexdigest()[:16]
+
+	def source(self, city: City = None) -> list:
+		"""Tag of what the estimates for the city are computed from."""
+		if city is not None and city.country == 'Poland':
+			return [self.model_tag, self.osrm.url, self.osrm.mode]
+		return [self.model_tag]
 
 	@staticmethod
 	def _model_predict(model, distance):
@@ -36,6 +55,15 @@ class TravelEstimator:
 		prediction = model.predict(np.array([[distance]])).tolist()[0]
 		return prediction * 60 * 60
 
+	@staticmethod
+	def _model_predict_batch(model, distances: np.ndarray) -> np.ndarray:
+		"""Vectorized _model_predict, time in seconds for every distance."""
+		seconds = np.zeros(len(distances))
+		moving = distances != 0
+		if moving.any():
+			seconds[moving] = model.predict(distances[moving].reshape(-1, 1)) * 60 * 60
+		return seconds
+
 	def get_estimated_time(
 		self, start_coordinates: Location, end_coordinates: Location, city: City = None
 	):
@@ -48,15 +76,89 @@ class TravelEstimator:
 		)
 		if distance > 5:
 			if city is not None and city.country == 'Poland':
-				try:
-					return int(
-						self.get_travel_time(start_coordinates, end_coordinates) / 60
-					) * 2, 'CAR'
-				except Exception as _:
-					pass
+				seconds = self.osrm.durations([start_coordinates], [end_coordinates])[0]
+				if not np.isnan(seconds):
+					return int(seconds / 60) * 2, 'CAR'
 			return int(self._model_predict(self.car_model, distance) / 60) * 2, 'CAR'
 		return int(self._model_predict(self.foot_model, distance) / 60), 'FOOT'
 
+	def get_estimated_times(
+		self,
+		locations: list[Location],
+		starts: np.ndarray,
+		ends: np.ndarray,
+		city: City = None,
+	) -> tuple[np.ndarray, np.ndarray]:
+		"""Vectorized get_estimated_time for many pairs of locations.
+
+		Distances and model predictions are computed over arrays in one pass
+		and long car trips in Poland are sent to OSRM together, so the result
+		is equal to calling get_estimated_time for every pair. The few pairs
+		within rounding distance of a minute boundary or of the 5 km switch
+		are estimated by get_estimated_time one by one.
+
+		:param locations: locations the pairs refer to
+		:param starts: index of the start location of every pair
+		:param ends: index of the end location of every pair
+		:param city: city of the locations, enables OSRM for long car trips in Poland
+		:return: (int minutes, transport modes) for every pair
+		"""
+		lats = np.array([location.latitude for location in locations], dtype=float)
+		lngs = np.array([location.longitude for location in locations], dtype=float)
+		distances = calculate_distances(
+			lats[starts], lngs[starts], lats[ends], lngs[ends]
+		)
+
+		car = distances > 5
+		minutes = np.where(
+			car,
+			self._model_predict_batch(self.car_model, distances) / 60,
+			self._model_predict_batch(self.foot_model, distances) / 60,
+		)
+		times = np.trunc(minutes).astype(int) * np.where(car, 2, 1)
+		modes = np.where(car, 'CAR', 'FOOT').astype(object)
+
+		per_pair = (np.abs(minutes - np.rint(minutes)) < _BOUNDARY_EPS) | (
+			np.abs(distances - 5) < _BOUNDARY_EPS
+		)
+		for k in np.flatnonzero(per_pair):
+			times[k], modes[k] = self.get_estimated_time(
+				locations[starts[k]], locations[ends[k]]
+			)
+		if city is not None and city.country == 'Poland':
+			car = np.flatnonzero(modes == 'CAR')
+			seconds = self.osrm.durations(
+				[locations[i] for i in starts[car]], [locations[i] for i in ends[car]]
+			)
+			routed = ~np.isnan(seconds)
+			times[car[routed]] = np.trunc(seconds[routed] / 60).astype(int) * 2
+		return times, modes
+
+	def get_estimated_time_matrix(
+		self, locations: list[Location], city: City = None
+	) -> tuple[np.ndarray, np.ndarray]:
+		"""Return the time matrix in minutes and the transport mode matrix.
+
+		Every unordered pair is estimated once. Like Routing always did, both
+		directions get the time estimated from the later location to the
+		earlier one.
+
+		:param locations: locations in matrix order
+		:param city: city of the locations, enables OSRM for long car trips in Poland
+		:return: (int minutes, transport modes) n x n arrays, zero and '' on the diagonal
+		"""
+		size = len(locations)
+		times = np.zeros((size, size), dtype=int)
+		modes = np.full((size, size), '', dtype=object)
+		if size < 2:
+			return times, modes
+
+		starts, ends = np.tril_indices(size, -1)
+		pair_times, pair_modes = self.get_estimated_times(locations, starts, ends, city)
+		times[starts, ends] = times[ends, starts] = pair_times
+		modes[starts, ends] = modes[ends, starts] = pair_modes
+		return times, modes
+
 	@staticmethod
 	def get_travel_time(
 		start_coordinates, end_coordinates, server_url='http://127.0.0.1:5002'
@@ -0,0 +1,167 @@
+import random
+
+import pytest
+
+from src.backend import edit_trip, main
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.place.place_visitor import PlaceVisitor
+from src.database import DataBase, DataBaseTrips
+from src.database.places_cache import PlacesCache
+
+CITY = City.get_const_krakow()
+
+
+def _place(i, rng):
+	place = Place(
+		placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+		location=Location(
+			CITY.lat + rng.uniform(-0.02, 0.02), CITY.lng + rng.uniform(-0.02, 0.02)
+		),
+		estimatedTime=30,
+	)
+	place.ratings.cumulative_rating = 0.5
+	return place
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+	rng = random.Random(0)
+	places = [_place(i, rng) for i in range(12)]
+	db = DataBase(tmp_path)
+	db.bulk_upsert_places(CITY, places, 'places_categories', [])
+	db_trips = DataBaseTrips(tmp_path)
+	days = [
+		{
+			'places': [PlaceVisitor.place_to_itinerary(place) for place in places[:4]],
+			'weather': 1,
+		},
+		{
+			'places': [PlaceVisitor.place_to_itinerary(place) for place in places[4:8]],
+			'weather': 2,
+		},
+	]
+	days[0]['places'][0]['user_rating'] = 5.0
+	db_trips.save_trip_history(
+		CITY, {'id': 'trip', 'days': days, 'dates': ['2024-06-03', '2024-06-04']}
+	)
+	monkeypatch.setattr(edit_trip, 'places_cache', PlacesCache())
+	monkeypatch.setattr(main, 'db', db)
+	monkeypatch.setattr(main, 'db_trips', db_trips)
+	yield db, db_trips
+	db_trips.close()
+
+
+def _ids(day):
+	return [place['id'] for place in day['places']]
+
+
+def test_remove_resolves_only_that_day(stores):
+	db, db_trips = stores
+	result = edit_trip.edit_trip(db, db_trips, 'trip', 'remove', 0, 'place-2')
+
+	stored = db_trips.get_trip('trip')
+	assert sorted(_ids(stored['days'][0])) == ['place-0', 'place-1', 'place-3']
+	assert _ids(stored['days'][1]) == [f'place-{i}' for i in range(4, 8)]
+	assert stored['days'][0]['weather'] == 1
+	kept = {place['id']: place for place in stored['days'][0]['places']}
+	assert kept['place-0']['user_rating'] == 5.0
+	assert result['trip'] == stored
+	assert result['dropped'] == []
+	assert [stats['day_index'] for stats in result['stats']] == [0]
+	assert result['stats'][0]['warm_start']
+
+
+def test_pinned_place_stays_in_later_edits(stores):
+	db, db_trips = stores
+	edit_trip.edit_trip(db, db_trips, 'trip', 'pin', 1, 'place-10')
+	edit_trip.edit_trip(db, db_trips, 'trip', 'pin', 1, 'place-0')
+	edit_trip.edit_trip(db, db_trips, 'trip', 'remove', 1, 'place-4')
+
+	days = db_trips.get_trip('trip')['days']
+	assert 'place-0' not in _ids(days[0])
+	pinned = {place['id'] for place in days[1]['places'] if place.get('pinned')}
+	assert pinned == {'place-10', 'place-0'}
+	assert 'place-4' not in _ids(days[1])
+
+
+def test_swap_days(stores):
+	db, db_trips = stores
+	before = db_trips.get_trip('trip')['days']
+	edit_trip.edit_trip(db, db_trips, 'trip', 'swap', 0, other_day_index=1)
+	after = db_trips.get_trip('trip')['days']
+	assert sorted(_ids(after[0])) == sorted(_ids(before[1]))
+	assert sorted(_ids(after[1])) == sorted(_ids(before[0]))
+	assert [day['weather'] for day in after] == [1, 2]
+
+
+def test_edit_endpoint(stores):
+	client = main.app.test_client()
+	response = client.post(
+		'/api/trip-history/trip/edit',
+		json={'operation': 'remove', 'day_index': 1, 'place_id': 'place-5'},
+	)
+	assert response.status_code == 200
+	assert 'place-5' not in _ids(response.get_json()['data']['days'][1])
+
+	def edit(trip_id, payload):
+		return client.post(
+			f'/api/trip-history/{trip_id}/edit', json=payload
+		).status_code
+
+	assert (
+		edit('missing', {'operation': 'remove', 'day_index': 0, 'place_id': 'place-0'})
+		== 404
+	)
+	assert (
+		edit('trip', {'operation': 'pin', 'day_index': 0, 'place_id': 'unknown'}) == 404
+	)
+	assert (
+		edit('trip', {'operation': 'remove', 'day_index': 5, 'place_id': 'place-0'})
+		== 400
+	)
+	assert (
+		edit('trip', {'operation': 'remove', 'day_index': 0, 'place_id': 'place-9'})
+		== 400
+	)
+	assert edit('trip', {'operation': 'move', 'day_index': 0}) == 400
+	assert edit('trip', {'day_index': 0}) == 400
+	assert edit('trip', {'operation': 'remove', 'day_index': 0}) == 400
+	assert edit('trip', {'operation': 'pin', 'day_index': 0}) == 400
+	assert edit('trip', {'operation': 'swap', 'day_index': 0}) == 400
+
+
+def test_invalid_stored_dates_are_bad_requests(stores):
+	db, db_trips = stores
+	trip = db_trips.get_trip('trip')
+	db_trips.save_trip_history(CITY, {**trip, 'dates': ['2024-06-03', 'soon']})
+	with pytest.raises(edit_trip.TripEditError, match='invalid dates'):
+		edit_trip.edit_trip(db, db_trips, 'trip', 'remove', 0, 'place-2')
+	response = main.app.test_client().post(
+		'/api/trip-history/trip/edit',
+		json={'operation': 'remove', 'day_index': 0, 'place_id': 'place-2'},
+	)
+	assert response.status_code == 400
+
+
+def test_edit_is_planned_again_when_the_trip_changed(stores, monkeypatch):
+	db, db_trips = stores
+	solve_day = edit_trip._solve_day
+	calls = []
+
+	def rate_while_solving(*args):
+		calls.append(args)
+		if len(calls) == 1:
+			db_trips.set_trip_rating('trip', 0, 1, 4.0)
+		return solve_day(*args)
+
+	monkeypatch.setattr(edit_trip, '_solve_day', rate_while_solving)
+	edit_trip.edit_trip(db, db_trips, 'trip', 'remove', 0, 'place-2')
+
+	assert len(calls) == 2
+	kept = {
+		place['id']: place for place in db_trips.get_trip('trip')['days'][0]['places']
+	}
+	assert 'place-2' not in kept
+	assert kept['place-1']['user_rating'] == 4.0
@@ -0,0 +1,145 @@
+from datetime import date
+
+import pytest
+
+from src.backend import get_recommendation
+from src.backend import itinerary_cache as itinerary_cache_module
+from src.backend.itinerary_cache import ItineraryCache
+from src.data_model.city.city import City
+from src.data_model.user.user_preferences import UserPreferences
+
+CITY = City.get_const_krakow()
+MONDAY_TO_TUESDAY = (date(2024, 6, 3), date(2024, 6, 4))
+NEXT_MONDAY_TO_TUESDAY = (date(2024, 6, 10), date(2024, 6, 11))
+
+
+def _preferences(categories=('museum', 'park'), money=2):
+	categories = list(categories)
+	return UserPreferences(
+		money, categories, {category: [] for category in categories}, [], ['vegan']
+	)
+
+
+def test_fingerprint_normalizes_the_request():
+	key = ItineraryCache.fingerprint(
+		'recommendation', CITY, MONDAY_TO_TUESDAY, 2, _preferences()
+	)
+	assert key == ItineraryCache.fingerprint(
+		'recommendation',
+		CITY,
+		NEXT_MONDAY_TO_TUESDAY,
+		2,
+		_preferences(('park', 'museum')),
+	)
+	assert key != ItineraryCache.fingerprint(
+		'recommendation', CITY, (date(2024, 6, 4), date(2024, 6, 5)), 2, _preferences()
+	)
+	assert key != ItineraryCache.fingerprint(
+		'recommendation', CITY, MONDAY_TO_TUESDAY, 2, _preferences(money=3)
+	)
+	assert key != ItineraryCache.fingerprint(
+		'wibit', CITY, MONDAY_TO_TUESDAY, 2, _preferences()
+	)
+
+
+def test_entries_are_copies_and_bounded():
+	cache = ItineraryCache(max_entries=2)
+	cache.put('a', 1, {'id': 'trip-a', 'days': [{'places': []}]})
+	cached = cache.get('a', 1)
+	assert cached == {'days': [{'places': []}]}
+	cached['days'].append({'places': []})
+	assert cache.get('a', 1) == {'days': [{'places': []}]}
+
+	cache.put('b', 1, {'days': []})
+	assert cache.get('a', 1) is not None
+	cache.put('c', 1, {'days': []})
+	assert cache.get('b', 1) is None
+	assert cache.get('a', 1) is not None
+
+
+def test_city_version_and_ttl_invalidate(monkeypatch):
+	cache = ItineraryCache(ttl=60)
+	cache.put('a', 1, {'days': []})
+	assert cache.get('a', 2) is None
+	assert cache.get('a', 1) is None
+	cache.put('a', None, {'days': []})
+	assert cache.get('a', None) is None
+
+	now = itinerary_cache_module.time.time()
+	cache.put('b', 1, {'days': []})
+	monkeypatch.setattr(itinerary_cache_module.time, 'time', lambda: now + 61)
+	assert cache.get('b', 1) is None
+	assert cache.stats() == {
+		'entries': 0,
+		'hits': 0,
+		'misses': 3,
+		'expired': 1,
+		'invalidated': 1,
+	}
+
+
+class FakeDataBase:
+	def __init__(self):
+		self.version = 1
+
+	def city_version(self, city):
+		return self.version
+
+
+class FakeTrips:
+	def __init__(self):
+		self.saved = []
+
+	def save_trip_history(self, city, itinerary):
+		self.saved.append(dict(itinerary))
+		return f'trip-{len(self.saved)}'
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+	runs = []
+
+	class FakeRecommendation:
+		def __init__(self, places, user, on_progress=None):
+			self.user = user
+
+		def get_recommendation(self):
+			runs.append(self.user.dates)
+			return self
+
+		def get_itinerary(self):
+			return {
+				'days': [{'places': [], 'weather': 1} for _ in range(2)],
+				'summary': 'summary',
+				'dates': [d.isoformat() for d in self.user.dates],
+			}
+
+	monkeypatch.setattr(get_recommendation, 'itinerary_cache', ItineraryCache())
+	monkeypatch.setattr(get_recommendation, 'Recommendation', FakeRecommendation)
+	monkeypatch.setattr(get_recommendation, 'get_attractions', lambda **kwargs: None)
+	monkeypatch.setattr(
+		get_recommendation, 'get_weather_for_dates', lambda *args: [7, 8]
+	)
+	return runs
+
+
+def test_hit_is_saved_as_a_new_trip(pipeline):
+	db, trips = FakeDataBase(), FakeTrips()
+	first = get_recommendation.get_recommendations(
+		db, trips, CITY.id, 2, MONDAY_TO_TUESDAY, _preferences()
+	)
+	second = get_recommendation.get_recommendations(
+		db, trips, CITY.id, 2, NEXT_MONDAY_TO_TUESDAY, _preferences()
+	)
+	assert len(pipeline) == 1
+	assert (first['id'], second['id']) == ('trip-1', 'trip-2')
+	assert second['dates'] == ['2024-06-10', '2024-06-11']
+	assert [day['weather'] for day in second['days']] == [7, 8]
+	assert second['summary'] == first['summary']
+
+	db.version = 2
+	get_recommendation.get_recommendations(
+		db, trips, CITY.id, 2, MONDAY_TO_TUESDAY, _preferences()
+	)
+	assert len(pipeline) == 2
+	assert len(trips.saved) == 3
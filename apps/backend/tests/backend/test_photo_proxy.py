@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from src.api_calls import google_places
+from src.api_calls.photo_cache import PhotoCache, PhotoFetchError
+from src.backend import main
+
+PHOTO = 'places/abc/photos/xyz'
+URL = f'/api/places/photos/{PHOTO}?maxHeightPx=400&maxWidthPx=400'
+
+
+@pytest.fixture
+def client(places_stub, monkeypatch, tmp_path):
+	monkeypatch.setenv('GOOGLE_PLACES_API_KEY', 'test-key')
+	monkeypatch.setattr(google_places, 'PLACES_API_URL', places_stub.url)
+	monkeypatch.setattr(main, 'photo_cache', PhotoCache(tmp_path))
+	return main.app.test_client()
+
+
+def _media_requests(stub):
+	return [r for r in stub.requests if '/media' in r['path']]
+
+
+def test_photo_is_fetched_once(client, places_stub):
+	first = client.get(URL)
+	second = client.get(URL)
+	assert first.status_code == second.status_code == 200
+	assert first.data == second.data == places_stub.photo
+	assert first.headers['Content-Type'] == 'image/png'
+	assert len(_media_requests(places_stub)) == 1
+
+	client.get(f'/api/places/photos/{PHOTO}?maxHeightPx=200&maxWidthPx=200')
+	assert len(_media_requests(places_stub)) == 2
+
+
+def test_if_none_match_returns_304(client):
+	etag = client.get(URL).headers['ETag']
+	revalidated = client.get(URL, headers={'If-None-Match': etag})
+	assert revalidated.status_code == 304
+	assert revalidated.data == b''
+	assert client.get(URL, headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_concurrent_misses_share_one_fetch(client, places_stub):
+	places_stub.delay = 0.3
+	statuses = []
+
+	def worker():
+		statuses.append(main.app.test_client().get(URL).status_code)
+
+	threads = [threading.Thread(target=worker) for _ in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert statuses == [200] * 8
+	assert len(_media_requests(places_stub)) == 1
+
+
+def test_fetch_errors_reach_every_waiter(tmp_path):
+	cache = PhotoCache(tmp_path)
+	errors = []
+
+	def failing_fetch():
+		time.sleep(0.2)
+		raise PhotoFetchError(502, 'boom')
+
+	def worker():
+		try:
+			cache.get(PHOTO, 400, 400, failing_fetch)
+		except PhotoFetchError as exc:
+			errors.append(exc.status)
+
+	threads = [threading.Thread(target=worker) for _ in range(4)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert errors == [502] * 4
+	assert cache.upstream_fetches == 1
+
+
+def test_byte_budget(tmp_path):
+	cache = PhotoCache(tmp_path, max_bytes=3000)
+	for i in range(5):
+		cache.get(f'places/{i}/photos/p', 400, 400, lambda: ('image/jpeg', b'x' * 1000))
+	assert cache.store.stats()['bytes'] <= 3000
+	assert cache.upstream_fetches == 5
+	cache.get('places/4/photos/p', 400, 400, lambda: ('image/jpeg', b'y'))
+	assert cache.upstream_fetches == 5
@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from src.backend import main
+from src.backend.jobs import JobRunner
+
+PAYLOAD = {
+	'city_id': 1616172264,
+	'days': 2,
+	'dates': ['2024-06-01', '2024-06-02'],
+	'preferences': {'money': 2, 'categories': {'museum': []}, 'needs': []},
+}
+
+
+def _wait(runner, job_id, timeout=5):
+	deadline = time.time() + timeout
+	while time.time() < deadline:
+		job = runner.get(job_id)
+		if job['status'] in ('succeeded', 'failed'):
+			return job
+		time.sleep(0.01)
+	raise AssertionError(f'job {job_id} did not finish')
+
+
+@pytest.fixture
+def release():
+	event = threading.Event()
+	yield event
+	event.set()
+
+
+def test_progress_and_result(release):
+	runner = JobRunner(max_workers=1)
+	reported = threading.Event()
+
+	def task(report):
+		report('fetch')
+		report('solve', 1, 4)
+		reported.set()
+		release.wait()
+		return {'answer': 42}
+
+	job, reused = runner.submit({'x': 1}, ['fetch', 'solve', 'save'], task)
+	assert not reused
+	assert reported.wait(5)
+	running = runner.get(job['job_id'])
+	assert running['status'] == 'running' and running['stage'] == 'solve'
+	assert running['stages'] == [
+		{'name': 'fetch', 'status': 'done'},
+		{'name': 'solve', 'status': 'running', 'done': 1, 'total': 4},
+		{'name': 'save', 'status': 'pending'},
+	]
+	assert running['progress'] == pytest.approx((1 + 0.25) / 3, abs=1e-3)
+
+	release.set()
+	finished = _wait(runner, job['job_id'])
+	assert finished['status'] == 'succeeded'
+	assert finished['result'] == {'answer': 42}
+	assert finished['progress'] == 1.0
+
+
+def test_identical_running_requests_share_a_job(release):
+	runner = JobRunner(max_workers=2)
+	calls = []
+
+	def task(report):
+		calls.append(1)
+		release.wait()
+		return len(calls)
+
+	first, _ = runner.submit({'x': 1}, ['a'], task)
+	second, reused = runner.submit({'x': 1}, ['a'], task)
+	other, other_reused = runner.submit({'x': 2}, ['a'], task)
+	assert reused and second['job_id'] == first['job_id']
+	assert not other_reused and other['job_id'] != first['job_id']
+
+	release.set()
+	_wait(runner, first['job_id'])
+	_wait(runner, other['job_id'])
+	assert len(calls) == 2
+	again, reused = runner.submit({'x': 1}, ['a'], task)
+	assert not reused and again['job_id'] != first['job_id']
+
+
+def test_pool_is_bounded_and_failures_are_reported(release):
+	runner = JobRunner(max_workers=1)
+
+	def blocking(report):
+		release.wait()
+
+	def failing(report):
+		raise RuntimeError('solver exploded')
+
+	blocked, _ = runner.submit({'x': 1}, ['a'], blocking)
+	queued, _ = runner.submit({'x': 2}, ['a'], failing)
+	time.sleep(0.1)
+	assert runner.get(queued['job_id'])['status'] == 'queued'
+	assert runner.stats()['running'] == 1
+
+	release.set()
+	failed = _wait(runner, queued['job_id'])
+	assert failed['status'] == 'failed'
+	assert failed['error'] == 'solver exploded'
+	with pytest.raises(ValueError):
+		runner.get('missing')
+
+
+def test_job_endpoints(monkeypatch, release):
+	monkeypatch.setattr(main, 'recommendation_jobs', JobRunner(max_workers=1))
+
+	def fake_recommendations(
+		db, db_trips, city_id, days, dates, prefs, on_progress=None
+	):
+		on_progress('places')
+		on_progress('routing', 0, days)
+		release.wait()
+		on_progress('saving')
+		return {'id': 'trip', 'city_id': city_id, 'days': [[]] * days}
+
+	monkeypatch.setattr(main, 'get_recommendations', fake_recommendations)
+	client = main.app.test_client()
+
+	response = client.post('/api/recommendation/jobs/preferences', json=PAYLOAD)
+	assert response.status_code == 202
+	job_id = response.get_json()['data']['job_id']
+	duplicate = client.post(
+		'/api/recommendation/jobs/preferences', json=PAYLOAD
+	).get_json()
+	assert duplicate['reused'] and duplicate['data']['job_id'] == job_id
+
+	time.sleep(0.1)
+	job = client.get(f'/api/recommendation/jobs/{job_id}').get_json()['data']
+	assert job['stage'] == 'routing'
+	assert [stage['name'] for stage in job['stages']] == main.RECOMMENDATION_STAGES
+
+	release.set()
+	job = _wait(main.recommendation_jobs, job_id)
+	assert job['result']['days'] == [[], []]
+	polled = client.get(f'/api/recommendation/jobs/{job_id}').get_json()['data']
+	assert polled['status'] == 'succeeded'
+	assert client.get('/api/recommendation/jobs/missing').status_code == 404
+	assert (
+		client.post('/api/recommendation/jobs/unknown', json=PAYLOAD).status_code == 404
+	)
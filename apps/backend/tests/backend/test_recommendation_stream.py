@@ -0,0 +1,120 @@
+import json
+import random
+
+import pytest
+
+from src.backend import main
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.database import DataBase, DataBaseTrips
+from src.recommendation import recommendation
+from src.route_optimalization import parallel_routing
+from src.route_optimalization.routing import Routing
+
+PAYLOAD = {
+	'city_id': 1616172264,
+	'days': 3,
+	'dates': ['2024-06-03', '2024-06-05'],
+	'preferences': {'money': 2, 'categories': {'museum': []}, 'needs': []},
+}
+
+
+def _places(city, count=45):
+	rng = random.Random(0)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				city.lat + rng.uniform(-0.03, 0.03), city.lng + rng.uniform(-0.03, 0.03)
+			),
+		)
+		place.types = ['museum']
+		place.ratings.rating = 4.5
+		place.ratings.userRatingCount = 100
+		place.priceLevel = 2
+		places.append(place)
+	return places
+
+
+@pytest.fixture
+def solves(tmp_path, monkeypatch):
+	city = City.get_const_krakow()
+	db = DataBase(tmp_path)
+	db.bulk_upsert_places(city, _places(city), 'places_categories', ['museum'])
+	monkeypatch.setattr(main, 'db', db)
+	db_trips = DataBaseTrips(tmp_path)
+	monkeypatch.setattr(main, 'db_trips', db_trips)
+	monkeypatch.setattr(
+		recommendation, 'get_weather_for_dates', lambda *args: [1, 2, 3]
+	)
+	monkeypatch.setattr(
+		recommendation.Llama, 'get_summary', lambda **kwargs: 'A summary'
+	)
+
+	monkeypatch.setattr(parallel_routing.day_solver, 'workers', 1)
+	calls = []
+	get_routes = Routing.get_routes
+	monkeypatch.setattr(
+		Routing, 'get_routes', lambda self: calls.append(1) or get_routes(self)
+	)
+	yield calls
+	db_trips.close()
+
+
+def _events(chunks):
+	for chunk in chunks:
+		for block in chunk.decode('utf-8').strip().split('\n\n'):
+			event, data = block.split('\n')
+			yield event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+
+def test_days_are_streamed_as_they_are_solved(solves):
+	response = main.app.test_client().post(
+		'/api/recommendation/stream/preferences', json=PAYLOAD, buffered=False
+	)
+	assert response.mimetype == 'text/event-stream'
+
+	received = []
+	for event, data in _events(response.response):
+		if event == 'day':
+			assert len(solves) == data['index'] + 1
+		received.append((event, data))
+
+	assert [event for event, _ in received] == [
+		'start',
+		'day',
+		'day',
+		'day',
+		'summary',
+		'done',
+	]
+	assert received[0][1]['days_len'] == 3
+	days = [data for event, data in received if event == 'day']
+	assert [day['index'] for day in days] == [0, 1, 2]
+	assert [day['weather'] for day in days] == [1, 2, 3]
+	assert all(day['places'] for day in days)
+	assert received[4][1] == {'summary': 'A summary'}
+
+	trip = main.db_trips.get_trip(received[5][1]['id'])
+	assert trip['summary'] == 'A summary'
+	assert [day['places'] for day in trip['days']] == [day['places'] for day in days]
+
+
+def test_errors_are_sent_as_events(solves, monkeypatch):
+	def failing(*args):
+		raise RuntimeError('weather service down')
+
+	monkeypatch.setattr(recommendation, 'get_weather_for_dates', failing)
+	response = main.app.test_client().post(
+		'/api/recommendation/stream/preferences', json=PAYLOAD
+	)
+	events = list(_events([response.data]))
+	assert events[-1] == ('error', {'message': 'weather service down'})
+	assert (
+		main.app.test_client()
+		.post('/api/recommendation/stream/wibit', json=PAYLOAD)
+		.status_code
+		== 404
+	)
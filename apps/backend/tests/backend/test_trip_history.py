@@ -0,0 +1,85 @@
+import pytest
+
+from src.backend import get_trip_history, main
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.database import DataBase, DataBaseTrips
+from src.database.places_cache import PlacesCache
+
+CITIES = [City.get_const_krakow(), City(1840014613)]
+
+
+def _place(place_id):
+	return Place(
+		placeInfo=PlaceInfo(id=place_id, displayName=f'Name {place_id}'),
+		location=Location(50.06, 19.94),
+	)
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+	db = DataBase(tmp_path)
+	db_trips = DataBaseTrips(tmp_path)
+	for city in CITIES:
+		db.bulk_upsert_places(
+			city, [_place(f'{city.id}-{i}') for i in range(5)], 'places_categories', []
+		)
+	for i in range(7):
+		city = CITIES[i % 2]
+		days = [{'places': [{'id': f'{city.id}-{i % 5}', 'time': i}]}]
+		db_trips.save_trip_history(city, {'id': f'trip-{i}', 'days': days})
+
+	reads = []
+	original = db.read_places_data_from_db
+	monkeypatch.setattr(
+		db,
+		'read_places_data_from_db',
+		lambda *args: reads.append(args[0].id) or original(*args),
+	)
+	monkeypatch.setattr(get_trip_history, 'places_cache', PlacesCache())
+	monkeypatch.setattr(main, 'db', db)
+	monkeypatch.setattr(main, 'db_trips', db_trips)
+	yield db, db_trips, reads
+	db_trips.close()
+
+
+def test_history_loads_each_city_once(stores):
+	db, db_trips, reads = stores
+	trips, next_cursor = get_trip_history.get_trip_history(db, db_trips)
+
+	assert next_cursor is None
+	assert sorted(reads) == sorted(city.id for city in CITIES)
+	assert [t['id'] for t in trips] == [f'trip-{i}' for i in range(7)]
+	place = trips[3]['days'][0]['places'][0]
+	assert place['name'] == f'Name {CITIES[1].id}-3'
+	assert place['time'] == 3
+	assert trips == [get_trip_history.get_trip(db, db_trips, t['id']) for t in trips]
+
+
+def test_pagination(stores):
+	client = main.app.test_client()
+	ids, cursor = [], None
+	while True:
+		query = {'limit': 3, **({'cursor': cursor} if cursor else {})}
+		body = client.get('/api/trip-history', query_string=query).get_json()
+		assert body['success']
+		ids += [t['id'] for t in body['data']]
+		cursor = body['next_cursor']
+		if cursor is None:
+			break
+	assert ids == [f'trip-{i}' for i in range(7)]
+
+	assert client.get('/api/trip-history?limit=0').status_code == 400
+	assert client.get('/api/trip-history?limit=x').status_code == 400
+	assert client.get('/api/trip-history?cursor=missing').status_code == 404
+	assert len(client.get('/api/trip-history').get_json()['data']) == 7
+
+
+def test_history_without_paging_is_complete(stores, monkeypatch):
+	monkeypatch.setattr(main, 'TRIP_HISTORY_PAGE_SIZE', 2)
+	client = main.app.test_client()
+	body = client.get('/api/trip-history').get_json()
+	assert len(body['data']) == 7 and body['next_cursor'] is None
+	body = client.get('/api/trip-history', query_string={'cursor': 'trip-0'}).get_json()
+	assert [t['id'] for t in body['data']] == ['trip-1', 'trip-2']
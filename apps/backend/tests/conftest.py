@@ -0,0 +1,127 @@
+"""Shared fixtures: local stand-ins for the Google Places API and OSRM."""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.travel_time.osrm_stub import OSRMStub
+
+
+def pytest_configure(config):
+	# src.backend.main opens the trip store on import; keep its files out of the source tree
+	data_dir = tempfile.mkdtemp(prefix='backend-data-')
+	os.environ['DATA_DIR'] = data_dir
+	config.add_cleanup(lambda: shutil.rmtree(data_dir, ignore_errors=True))
+
+
+def stub_place(place_id: str, primary_type: str) -> dict:
+	"""A Places API result that passes PlaceVisitor.is_suitable for big cities."""
+	return {
+		'name': f'places/{place_id}',
+		'id': place_id,
+		'displayName': {'text': place_id},
+		'types': [primary_type, 'point_of_interest'],
+		'primaryType': primary_type,
+		'rating': 4.7,
+		'userRatingCount': 5000,
+		'businessStatus': 'OPERATIONAL',
+		'location': {'latitude': 50.06, 'longitude': 19.94},
+	}
+
+
+class PlacesStub(ThreadingHTTPServer):
+	"""Threaded HTTP server answering like places.googleapis.com/v1.
+
+	Every nearby search returns two places named after the searched type plus
+	one place shared by all searches, after sleeping ``delay`` seconds.
+	"""
+
+	daemon_threads = True
+
+	def __init__(self, delay: float = 0.0):
+		super().__init__(('127.0.0.1', 0), PlacesStubHandler)
+		self.delay = delay
+		self.requests: list[dict] = []
+		self.photo = b'\x89PNG\r\n\x1a\n' + b'0' * 1024
+		self._lock = threading.Lock()
+
+	@property
+	def url(self) -> str:
+		return f'http://127.0.0.1:{self.server_address[1]}'
+
+	def record(self, entry: dict):
+		with self._lock:
+			self.requests.append(entry)
+
+	def search_results(self, body: dict) -> dict:
+		searched = body.get('includedPrimaryTypes') or body.get('includedTypes')
+		searched = searched if isinstance(searched, str) else searched[0]
+		return {
+			'places': [
+				stub_place(f'{searched}-0', searched),
+				stub_place(f'{searched}-1', searched),
+				stub_place('shared', searched),
+			]
+		}
+
+
+class PlacesStubHandler(BaseHTTPRequestHandler):
+	server: PlacesStub
+
+	def log_message(self, *args):
+		pass
+
+	def _send(self, status: int, payload: bytes, content_type: str, headers=None):
+		self.send_response(status)
+		self.send_header('Content-Type', content_type)
+		self.send_header('Content-Length', str(len(payload)))
+		for key, value in (headers or {}).items():
+			self.send_header(key, value)
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def do_POST(self):
+		length = int(self.headers.get('Content-Length', 0))
+		body = json.loads(self.rfile.read(length) or b'{}')
+		self.server.record({'method': 'POST', 'path': self.path, 'body': body})
+		time.sleep(self.server.delay)
+		payload = json.dumps(self.server.search_results(body)).encode()
+		self._send(200, payload, 'application/json')
+
+	def do_GET(self):
+		self.server.record(
+			{'method': 'GET', 'path': self.path, 'headers': dict(self.headers)}
+		)
+		time.sleep(self.server.delay)
+		if '/media' in self.path:
+			self._send(200, self.server.photo, 'image/png')
+			return
+		place_id = self.path.split('?')[0].rsplit('/', 1)[-1]
+		payload = json.dumps(stub_place(place_id, 'museum')).encode()
+		self._send(200, payload, 'application/json')
+
+
+@pytest.fixture
+def places_stub():
+	server = PlacesStub()
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	yield server
+	server.shutdown()
+	server.server_close()
+
+
+@pytest.fixture
+def osrm_stub():
+	server = OSRMStub()
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	yield server
+	server.shutdown()
+	server.server_close()
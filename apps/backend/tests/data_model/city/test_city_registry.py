@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_model.city.city_registry import CityRegistry
+
+CSV = (
+	'city,city_ascii,lat,lng,country,iso2,iso3,admin_name,capital,population,id\n'
+	'Kraków,Krakow,50.0614,19.9372,Poland,PL,POL,Małopolskie,admin,800653,1616172264\n'
+	'Tokyo,Tokyo,35.6897,139.6922,Japan,JP,JPN,Tōkyō,primary,37732000,1392685764\n'
+	'Nowhere,Nowhere,1.0,2.0,Atlantis,AT,ATL,,,,1000000001\n'
+)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+	path = tmp_path / 'worldcities.csv'
+	path.write_text(CSV, encoding='utf-8')
+	return path
+
+
+def _legacy_lookup(path, city_id):
+	data = pd.read_csv(path)
+	data = data[data['id'] == city_id]
+	attributes = ['id', 'city', 'country', 'population', 'lat', 'lng']
+	data = data[attributes].to_dict('records')[0]
+	return {str(k): v for k, v in data.items()}
+
+
+def test_get_matches_csv(csv_path):
+	registry = CityRegistry(csv_path)
+	for city_id in (1616172264, 1392685764):
+		assert registry.get(city_id) == _legacy_lookup(csv_path, city_id)
+
+
+def test_population_is_float(csv_path):
+	registry = CityRegistry(csv_path)
+	assert registry.get(1616172264)['population'] == 800653.0
+
+
+def test_compiles_binary_once(csv_path):
+	registry = CityRegistry(csv_path)
+	registry.load()
+	assert registry.binary_path.exists()
+
+	csv_path.unlink()
+	reloaded = CityRegistry(csv_path, registry.binary_path)
+	assert reloaded.get(1616172264)['city'] == 'Kraków'
+
+
+def test_stale_binary_is_rebuilt(csv_path, tmp_path):
+	registry = CityRegistry(csv_path)
+	registry.load()
+	csv_path.write_text(CSV.replace('Kraków,Krakow', 'Cracow,Krakow'), encoding='utf-8')
+	stat = registry.binary_path.stat()
+	os.utime(csv_path, (stat.st_atime + 10, stat.st_mtime + 10))
+	assert CityRegistry(csv_path).get(1616172264)['city'] == 'Cracow'
+
+
+def test_unknown_city(csv_path):
+	registry = CityRegistry(csv_path)
+	with pytest.raises(ValueError):
+		registry.get(42)
+	assert 42 not in registry
+	assert '1616172264' in registry
+
+
+def test_random_id(csv_path):
+	registry = CityRegistry(csv_path)
+	assert registry.random_id() in {1616172264, 1392685764, 1000000001}
+	assert len(registry) == 3
@@ -0,0 +1,102 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+
+
+def _place(place_id, lat=50.0, rating=0.5, minutes=60):
+	place = Place(
+		placeInfo=PlaceInfo(id=place_id, displayName=place_id),
+		location=Location(lat, 19.9),
+		estimatedTime=minutes,
+	)
+	place.ratings.cumulative_rating = rating
+	return place
+
+
+@pytest.fixture
+def places():
+	return Places(
+		[_place('a', 50.1, 0.3), _place('b', 50.2, 0.9, 30), _place('c', 50.3, 0.6)]
+	)
+
+
+def _ids(places):
+	return [place.placeInfo.id for place in places.get_list()]
+
+
+def test_positional_and_id_access(places):
+	assert places.get_by_index(1).placeInfo.id == 'b'
+	assert places[-1].placeInfo.id == 'c'
+	assert [place.placeInfo.id for place in places[:2]] == ['a', 'b']
+	assert places.get_place_by_id('c') is places[2]
+	assert places.get_location_dict_with_id('b') == {
+		'id': 'b',
+		'lat': 50.2,
+		'lng': 19.9,
+	}
+	assert len(places) == places.count == 3
+	with pytest.raises(KeyError):
+		places.get_place_by_id('missing')
+	with pytest.raises(IndexError):
+		places.get_by_index(3)
+
+
+def test_set_place_replaces_in_place(places):
+	places.set_place(_place('b', 51.0))
+	places.add_place(_place('d'))
+	assert _ids(places) == ['a', 'b', 'c', 'd']
+	assert places.get_location_by_id('b').latitude == 51.0
+	assert _ids(Places([_place('a'), _place('a', 52.0)])) == ['a']
+
+
+def test_remove_and_sort_keep_the_index(places):
+	places.remove_place(places.get_place_by_id('a'))
+	assert _ids(places) == ['b', 'c']
+	assert places.get_place_by_id('c') is places[1]
+	places.add_place(_place('e', rating=1.0))
+	assert _ids(places.sort_by_rating()) == ['e', 'b', 'c']
+	assert places.get_place_by_id('e') is places[0]
+
+
+def test_places_mapping_is_live(places):
+	mapping = places.places
+	assert list(mapping) == ['a', 'b', 'c']
+	places.add_place(_place('d'))
+	assert list(mapping.keys()) == ['a', 'b', 'c', 'd']
+	assert mapping['d'] is places[3]
+	assert mapping.get('missing') is None
+	assert len(mapping) == 4
+	assert places.statisticalRating.count == 4
+
+
+def test_columns_are_cached_until_changed(places):
+	latitudes = places.latitudes
+	np.testing.assert_array_equal(latitudes, [50.1, 50.2, 50.3])
+	np.testing.assert_array_equal(places.ratings, [0.3, 0.9, 0.6])
+	np.testing.assert_array_equal(places.estimated_times, [60, 30, 60])
+	assert places.estimated_times.dtype == np.int64
+	assert places.latitudes is latitudes
+	with pytest.raises(ValueError):
+		latitudes[0] = 0
+
+	places.add_place(_place('d', 50.4))
+	np.testing.assert_array_equal(places.latitudes, [50.1, 50.2, 50.3, 50.4])
+	assert places.ratings[0] == 0.3
+	places[0].ratings.cumulative_rating = 0.0
+	assert places.ratings[0] == 0.3
+	places.refresh_columns()
+	assert places.ratings[0] == 0.0
+	assert Places().longitudes.shape == (0,)
+
+
+def test_pickle_round_trip(places):
+	places.latitudes
+	copy = pickle.loads(pickle.dumps(places))
+	assert _ids(copy) == ['a', 'b', 'c']
+	assert copy.get_place_by_id('b').location.latitude == 50.2
+	assert list(copy.places) == ['a', 'b', 'c']
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.place.place_visitor import PlaceVisitor
+from src.data_model.places.places import Places
+from src.database import DataBase
+
+
+def _place(place_id, name=''):
+	return Place(
+		placeInfo=PlaceInfo(id=place_id, displayName=name or place_id),
+		location=Location(50.06, 19.94),
+	)
+
+
+@pytest.fixture
+def city():
+	return City.get_const_krakow()
+
+
+def test_matches_sequential_adds(tmp_path, city):
+	existing = [_place('a'), _place('b'), _place('c')]
+	new = [_place('b', 'B2'), _place('d'), _place('a', 'A2'), _place('d', 'D2')]
+
+	sequential = DataBase(tmp_path / 'sequential')
+	bulk = DataBase(tmp_path / 'bulk')
+	for db in (sequential, bulk):
+		for place in existing:
+			db.add_place_to_database(place, city, 'places_categories', 'places', ['x'])
+	for place in new:
+		sequential.add_place_to_database(
+			place, city, 'places_categories', 'places', ['museum']
+		)
+	bulk.bulk_upsert_places(city, new, 'places_categories', ['museum'])
+
+	assert bulk._load_city_payload(city) == sequential._load_city_payload(city)
+	ids = [p['placeInfo']['id'] for p in bulk.get_all_places(city, 'places')]
+	assert ids == ['c', 'b', 'a', 'd']
+	assert bulk.get_place(city, 'd').placeInfo.displayName == 'D2'
+
+
+def test_writes_once_atomically(tmp_path, city, monkeypatch):
+	db = DataBase(tmp_path)
+	writes = []
+	original = db._write_city_payload
+	monkeypatch.setattr(
+		db, '_write_city_payload', lambda *args: writes.append(1) or original(*args)
+	)
+	places = Places([_place(str(i)) for i in range(50)], city)
+	PlaceVisitor().save_places_to_database(db, places, city, ['museum'])
+
+	assert len(writes) == 1
+	assert [p.name for p in db.places_path.iterdir()] == [db._city_file(city).name]
+	payload = db._load_city_payload(city)
+	assert len(payload['places']) == 50
+	assert payload['categories'] == {'places_categories': ['museum']}
+
+
+def test_concurrent_saves_keep_every_place(tmp_path, city):
+	db = DataBase(tmp_path)
+	errors = []
+
+	def save(worker):
+		try:
+			for i in range(20):
+				db.bulk_upsert_places(
+					city, [_place(f'{worker}-{i}')], 'places_categories', []
+				)
+		except Exception as exc:
+			errors.append(exc)
+
+	threads = [threading.Thread(target=save, args=(worker,)) for worker in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert errors == []
+	ids = {p['placeInfo']['id'] for p in db.get_all_places(city, 'places')}
+	assert ids == {f'{worker}-{i}' for worker in range(8) for i in range(20)}
+	assert not list(tmp_path.rglob('*.tmp'))
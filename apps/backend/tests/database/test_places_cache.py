@@ -0,0 +1,88 @@
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.database import create_database
+from src.database.places_cache import PlacesCache
+
+
+def _place(place_id, name=''):
+	return Place(
+		placeInfo=PlaceInfo(id=place_id, displayName=name or place_id),
+		location=Location(50.06, 19.94),
+	)
+
+
+@pytest.fixture
+def city():
+	return City.get_const_krakow()
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def db(request, tmp_path, city):
+	db = create_database(tmp_path, request.param)
+	db.bulk_upsert_places(
+		city, [_place(str(i)) for i in range(10)], 'places_categories', []
+	)
+	return db
+
+
+def test_hit_returns_isolated_copy(db, city, monkeypatch):
+	cache = PlacesCache(max_bytes=10**7)
+	first = cache.get(db, city)
+	first.get_place_by_id('0').ratings.rating = 5.0
+	first.get_place_by_id('0').regularOpeningHours.periods.clear()
+
+	reads = []
+	original = db.read_places_data_from_db
+	monkeypatch.setattr(
+		db, 'read_places_data_from_db', lambda *a: reads.append(1) or original(*a)
+	)
+	second = cache.get(db, city)
+	third = cache.get(db, city)
+
+	assert reads == []
+	assert cache.stats()['hits'] == 2
+	assert second.get_place_by_id('0').ratings.rating == 0.0
+	assert second.get_place_by_id('0').regularOpeningHours.periods
+	assert second.get_place_by_id('1') is not third.get_place_by_id('1')
+	assert [p.placeInfo.id for p in second.get_list()] == [str(i) for i in range(10)]
+
+
+def test_write_invalidates(db, city):
+	cache = PlacesCache(max_bytes=10**7)
+	assert len(cache.get(db, city)) == 10
+	db.add_place_to_database(_place('new'), city, 'places_categories', 'places', [])
+	db.add_place_to_database(
+		_place('0', 'renamed'), city, 'places_categories', 'places', []
+	)
+
+	places = cache.get(db, city)
+	assert len(places) == 11
+	assert places.get_place_by_id('0').placeInfo.displayName == 'renamed'
+	assert cache.stats()['misses'] == 2
+
+
+def test_lru_budget(tmp_path):
+	db = create_database(tmp_path, 'json')
+	cities = [City.get_const_krakow(), City(1840014613)]
+	for city in cities:
+		db.bulk_upsert_places(
+			city, [_place(str(i)) for i in range(10)], 'places_categories', []
+		)
+
+	size = PlacesCache(max_bytes=10**7)
+	size.get(db, cities[0])
+	cache = PlacesCache(max_bytes=size.stats()['bytes'] + 1)
+	cache.get(db, cities[0])
+	cache.get(db, cities[1])
+	assert cache.stats()['entries'] == 1
+	cache.get(db, cities[1])
+	assert cache.stats()['hits'] == 1
+	cache.get(db, cities[0])
+	assert cache.stats()['misses'] == 3
+
+	disabled = PlacesCache(max_bytes=0)
+	disabled.get(db, cities[0])
+	assert disabled.stats()['entries'] == 0
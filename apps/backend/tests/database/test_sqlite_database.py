@@ -0,0 +1,101 @@
+import json
+import sqlite3
+
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place, PlaceCreatorDatabase
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.database import DataBase, SQLiteDataBase, create_database
+
+
+def _place(place_id, name='', types=(), rating=0.0):
+	place = Place(
+		placeInfo=PlaceInfo(id=place_id, displayName=name or place_id),
+		location=Location(50.06, 19.94),
+	)
+	place.types = list(types)
+	place.ratings.rating = rating
+	return place
+
+
+@pytest.fixture
+def city():
+	return City.get_const_krakow()
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def db(request, tmp_path):
+	return create_database(tmp_path, request.param)
+
+
+def test_backends_share_behaviour(db, city):
+	assert not db.check_if_city_exist(city)
+	db.add_place_to_database(_place('a'), city, 'places_categories', 'places', ['x'])
+	db.bulk_upsert_places(
+		city,
+		[_place('b', types=['museum'], rating=4.5), _place('a', 'A2', ['park'], 3.0)],
+		'places_categories',
+		['museum'],
+	)
+
+	assert db.check_if_city_exist(city)
+	assert [p['placeInfo']['id'] for p in db.get_all_places(city, 'places')] == [
+		'b',
+		'a',
+	]
+	assert db.get_place(city, 'a').placeInfo.displayName == 'A2'
+	with pytest.raises(ValueError):
+		db.get_place(city, 'missing')
+	assert set(db.get_place_map(city)) == {'a', 'b'}
+	places = db.read_places_data_from_db(city, 'places', PlaceCreatorDatabase)
+	assert [p.placeInfo.id for p in places.get_list()] == ['b', 'a']
+	assert db.get_categories(city) == {'places_categories': ['museum']}
+
+	assert [p['placeInfo']['id'] for p in db.query_places(city)] == ['b', 'a']
+	assert [p['placeInfo']['id'] for p in db.query_places(city, 'park')] == ['a']
+	assert [p['placeInfo']['id'] for p in db.query_places(city, min_rating=4)] == ['b']
+	assert db.query_places(city, 'zoo') == []
+
+
+def test_migration_from_json(tmp_path, city):
+	source = DataBase(tmp_path / 'json')
+	places = [_place(str(i), types=['museum'], rating=i % 5) for i in range(20)]
+	source.bulk_upsert_places(city, places, 'places_categories', ['museum'])
+
+	target = SQLiteDataBase(tmp_path / 'sqlite')
+	assert target.import_json_places(source.places_path) == {'poland_1616172264': 20}
+	assert target.import_json_places(source.places_path) == {'poland_1616172264': 20}
+
+	assert target.get_all_places(city, 'places') == source.get_all_places(
+		city, 'places'
+	)
+	assert target.get_categories(city) == source.get_categories(city)
+	assert target.query_places(city, 'museum', 4) == source.query_places(
+		city, 'museum', 4
+	)
+
+
+def test_lookups_use_indexes(tmp_path, city):
+	db = SQLiteDataBase(tmp_path)
+	connection = sqlite3.connect(db.db_path)
+	key = db._city_key(city)
+	queries = [
+		('SELECT data FROM places WHERE city_key = ? AND place_id = ?', (key, 'a')),
+		('SELECT data FROM places WHERE place_id = ?', ('a',)),
+		(
+			'SELECT place_id FROM place_types WHERE city_key = ? AND type = ?',
+			(key, 'museum'),
+		),
+		('SELECT data FROM places WHERE city_key = ? AND rating >= ?', (key, 4)),
+	]
+	for query, params in queries:
+		plan = json.dumps(
+			connection.execute(f'EXPLAIN QUERY PLAN {query}', params).fetchall()
+		)
+		assert 'USING' in plan and 'SCAN' not in plan, plan
+
+
+def test_unknown_backend(tmp_path):
+	with pytest.raises(ValueError):
+		create_database(tmp_path, 'firebase')
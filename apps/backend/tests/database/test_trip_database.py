@@ -0,0 +1,302 @@
+import io
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from src.data_model.city.city import City
+from src.database import DataBaseTrips
+
+
+def _itinerary(name='trip', places=2):
+	return {
+		'name': name,
+		'days': [{'places': [{'id': f'p{i}'} for i in range(places)]}],
+	}
+
+
+@pytest.fixture
+def city():
+	return City.get_const_krakow()
+
+
+@pytest.fixture
+def open_store(tmp_path):
+	"""Open DataBaseTrips on tmp_path; every store opened is closed after the test."""
+	stores = []
+
+	def open_store(**kwargs):
+		store = DataBaseTrips(tmp_path, **kwargs)
+		stores.append(store)
+		return store
+
+	yield open_store
+	for store in stores:
+		store.close()
+
+
+def test_public_methods(open_store, city):
+	db = open_store()
+	first = db.save_trip_history(city, _itinerary('first'))
+	second = db.save_trip_history(city, _itinerary('second'))
+	third = db.save_trip_history(city, {**_itinerary('third'), 'id': 'fixed'})
+	assert third == 'fixed'
+
+	db.set_trip_rating(first, 0, 1, 4.5)
+	assert db.get_trip(first)['days'][0]['places'][1]['user_rating'] == 4.5
+	with pytest.raises(IndexError):
+		db.set_trip_rating(first, 3, 0, 1)
+	with pytest.raises(ValueError):
+		db.get_trip('missing')
+
+	db.save_trip_history(city, {**_itinerary('replaced'), 'id': second})
+	assert [t['name'] for t in db.get_trip_history()] == ['first', 'third', 'replaced']
+
+	db.delete_trip(first)
+	with pytest.raises(ValueError):
+		db.delete_trip(first)
+	assert db.delete_trips([second, 'missing']) == ([], ['missing'])
+	assert db.delete_trips([second]) == ([second], [])
+	assert [t['id'] for t in db.get_trip_history()] == ['fixed']
+	assert db.get_trip('fixed')['days_len'] == 1
+
+
+def test_trip_page(open_store, city):
+	db = open_store()
+	ids = [db.save_trip_history(city, _itinerary(str(i))) for i in range(5)]
+
+	first, cursor = db.get_trip_page(limit=2)
+	assert [t['id'] for t in first] == ids[:2] and cursor == ids[1]
+	db.delete_trip(ids[0])
+	rest, cursor = db.get_trip_page(cursor, limit=10)
+	assert [t['id'] for t in rest] == ids[2:] and cursor is None
+	assert db.get_trip_page(ids[-1]) == ([], None)
+	with pytest.raises(ValueError):
+		db.get_trip_page(ids[0])
+
+
+def test_index_is_rebuilt_on_restart(open_store, city):
+	db = open_store()
+	ids = [db.save_trip_history(city, _itinerary(str(i))) for i in range(5)]
+	db.set_trip_rating(ids[0], 0, 0, 2.0)
+	db.delete_trip(ids[2])
+	history = db.get_trip_history()
+
+	assert open_store().get_trip_history() == history
+
+
+def test_torn_record_is_dropped(open_store, city):
+	db = open_store()
+	trip_id = db.save_trip_history(city, _itinerary())
+	with open(db.log_file, 'ab') as handle:
+		handle.write(b'{"op":"put","trip":{"id":"half')
+
+	reopened = open_store()
+	assert [t['id'] for t in reopened.get_trip_history()] == [trip_id]
+	reopened.save_trip_history(city, _itinerary('after'))
+	assert len(open_store().get_trip_history()) == 2
+
+
+def test_corrupt_record_is_not_truncated(open_store, city):
+	db = open_store()
+	db.save_trip_history(city, _itinerary('before'))
+	with open(db.log_file, 'ab') as handle:
+		handle.write(b'{"op":"put",\n')
+	db.save_trip_history(city, _itinerary('after'))
+	size = db.log_file.stat().st_size
+
+	with pytest.raises(ValueError, match='Corrupt record'):
+		open_store()
+	assert db.log_file.stat().st_size == size
+
+
+def test_close_commits_queued_writes(tmp_path, city):
+	with DataBaseTrips(tmp_path, commit_window=1) as db:
+		threads = [
+			threading.Thread(
+				target=db.save_trip_history, args=(city, _itinerary(str(i)))
+			)
+			for i in range(4)
+		]
+		for thread in threads:
+			thread.start()
+		time.sleep(0.1)
+	for thread in threads:
+		thread.join()
+	assert not db._writer_thread.is_alive() and db._handle.closed
+	with pytest.raises(RuntimeError):
+		db.save_trip_history(city, _itinerary())
+	db.close()
+
+	with DataBaseTrips(tmp_path) as reopened:
+		assert len(reopened.get_trip_history()) == 4
+
+
+def test_imports_legacy_trips_json(tmp_path, open_store):
+	trips = [
+		{'id': 'a', 'days': [], 'city_id': 1},
+		{'id': 'b', 'days': [], 'city_id': 2},
+	]
+	(tmp_path / 'trips.json').write_text(json.dumps({'trips': trips}))
+	db = open_store()
+	assert [t['id'] for t in db.get_trip_history()] == ['a', 'b']
+
+
+def test_compaction_drops_superseded_records(open_store, city):
+	db = open_store(compact_min_bytes=10**9)
+	ids = [db.save_trip_history(city, _itinerary(str(i))) for i in range(10)]
+	for rating in range(20):
+		db.set_trip_rating(ids[0], 0, 0, rating)
+	db.delete_trips(ids[5:])
+	history = db.get_trip_history()
+	size = db.log_file.stat().st_size
+
+	db.compact()
+	assert db.log_file.stat().st_size < size / 3
+	assert db.get_trip_history() == history
+	assert open_store().get_trip_history() == history
+
+
+def test_background_compaction(open_store, city):
+	db = open_store(compact_min_bytes=2000)
+	trip_id = db.save_trip_history(city, _itinerary(places=5))
+	for rating in range(200):
+		db.set_trip_rating(trip_id, 0, rating % 5, rating)
+	db._compaction.join()
+	db.set_trip_rating(trip_id, 0, 0, -1)
+
+	assert db.log_file.stat().st_size < 20000
+	trip = open_store().get_trip(trip_id)
+	assert [p['user_rating'] for p in trip['days'][0]['places']] == [
+		-1,
+		196,
+		197,
+		198,
+		199,
+	]
+
+
+def test_writes_during_compaction_are_kept(open_store, city):
+	db = open_store(compact_min_bytes=10**9)
+	ids = [db.save_trip_history(city, _itinerary(str(i))) for i in range(200)]
+	db.delete_trips(ids[:100])
+
+	compaction = threading.Thread(target=db.compact)
+	compaction.start()
+	added = [db.save_trip_history(city, _itinerary(f'new{i}')) for i in range(50)]
+	for trip_id in ids[100:150]:
+		db.set_trip_rating(trip_id, 0, 0, 5.0)
+	compaction.join()
+
+	expected = ids[100:] + added
+	for current in (db, open_store()):
+		history = current.get_trip_history()
+		assert [t['id'] for t in history] == expected
+		assert sum('user_rating' in t['days'][0]['places'][0] for t in history) == 50
+
+
+def _run_threads(target, count):
+	threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+
+
+def test_concurrent_ratings_are_not_lost(open_store, city):
+	db = open_store(commit_window=0.005)
+	trip_id = db.save_trip_history(city, _itinerary(places=200))
+	commits = db.commits
+
+	def rate(worker):
+		for place_index in range(worker, 200, 16):
+			db.set_trip_rating(trip_id, 0, place_index, place_index)
+
+	_run_threads(rate, 16)
+	assert db.commits - commits < 100
+	places = open_store().get_trip(trip_id)['days'][0]['places']
+	assert [p['user_rating'] for p in places] == list(range(200))
+
+
+def test_concurrent_saves_and_deletes(open_store, city):
+	db = open_store(commit_window=0.005)
+
+	def work(worker):
+		ids = [
+			db.save_trip_history(city, _itinerary(f'{worker}-{i}')) for i in range(20)
+		]
+		db.delete_trips(ids[:10])
+		db.delete_trip(ids[10])
+
+	_run_threads(work, 8)
+	names = sorted(t['name'] for t in open_store().get_trip_history())
+	assert names == sorted(f'{w}-{i}' for w in range(8) for i in range(11, 20))
+
+
+def test_failed_mutation_does_not_affect_its_batch(open_store, city):
+	db = open_store(commit_window=0.2)
+	trip_id = db.save_trip_history(city, _itinerary(places=4))
+	errors = []
+
+	def rate(worker):
+		try:
+			db.set_trip_rating(trip_id, 0, worker, 1.0)
+		except IndexError as exc:
+			errors.append(exc)
+
+	commits = db.commits
+	_run_threads(rate, 6)
+	assert db.commits == commits + 1
+	assert len(errors) == 2
+	places = db.get_trip(trip_id)['days'][0]['places']
+	assert [p['user_rating'] for p in places] == [1.0] * 4
+
+
+def test_failed_fsync_leaves_the_log_unchanged(open_store, city, monkeypatch):
+	db = open_store()
+	kept = db.save_trip_history(city, _itinerary('kept'))
+	size = db.log_file.stat().st_size
+
+	def failing_fsync(fd):
+		raise OSError('disk full')
+
+	with monkeypatch.context() as patch:
+		patch.setattr(os, 'fsync', failing_fsync)
+		with pytest.raises(OSError, match='disk full'):
+			db.save_trip_history(city, _itinerary('lost'))
+	assert db.log_file.stat().st_size == size
+	assert [t['id'] for t in db.get_trip_history()] == [kept]
+
+	saved = db.save_trip_history(city, _itinerary('saved'))
+	assert [t['name'] for t in db.get_trip_history()] == ['kept', 'saved']
+	db.close()
+	reopened = open_store()
+	assert [t['id'] for t in reopened.get_trip_history()] == [kept, saved]
+
+
+class _FullDisk(io.RawIOBase):
+	def writable(self):
+		return True
+
+	def write(self, data):
+		raise OSError('disk full')
+
+
+def test_failed_write_drops_the_buffered_bytes(open_store, city):
+	db = open_store()
+	kept = db.save_trip_history(city, _itinerary('kept'))
+	size = db.log_file.stat().st_size
+	handle = db._handle
+	# the records stay in the buffer of a handle whose writes fail
+	db._handle = io.BufferedWriter(_FullDisk())
+	with pytest.raises(OSError, match='disk full'):
+		db.save_trip_history(city, _itinerary('lost'))
+	handle.close()
+	assert db.log_file.stat().st_size == size
+
+	saved = db.save_trip_history(city, _itinerary('saved'))
+	db.close()
+	reopened = open_store()
+	assert [t['id'] for t in reopened.get_trip_history()] == [kept, saved]
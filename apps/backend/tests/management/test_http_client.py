@@ -0,0 +1,113 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.api_calls.http_client import HttpClient
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+	protocol_version = 'HTTP/1.1'
+
+	def log_message(self, *args):
+		pass
+
+	def do_POST(self):
+		self.rfile.read(int(self.headers.get('Content-Length', 0)))
+		self.do_GET()
+
+	def do_GET(self):
+		server = self.server
+		server.ports.add(self.client_address[1])
+		server.hits += 1
+		if self.path == '/slow':
+			time.sleep(0.5)
+		status = 503 if server.hits <= server.failures else 200
+		body = b'ok'
+		self.send_response(status)
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+	httpd = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+	httpd.daemon_threads = True
+	httpd.ports = set()
+	httpd.hits = 0
+	httpd.failures = 0
+	thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+	thread.start()
+	httpd.url = f'http://127.0.0.1:{httpd.server_address[1]}'
+	yield httpd
+	httpd.shutdown()
+	httpd.server_close()
+
+
+def test_connections_are_reused(server):
+	client = HttpClient()
+	for _ in range(10):
+		assert client.get(f'{server.url}/').status_code == 200
+	assert len(server.ports) == 1
+
+
+def test_retries_retryable_status(server):
+	server.failures = 2
+	client = HttpClient(retries=2, backoff_factor=0)
+	response = client.get(f'{server.url}/')
+	assert response.status_code == 200
+	stats = client.stats()[f'127.0.0.1:{server.server_address[1]}']
+	assert stats['requests'] == 3
+	assert stats['retries'] == 2
+	assert stats['errors'] == 2
+
+
+def test_gives_up_after_retries(server):
+	server.failures = 10
+	client = HttpClient(retries=1, backoff_factor=0)
+	assert client.get(f'{server.url}/').status_code == 503
+	assert server.hits == 2
+
+
+def test_post_is_not_replayed(server):
+	server.failures = 10
+	client = HttpClient(timeout=(1, 0.1), retries=2, backoff_factor=0)
+	assert client.post(f'{server.url}/', json={}).status_code == 503
+	assert server.hits == 1
+	with pytest.raises(requests.Timeout):
+		client.post(f'{server.url}/slow', json={})
+	assert server.hits == 2
+
+	response = client.post(f'{server.url}/', json={}, timeout=2, idempotent=True)
+	assert response.status_code == 503
+	assert server.hits == 5
+
+
+def test_post_retries_refused_connection(server):
+	url = server.url
+	server.shutdown()
+	server.server_close()
+	client = HttpClient(retries=2, backoff_factor=0)
+	with pytest.raises(requests.ConnectionError):
+		client.post(f'{url}/', json={})
+	assert client.stats()[url.split('//')[1]]['requests'] == 3
+
+
+def test_default_timeout(server):
+	client = HttpClient(timeout=(1, 0.1), retries=0)
+	with pytest.raises(requests.Timeout):
+		client.get(f'{server.url}/slow')
+	assert client.get(f'{server.url}/slow', timeout=2).status_code == 200
+
+
+def test_latency_counters(server):
+	client = HttpClient()
+	client.get(f'{server.url}/slow')
+	stats = client.stats()[f'127.0.0.1:{server.server_address[1]}']
+	assert stats['requests'] == 1
+	assert stats['max_ms'] >= 500
+	client.reset_stats()
+	assert client.stats() == {}
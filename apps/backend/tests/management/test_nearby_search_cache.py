@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+
+import pytest
+from requests import Response
+
+from src.api_calls import google_places
+from src.api_calls.response_cache import CacheMissError, ResponseCache
+
+KRAKOW = (50.0614, 19.9372)
+
+
+@pytest.fixture
+def stub(places_stub, monkeypatch):
+	monkeypatch.setattr(google_places, 'PLACES_API_URL', places_stub.url)
+	return places_stub
+
+
+def _use_cache(monkeypatch, cache):
+	monkeypatch.setattr(google_places, 'nearby_search_cache', cache)
+	return cache
+
+
+def test_second_search_is_served_from_disk(stub, monkeypatch, tmp_path):
+	cache = _use_cache(monkeypatch, ResponseCache(tmp_path))
+	first = google_places.nearby_search(KRAKOW, included_types=['museum']).json()
+	second = google_places.nearby_search(KRAKOW, included_types=['museum']).json()
+	assert first == second
+	assert len(stub.requests) == 1
+	assert cache.stats()['hits'] == 1
+
+	restarted = _use_cache(monkeypatch, ResponseCache(tmp_path))
+	google_places.nearby_search(KRAKOW, included_types=['museum'])
+	assert len(stub.requests) == 1
+	assert restarted.stats()['entries'] == 1
+
+
+def test_key_is_normalized(stub, monkeypatch, tmp_path):
+	_use_cache(monkeypatch, ResponseCache(tmp_path))
+	google_places.nearby_search(
+		KRAKOW, included_types=['museum', 'park'], excluded_types=['bar', 'spa']
+	)
+	google_places.nearby_search(
+		(KRAKOW[0] + 0.00001, KRAKOW[1] - 0.00001),
+		included_types=['park', 'museum'],
+		excluded_types=['spa', 'bar'],
+	)
+	assert len(stub.requests) == 1
+
+	google_places.nearby_search(KRAKOW, included_types=['museum', 'park'], radius=5)
+	google_places.nearby_search(KRAKOW, included_primary_types=['museum', 'park'])
+	assert len(stub.requests) == 3
+
+
+def test_ttl(stub, monkeypatch, tmp_path):
+	_use_cache(monkeypatch, ResponseCache(tmp_path, ttl=60))
+	google_places.nearby_search(KRAKOW, included_types=['museum'])
+	for path in tmp_path.glob('*/*.json'):
+		os.utime(path, (time.time(), time.time() - 120))
+	google_places.nearby_search(KRAKOW, included_types=['museum'])
+	assert len(stub.requests) == 2
+
+
+def test_lru_eviction(tmp_path):
+	cache = ResponseCache(tmp_path, max_bytes=250)
+	for i in range(3):
+		cache.put({'i': i}, b'x' * 100)
+		time.sleep(0.01)
+	assert cache.get({'i': 0}) is None
+	assert cache.get({'i': 1}) is not None
+	cache.put({'i': 3}, b'x' * 100)
+	assert cache.get({'i': 2}) is None
+	assert cache.get({'i': 1}) is not None
+	assert cache.stats()['bytes'] <= 250
+
+
+def test_offline_mode(stub, monkeypatch, tmp_path):
+	_use_cache(monkeypatch, ResponseCache(tmp_path))
+	google_places.nearby_search(KRAKOW, included_types=['museum'])
+
+	_use_cache(monkeypatch, ResponseCache(tmp_path, mode='offline'))
+	assert google_places.nearby_search(KRAKOW, included_types=['museum']).json()
+	with pytest.raises(CacheMissError):
+		google_places.nearby_search(KRAKOW, included_types=['zoo'])
+	assert len(stub.requests) == 1
+
+
+def test_errors_are_not_cached(tmp_path):
+	cache = ResponseCache(tmp_path)
+	error = Response()
+	error.status_code = 500
+	error._content = b'{}'
+	assert cache.fetch({'q': 1}, lambda: error).status_code == 500
+	assert cache.get({'q': 1}) is None
+
+
+def test_concurrent_fetches_are_all_counted(tmp_path):
+	cache = ResponseCache(tmp_path)
+	ok = Response()
+	ok.status_code = 200
+	ok._content = b'{}'
+
+	def fetch(worker):
+		for i in range(50):
+			cache.fetch({'q': i % 5}, lambda: ok)
+
+	threads = [threading.Thread(target=fetch, args=(worker,)) for worker in range(8)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	stats = cache.stats()
+	assert stats['hits'] + stats['misses'] == 400
+	assert stats['misses'] >= 5
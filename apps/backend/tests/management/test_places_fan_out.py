@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from src.api_calls import google_places
+from src.api_calls.response_cache import ResponseCache
+from src.constants import all_categories
+from src.data_model.city.city import City
+from src.data_model.place.place import PlaceCreatorAPI
+from src.data_model.place.place_visitor import PlaceVisitor
+
+CATEGORIES = ['museum', 'park', 'zoo', 'church', 'library', 'spa', 'stadium']
+
+
+@pytest.fixture
+def stub(places_stub, monkeypatch, tmp_path):
+	monkeypatch.setattr(google_places, 'PLACES_API_URL', places_stub.url)
+	monkeypatch.setattr(
+		google_places, 'nearby_search_cache', ResponseCache(tmp_path, mode='off')
+	)
+	return places_stub
+
+
+def _place_ids(places):
+	return [place.placeInfo.id for place in places.get_list()]
+
+
+def test_concurrent_matches_serial(stub):
+	city = City.get_const_krakow()
+	serial = google_places.get_places_for_city(
+		None, city, PlaceCreatorAPI, PlaceVisitor, CATEGORIES, max_workers=1
+	)
+	concurrent = google_places.get_places_for_city(
+		None, city, PlaceCreatorAPI, PlaceVisitor, CATEGORIES, max_workers=8
+	)
+	assert _place_ids(serial) == _place_ids(concurrent)
+	assert _place_ids(serial)[:3] == [
+		'tourist_attraction-0',
+		'tourist_attraction-1',
+		'shared',
+	]
+	assert len(stub.requests) == 2 * (len(CATEGORIES) + 1)
+
+
+def test_request_payloads(stub):
+	google_places.get_places_for_city(
+		None, City.get_const_krakow(), PlaceCreatorAPI, PlaceVisitor, CATEGORIES
+	)
+	bodies = [request['body'] for request in stub.requests]
+	primary_types = [
+		body['includedPrimaryTypes']
+		for body in bodies
+		if 'includedPrimaryTypes' in body
+	]
+	assert sorted(primary_types) == sorted(CATEGORIES)
+	assert [body.get('includedTypes') for body in bodies].count(
+		['tourist_attraction']
+	) == 1
+
+
+def test_cold_city_takes_about_one_round_trip(stub):
+	stub.delay = 0.2
+	start = time.perf_counter()
+	google_places.get_places_for_city(
+		None,
+		City.get_const_krakow(),
+		PlaceCreatorAPI,
+		PlaceVisitor,
+		CATEGORIES,
+		max_workers=len(CATEGORIES) + 1,
+	)
+	elapsed = time.perf_counter() - start
+	assert elapsed < 2 * stub.delay
+
+
+def test_default_sends_every_search_at_once(stub):
+	stub.delay = 0.2
+	start = time.perf_counter()
+	google_places.get_places_for_city(
+		None, City.get_const_krakow(), PlaceCreatorAPI, PlaceVisitor, all_categories
+	)
+	elapsed = time.perf_counter() - start
+	assert len(stub.requests) == len(all_categories) + 1
+	assert elapsed < 2 * stub.delay
+
+
+def test_bounded_parallelism(stub):
+	stub.delay = 0.1
+	start = time.perf_counter()
+	google_places.get_places_for_city(
+		None,
+		City.get_const_krakow(),
+		PlaceCreatorAPI,
+		PlaceVisitor,
+		CATEGORIES,
+		max_workers=2,
+	)
+	elapsed = time.perf_counter() - start
+	assert elapsed >= 4 * stub.delay
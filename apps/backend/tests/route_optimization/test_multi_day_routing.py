@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, Period, PlaceInfo, TimePoint
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.multi_day_routing import MultiDayRouting
+from src.route_optimalization.parallel_routing import DaySolver
+
+CITY = City.get_const_krakow()
+PERIOD_INDICES = [1, 2, 3]
+
+
+def _open_only_on(place: Place, period_index: int):
+	for day in range(7):
+		if day != period_index:
+			place.regularOpeningHours.periods[day] = Period(close=TimePoint(0))
+
+
+def _trip(count=30):
+	rng = random.Random(count)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				CITY.lat + rng.uniform(-0.03, 0.03), CITY.lng + rng.uniform(-0.03, 0.03)
+			),
+			estimatedTime=rng.choice([30, 60, 90]),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	for place in places[:3]:
+		_open_only_on(place, 2)
+	_open_only_on(places[3], 5)
+	places[4].ratings.statisticalRating = 4.8
+	places[4].types = ['tourist_attraction']
+	return Places(places, CITY)
+
+
+def test_places_are_visited_once_on_a_day_they_are_open():
+	trip = _trip()
+	routing = MultiDayRouting(trip, TripInfo(city=CITY).hotel, PERIOD_INDICES)
+	days = routing.get_day_routes()
+
+	assert len(days) == len(PERIOD_INDICES)
+	visited = [place.placeInfo.id for route, _ in days for place in route.get_list()]
+	assert len(visited) == len(set(visited))
+	assert 'place-3' not in visited
+	for day, (route, transportations) in enumerate(days):
+		assert len(transportations) == max(route.count - 1, 0)
+		for place in route.get_list():
+			assert place.regularOpeningHours.periods[PERIOD_INDICES[day]].open_today
+	assert 'place-4' in visited
+	assert routing.stats['dropped_must_see'] == 0
+	assert routing.stats['days'] == len(PERIOD_INDICES)
+
+
+def test_candidates_keep_must_see_places():
+	trip = _trip()
+	routing = MultiDayRouting(
+		trip, TripInfo(city=CITY).hotel, PERIOD_INDICES, candidates_per_day=2
+	)
+	ids = [place.placeInfo.id for place in routing.places.get_list()]
+	assert len(ids) == 2 * len(PERIOD_INDICES)
+	assert ids[0] == 'place-4'
+	assert 'place-3' not in ids
+
+
+def test_day_solver_plans_the_trip_in_one_solve():
+	solver = DaySolver(workers=1, planner='trip')
+	days = solver.solve_trip(_trip(), TripInfo(city=CITY).hotel, PERIOD_INDICES, 'fast')
+	assert len(days) == len(PERIOD_INDICES)
+	assert all(stats is days[0][2] for _, _, stats in days)
+	assert list(solver.stats()['profiles']) == ['trip/fast']
+
+
+def test_unknown_planner():
+	with pytest.raises(ValueError):
+		DaySolver(planner='clusters')
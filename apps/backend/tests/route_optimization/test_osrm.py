@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+
+from src.data_model.place.place_subclasses import Location
+from src.travel_time.osrm import OSRMClient
+
+
+def _pairs(count, seed=0):
+	rng = random.Random(seed)
+	points = [
+		Location(50.06 + rng.uniform(-0.1, 0.1), 19.94 + rng.uniform(-0.1, 0.1))
+		for _ in range(count)
+	]
+	starts = [points[i] for i in range(count) for j in range(i)]
+	ends = [points[j] for i in range(count) for j in range(i)]
+	return starts, ends
+
+
+def test_table_matches_route(osrm_stub):
+	starts, ends = _pairs(12)
+	table = OSRMClient(osrm_stub.url, 'table').durations(starts, ends)
+	assert len(osrm_stub.requests) == 1
+	route = OSRMClient(osrm_stub.url, 'route').durations(starts, ends)
+	assert len(osrm_stub.requests) == 1 + len(starts)
+	np.testing.assert_allclose(table, route)
+	assert (table > 0).all()
+
+
+def test_table_is_split_by_size_limit(osrm_stub):
+	starts, ends = _pairs(12)
+	client = OSRMClient(osrm_stub.url, 'table', max_table_size=8)
+	split = client.durations(starts, ends)
+	np.testing.assert_allclose(split, OSRMClient(osrm_stub.url).durations(starts, ends))
+	table_paths = [path for path in osrm_stub.requests[:-1]]
+	assert len(table_paths) > 1
+	assert all(len(path.split('?')[0].split(';')) <= 8 for path in table_paths)
+
+
+def test_pairs_are_cached(osrm_stub):
+	starts, ends = _pairs(6)
+	client = OSRMClient(osrm_stub.url)
+	first = client.durations(starts, ends)
+	second = client.durations(starts[:5] + [starts[0]], ends[:5] + [ends[0]])
+	assert len(osrm_stub.requests) == 1
+	np.testing.assert_array_equal(second, np.append(first[:5], first[0]))
+	assert client.stats()['hits'] == 6
+
+	client.cache_size = 3
+	client.clear()
+	client.durations(starts, ends)
+	assert client.stats()['pairs'] == 3
+
+
+def test_failures_are_not_cached(osrm_stub):
+	starts, ends = _pairs(4)
+	url = osrm_stub.url
+	client = OSRMClient(url + '/missing')
+	assert np.isnan(client.durations(starts, ends)).all()
+	client.url = url
+	assert not np.isnan(client.durations(starts, ends)).any()
+	assert client.stats()['misses'] == 2 * len(starts)
+
+
+def test_malformed_answers_are_misses(osrm_stub):
+	starts, ends = _pairs(4)
+	for body in (b'<html>Bad Gateway</html>', b'{"code": "Ok"}', b'[]'):
+		osrm_stub.body = body
+		for mode in ('table', 'route'):
+			client = OSRMClient(osrm_stub.url, mode)
+			assert np.isnan(client.durations(starts, ends)).all()
+			assert client.stats()['pairs'] == 0
@@ -0,0 +1,74 @@
+import random
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.parallel_routing import DaySolver
+
+CITY = City.get_const_krakow()
+
+
+def _days(count, per_day=8):
+	rng = random.Random(1)
+	days = []
+	for day in range(count):
+		places = []
+		for i in range(per_day):
+			place = Place(
+				placeInfo=PlaceInfo(id=f'{day}-{i}', displayName=f'Place {day}-{i}'),
+				location=Location(
+					CITY.lat + rng.uniform(-0.02, 0.02),
+					CITY.lng + rng.uniform(-0.02, 0.02),
+				),
+			)
+			place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+			places.append(place)
+		days.append(Places(places, CITY))
+	return days
+
+
+def _summary(results):
+	return [
+		([place.placeInfo.id for place in route.get_list()], transportations)
+		for route, transportations, _ in results
+	]
+
+
+@pytest.fixture(scope='module')
+def serial():
+	days = _days(3)
+	depot = TripInfo(city=CITY).hotel
+	return days, depot, _summary(DaySolver(workers=1).solve(days, depot, [1, 2, 3]))
+
+
+def test_pool_matches_serial(serial):
+	days, depot, expected = serial
+	solver = DaySolver(workers=2)
+	try:
+		assert _summary(solver.solve(days, depot, [1, 2, 3])) == expected
+	finally:
+		solver.shutdown()
+	assert all(route for route, _ in expected)
+
+
+def test_broken_pool_falls_back_to_serial(serial, monkeypatch):
+	days, depot, expected = serial
+
+	class BrokenPool:
+		def submit(self, *args):
+			future = Future()
+			future.set_exception(BrokenProcessPool('worker died'))
+			return future
+
+		def shutdown(self, **kwargs):
+			pass
+
+	solver = DaySolver(workers=2)
+	monkeypatch.setattr(solver, '_get_pool', BrokenPool)
+	assert _summary(solver.solve(days, depot, [1, 2, 3])) == expected
@@ -0,0 +1,126 @@
+import random
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization import parallel_routing
+from src.route_optimalization.parallel_routing import DaySolver, solve_day
+from src.route_optimalization.route_cache import RouteCache
+from src.route_optimalization.routing import get_solver_profile
+
+CITY = City.get_const_krakow()
+DEPOT = TripInfo(city=CITY).hotel
+
+
+def _day(count=10, seed=0):
+	rng = random.Random(seed)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				CITY.lat + rng.uniform(-0.03, 0.03), CITY.lng + rng.uniform(-0.03, 0.03)
+			),
+			estimatedTime=60,
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	return Places(places, CITY)
+
+
+def _ids(route):
+	return [place.placeInfo.id for place in route.get_list()]
+
+
+def test_key_ignores_place_order_but_not_the_problem():
+	fast = get_solver_profile('fast')
+	day = _day()
+	reordered = Places(list(reversed(day.get_list())), CITY)
+	key = RouteCache.key(day, DEPOT, 1, fast)
+	assert RouteCache.key(reordered, DEPOT, 1, fast) == key
+	assert RouteCache.key(day, DEPOT, 2, fast) != key
+	assert RouteCache.key(day, DEPOT, 1, get_solver_profile('balanced')) != key
+	longer = _day()
+	longer.get_by_index(0).estimatedTime = 90
+	assert RouteCache.key(longer, DEPOT, 1, fast) != key
+
+
+def test_moved_place_misses_the_cache(monkeypatch):
+	cache = RouteCache(size=10)
+	monkeypatch.setattr(parallel_routing, 'route_cache', cache)
+	solve_day(_day(), DEPOT, 1, 'fast')
+
+	moved = _day()
+	location = moved.get_by_index(0).location
+	moved.get_by_index(0).location = Location(
+		location.latitude + 0.01, location.longitude
+	)
+	_, _, stats = solve_day(moved, DEPOT, 1, 'fast')
+	assert 'cached' not in stats
+	assert cache.stats()['misses'] == 2
+
+
+def test_solve_day_reuses_the_route(monkeypatch):
+	cache = RouteCache(size=10)
+	monkeypatch.setattr(parallel_routing, 'route_cache', cache)
+	route, transportations, stats = solve_day(_day(), DEPOT, 1, 'fast')
+	assert 'cached' not in stats
+
+	day = _day()
+	again, again_transportations, again_stats = solve_day(day, DEPOT, 1, 'fast')
+	assert again_stats['cached']
+	assert _ids(again) == _ids(route)
+	assert again_transportations == transportations
+	assert all(
+		place is day.get_place_by_id(place.placeInfo.id) for place in again.get_list()
+	)
+	assert cache.stats()['hits'] == 1
+	assert cache.stats()['misses'] == 1
+
+
+def test_lru_bound():
+	cache = RouteCache(size=2)
+	fast = get_solver_profile('fast')
+	day = _day(3)
+	keys = [RouteCache.key(day, DEPOT, period_index, fast) for period_index in range(3)]
+	for key in keys:
+		cache.put(key, day, [(5, 'FOOT'), (7, 'CAR')], {'profile': 'fast'})
+	assert cache.get(keys[0], day) is None
+	assert _ids(cache.get(keys[2], day)[0]) == _ids(day)
+
+
+def test_routes_persist_on_disk(tmp_path):
+	fast = get_solver_profile('fast')
+	day = _day(3)
+	key = RouteCache.key(day, DEPOT, 1, fast)
+	RouteCache(directory=tmp_path).put(
+		key, day, [(5, 'FOOT'), (7, 'CAR')], {'profile': 'fast'}
+	)
+
+	other = RouteCache(directory=tmp_path)
+	route, transportations, stats = other.get(key, _day(3))
+	assert _ids(route) == _ids(day)
+	assert transportations == [(5, 'FOOT'), (7, 'CAR')]
+	assert stats == {'profile': 'fast', 'cached': True, 'cached_from': 'disk'}
+	assert other.stats()['disk_hits'] == 1
+
+
+def test_day_solver_counts_hits_in_workers(tmp_path, monkeypatch):
+	monkeypatch.setenv('ROUTE_CACHE_DIR', str(tmp_path))
+	server_cache = RouteCache(size=10)
+	monkeypatch.setattr(parallel_routing, 'route_cache', server_cache)
+	days = [_day(6, seed) for seed in range(2)]
+	solver = DaySolver(workers=2)
+	try:
+		for _ in range(2):
+			list(solver.solve(days, DEPOT, [1, 2], 'fast'))
+	finally:
+		solver.shutdown()
+
+	stats = solver.route_cache_stats()
+	assert stats['misses'] == 2
+	assert stats['hits'] + stats['disk_hits'] == 2
+	assert stats['main_process_routes'] == 0
+	assert server_cache.stats()['hits'] == server_cache.stats()['misses'] == 0
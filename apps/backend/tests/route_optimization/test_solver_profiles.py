@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.parallel_routing import DaySolver
+from src.route_optimalization.routing import (
+	SOLVER_PROFILES,
+	FirstSolution,
+	Metaheuristic,
+	Routing,
+	SolverProfile,
+	get_solver_profile,
+)
+
+CITY = City.get_const_krakow()
+
+
+def _day(count=25, seed=0):
+	rng = random.Random(seed)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				CITY.lat + rng.uniform(-0.03, 0.03), CITY.lng + rng.uniform(-0.03, 0.03)
+			),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	return Places(places, CITY)
+
+
+def test_profile_from_environment(monkeypatch):
+	monkeypatch.delenv('ROUTING_PROFILE', raising=False)
+	monkeypatch.delenv('ROUTING_TIME_LIMIT', raising=False)
+	assert get_solver_profile() is SOLVER_PROFILES['fast']
+	monkeypatch.setenv('ROUTING_PROFILE', 'thorough')
+	monkeypatch.setenv('ROUTING_TIME_LIMIT', '0.25')
+	profile = get_solver_profile()
+	assert profile.name == 'thorough'
+	assert profile.time_limit == 0.25
+	assert profile.metaheuristic == Metaheuristic.GUIDED_LOCAL_SEARCH
+	assert get_solver_profile(SOLVER_PROFILES['fast']) is SOLVER_PROFILES['fast']
+	with pytest.raises(ValueError):
+		get_solver_profile('exhaustive')
+
+
+def test_time_limit_bounds_the_search():
+	profile = SolverProfile(
+		'test',
+		FirstSolution.PATH_MOST_CONSTRAINED_ARC,
+		Metaheuristic.GUIDED_LOCAL_SEARCH,
+		0.2,
+	)
+	depot = TripInfo(city=CITY).hotel
+	fast = Routing(_day(), depot=depot, profile='fast')
+	fast.get_routes()
+	guided = Routing(_day(), depot=depot, profile=profile)
+	route, _ = guided.get_routes()
+
+	assert route.count > 0
+	assert guided.stats['profile'] == 'test'
+	assert guided.stats['time_limit_ms'] == 200
+	assert 150 <= guided.stats['wall_ms'] < 1000
+	assert guided.stats['improvements'] >= 1
+	assert guided.stats['best_found_ms'] <= guided.stats['wall_ms']
+	assert guided.stats['objective'] <= fast.stats['objective']
+	assert fast.stats['status'] == 'ROUTING_SUCCESS'
+	assert fast.stats['time_limit_ms'] is None
+
+
+def test_day_solver_collects_stats():
+	solver = DaySolver(workers=1)
+	days = [_day(8, seed) for seed in range(3)]
+	results = list(solver.solve(days, TripInfo(city=CITY).hotel, [0, 1, 2], 'fast'))
+	assert [stats['places'] for _, _, stats in results] == [8, 8, 8]
+	stats = solver.stats()['profiles']['fast']
+	assert stats['solves'] == 3
+	assert stats['p50_ms'] <= stats['p95_ms'] <= stats['max_ms']
+	assert stats['statuses'] == {'ROUTING_SUCCESS': 3}
@@ -0,0 +1,65 @@
+import random
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization.routing import Routing
+
+CITY = City.get_const_krakow()
+
+
+class CallbackRouting(Routing):
+	"""Routing with the transit times evaluated by a Python callback."""
+
+	def _register_transit(self, manager, routing):
+		def time_callback(from_index, to_index):
+			from_node = manager.IndexToNode(from_index)
+			to_node = manager.IndexToNode(to_index)
+			time_spend = (
+				0
+				if from_node == 0
+				else self.places.get_by_index(from_node - 1).estimatedTime
+			)
+			return self.matrix[from_node][to_node] + time_spend
+
+		return routing.RegisterTransitCallback(time_callback)
+
+
+def _day(count=30):
+	rng = random.Random(count)
+	places = []
+	for i in range(count):
+		place = Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				CITY.lat + rng.uniform(-0.03, 0.03), CITY.lng + rng.uniform(-0.03, 0.03)
+			),
+			estimatedTime=rng.choice([30, 60, 90]),
+		)
+		place.ratings.cumulative_rating = rng.uniform(0.1, 1)
+		places.append(place)
+	return Places(places, CITY)
+
+
+def test_transit_matrix_includes_service_time():
+	day = _day(5)
+	routing = Routing(day, depot=TripInfo(city=CITY).hotel)
+	transit = routing._transit_matrix()
+	for i, row in enumerate(transit):
+		service = 0 if i == 0 else day.get_by_index(i - 1).estimatedTime
+		assert row == [time + service for time in routing.matrix[i]]
+
+
+def test_matrix_and_callback_give_the_same_route():
+	depot = TripInfo(city=CITY).hotel
+	native = Routing(_day(), depot=depot, profile='fast')
+	callback = CallbackRouting(_day(), depot=depot, profile='fast')
+	native_route, native_transportations = native.get_routes()
+	callback_route, callback_transportations = callback.get_routes()
+	assert [place.placeInfo.id for place in native_route.get_list()] == [
+		place.placeInfo.id for place in callback_route.get_list()
+	]
+	assert native_transportations == callback_transportations
+	assert native.stats['objective'] == callback.stats['objective']
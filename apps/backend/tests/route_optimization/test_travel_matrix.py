@@ -0,0 +1,117 @@
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place import Place
+from src.data_model.place.place_subclasses import Location, PlaceInfo
+from src.data_model.places.places import Places
+from src.data_model.user.user_info import TripInfo
+from src.route_optimalization import routing
+from src.travel_time.travel_matrix import CityTravelMatrix
+from src.travel_time.travel_time import travel_estimator
+
+
+@pytest.fixture
+def city():
+	city = City.get_const_krakow()
+	city.country = 'Sweden'  # keep OSRM out of the estimates
+	return city
+
+
+def _places(count, seed=0):
+	rng = random.Random(seed)
+	return [
+		Place(
+			placeInfo=PlaceInfo(id=f'place-{i}', displayName=f'Place {i}'),
+			location=Location(
+				50.06 + rng.uniform(-0.1, 0.1), 19.94 + rng.uniform(-0.1, 0.1)
+			),
+		)
+		for i in range(count)
+	]
+
+
+def test_lookup_matches_online_estimate(tmp_path, city):
+	matrix = CityTravelMatrix(tmp_path)
+	places = _places(30)
+	assert matrix.add_places(city, places) == 30
+
+	day = [places[i] for i in (17, 3, 25, 8, 0)]
+	times, modes = matrix.lookup(city, [place.placeInfo.id for place in day])
+	expected_times, expected_modes = travel_estimator.get_estimated_time_matrix(
+		[place.location for place in day], city
+	)
+	assert times.tolist() == expected_times.tolist()
+	assert modes.tolist() == expected_modes.tolist()
+	assert matrix.lookup(city, ['place-0', 'unknown']) is None
+	assert matrix.lookup(None, ['place-0']) is None
+
+
+def test_incremental_update(tmp_path, city):
+	matrix = CityTravelMatrix(tmp_path)
+	places = _places(40)
+	assert matrix.add_places(city, places[:25]) == 25
+	assert matrix.add_places(city, places[:25]) == 0
+
+	moved = _places(40, seed=1)[5]
+	places[5] = moved
+	assert matrix.add_places(city, places) == 16
+
+	full = CityTravelMatrix(tmp_path / 'full')
+	full.add_places(city, places)
+	ids = [place.placeInfo.id for place in places]
+	for got, expected in zip(matrix.lookup(city, ids), full.lookup(city, ids)):
+		assert got.tolist() == expected.tolist()
+	files = sorted(path.name for path in (tmp_path / 'sweden_1616172264').iterdir())
+	assert files == ['index.json', 'modes-2.npy', 'times-2.npy']
+
+
+def test_arrays_in_use_are_removed_later(tmp_path, city, monkeypatch):
+	matrix = CityTravelMatrix(tmp_path)
+	places = _places(12)
+	matrix.add_places(city, places[:4])
+	assert matrix.lookup(city, ['place-0']) is not None
+
+	def in_use(path, *args, **kwargs):
+		raise PermissionError(path)
+
+	with monkeypatch.context() as patch:
+		patch.setattr(Path, 'unlink', in_use)
+		assert matrix.add_places(city, places[:8]) == 4
+	assert matrix.lookup(city, ['place-7'])[0].shape == (1, 1)
+
+	matrix.add_places(city, places)
+	files = sorted(path.name for path in (tmp_path / 'sweden_1616172264').iterdir())
+	assert files == ['index.json', 'modes-3.npy', 'times-3.npy']
+
+
+def test_reader_sees_updates(tmp_path, city):
+	writer, reader = CityTravelMatrix(tmp_path), CityTravelMatrix(tmp_path)
+	places = _places(10)
+	writer.add_places(city, places[:5])
+	assert reader.lookup(city, ['place-9']) is None
+	writer.add_places(city, places)
+	assert reader.lookup(city, ['place-9', 'place-0'])[0].shape == (2, 2)
+
+
+def test_routing_slices_stored_matrix(tmp_path, city, monkeypatch):
+	places = _places(12)
+	matrix = CityTravelMatrix(tmp_path)
+	matrix.add_places(city, places)
+	day = Places(places[2:9], city)
+	depot = TripInfo(city=city).hotel
+	expected = routing.Routing(day, depot=depot)
+
+	monkeypatch.setattr(routing, 'city_travel_matrix', matrix)
+
+	def fail(*args, **kwargs):
+		raise AssertionError('the whole day matrix was estimated online')
+
+	monkeypatch.setattr(travel_estimator, 'get_estimated_time_matrix', fail)
+	sliced = routing.Routing(day, depot=depot)
+	assert sliced.matrix == expected.matrix
+	assert sliced.transport_modes == expected.transport_modes
+	assert np.array(sliced.matrix).shape == (8, 8)
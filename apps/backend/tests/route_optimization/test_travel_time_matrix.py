@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from src.data_model.city.city import City
+from src.data_model.place.place_subclasses import Location
+from src.travel_time.osrm import OSRMClient
+from src.travel_time.travel_time import travel_estimator
+
+
+def _locations(count, spread, seed=0):
+	rng = random.Random(seed)
+	return [
+		Location(
+			50.06 + rng.uniform(-spread, spread), 19.94 + rng.uniform(-spread, spread)
+		)
+		for _ in range(count)
+	]
+
+
+def _per_pair(locations, city):
+	"""The per-pair loop Routing used before the batch API."""
+	size = len(locations)
+	times = [[0] * size for _ in range(size)]
+	modes = [[''] * size for _ in range(size)]
+	for i, start in enumerate(locations):
+		for j, end in enumerate(locations):
+			if i == j:
+				continue
+			travel_time, mode = travel_estimator.get_estimated_time(start, end, city)
+			times[i][j] = times[j][i] = travel_time
+			modes[i][j] = modes[j][i] = mode
+	return times, modes
+
+
+def _city(country):
+	city = City.get_const_krakow()
+	city.country = country
+	return city
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('country', [None, 'Sweden'])
+def test_matrix_matches_per_pair(seed, country):
+	city = country and _city(country)
+	locations = _locations(40, 0.1, seed)
+	locations.append(locations[3])
+	times, modes = travel_estimator.get_estimated_time_matrix(locations, city)
+	expected_times, expected_modes = _per_pair(locations, city)
+	assert times.tolist() == expected_times
+	assert modes.tolist() == expected_modes
+	assert {'CAR', 'FOOT'} <= set(modes.ravel())
+
+
+@pytest.mark.parametrize('mode', ['table', 'route'])
+def test_matrix_uses_osrm_for_car_trips_in_poland(osrm_stub, monkeypatch, mode):
+	locations = _locations(15, 0.1)
+	city = _city('Poland')
+	monkeypatch.setattr(travel_estimator, 'osrm', OSRMClient(osrm_stub.url, mode))
+	times, modes = travel_estimator.get_estimated_time_matrix(locations, city)
+	car_pairs = (modes == 'CAR').sum() // 2
+	assert len(osrm_stub.requests) == (1 if mode == 'table' else car_pairs) > 0
+
+	monkeypatch.setattr(travel_estimator, 'osrm', OSRMClient(osrm_stub.url, 'route'))
+	expected_times, expected_modes = _per_pair(locations, city)
+	assert times.tolist() == expected_times
+	assert modes.tolist() == expected_modes
+	fallback, _ = travel_estimator.get_estimated_time_matrix(locations, None)
+	assert (times[modes == 'CAR'] != fallback[modes == 'CAR']).any()
+
+
+def test_matrix_falls_back_to_model_without_osrm(osrm_stub, monkeypatch):
+	url = osrm_stub.url
+	osrm_stub.shutdown()
+	osrm_stub.server_close()
+	monkeypatch.setattr(travel_estimator, 'osrm', OSRMClient(url))
+	locations = _locations(15, 0.1)
+	times, modes = travel_estimator.get_estimated_time_matrix(
+		locations, _city('Poland')
+	)
+	expected_times, expected_modes = travel_estimator.get_estimated_time_matrix(
+		locations
+	)
+	assert times.tolist() == expected_times.tolist()
+	assert modes.tolist() == expected_modes.tolist()
+
+
+def test_matrix_small_inputs():
+	times, modes = travel_estimator.get_estimated_time_matrix([Location(50, 19)])
+	assert times.tolist() == [[0]]
+	assert modes.tolist() == [['']]
+	assert travel_estimator.get_estimated_time_matrix([])[0].shape == (0, 0)
@@ -0,0 +1,69 @@
+import numpy as np
+
+from src.ml_operations.kmeans_constrained import (
+	constrained_kmeans,
+	initialize_centroids_kmeans_plusplus,
+)
+
+
+def _blobs(per_blob=50, seed=0):
+	rng = np.random.default_rng(seed)
+	centres = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+	points = np.concatenate(
+		[centre + rng.normal(size=(per_blob, 2)) for centre in centres]
+	)
+	weights = rng.uniform(0, 10, size=(len(points), 1))
+	return np.hstack([points, weights])
+
+
+def _inertia(data, centroids, assignment):
+	return ((data[:, :-1] - centroids[assignment, :-1]) ** 2).sum()
+
+
+def test_separated_blobs_are_recovered():
+	data = _blobs()
+	_, assignment, w_averages = constrained_kmeans(
+		data, 3, {}, {}, n_init=4, random_state=1
+	)
+	for blob in range(3):
+		assert len(set(assignment[blob * 50 : (blob + 1) * 50])) == 1
+	assert len(set(assignment)) == 3
+	for cluster in range(3):
+		assert np.isclose(w_averages[cluster], data[assignment == cluster, -1].mean())
+
+
+def test_fixed_and_flexible_points_respect_their_clusters():
+	data = _blobs()
+	fixed = {0: 2, 60: 0, 120: 1}
+	flexible = {i: [0, 1] for i in range(1, 150, 7) if i not in fixed}
+	_, assignment, _ = constrained_kmeans(data, 3, fixed, flexible, random_state=3)
+	for idx, cluster in fixed.items():
+		assert assignment[idx] == cluster
+	for idx, clusters in flexible.items():
+		assert assignment[idx] in clusters
+
+
+def test_same_seed_gives_the_same_clusters():
+	data = _blobs(seed=5)
+	flexible = {i: [0, 2] for i in range(0, 150, 3)}
+	first = constrained_kmeans(data, 4, {}, flexible, n_init=6, random_state=7)
+	again = constrained_kmeans(data, 4, {}, flexible, n_init=6, random_state=7)
+	threaded = constrained_kmeans(
+		data, 4, {}, flexible, n_init=6, random_state=7, n_jobs=3
+	)
+	for result in (again, threaded):
+		assert np.array_equal(first[0], result[0])
+		assert np.array_equal(first[1], result[1])
+
+
+def test_restarts_keep_the_lowest_inertia():
+	data = np.random.default_rng(11).uniform(size=(300, 3))
+	single = constrained_kmeans(data, 5, {}, {}, n_init=1, random_state=2)
+	best = constrained_kmeans(data, 5, {}, {}, n_init=10, random_state=2)
+	assert _inertia(data, *best[:2]) <= _inertia(data, *single[:2])
+
+
+def test_plusplus_with_duplicate_points():
+	data = np.ones((4, 3))
+	centroids = initialize_centroids_kmeans_plusplus(data, 3, np.random.default_rng(0))
+	assert np.array_equal(centroids, np.ones((3, 3)))